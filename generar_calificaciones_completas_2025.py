@@ -7,9 +7,20 @@ Crea un archivo CSV con 10 actividades evaluativas por asignatura para cada estu
 - Fechas: Marzo a Diciembre 2025 (ambos semestres)
 """
 
+import argparse
 import csv
+import hashlib
 import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'scripts'))
+from testdata.calendario import calendario_escolar
+from testdata.comprimido import abrir
+from testdata.rut import rut_canonico, ruts_canonicos
 
 # ============================================
 # CONFIGURACIÓN
@@ -97,26 +108,7 @@ def generar_nombre_estudiante(num_estudiante):
 
 def generar_rut(num_estudiante):
     """Genera RUT único para estudiante"""
-    base = 10000000 + num_estudiante
-    # Calcular dígito verificador
-    rut_str = str(base)
-    suma = 0
-    multiplo = 2
-    for d in reversed(rut_str):
-        suma += int(d) * multiplo
-        multiplo += 1
-        if multiplo > 7:
-            multiplo = 2
-    resto = suma % 11
-    dv = 11 - resto
-    if dv == 11:
-        dv_str = '0'
-    elif dv == 10:
-        dv_str = 'K'
-    else:
-        dv_str = str(dv)
-    
-    return f"{base}-{dv_str}"
+    return rut_canonico(10000000 + num_estudiante)
 
 def generar_fecha_aleatoria(inicio, fin, fechas_usadas=None):
     """
@@ -197,15 +189,155 @@ def generar_actividades_para_asignatura(estudiante_nombre, estudiante_rut, curso
     
     return actividades
 
+# ============================================
+# MOTOR POR LOTES
+# ============================================
+# Genera una sección completa de una vez: las notas, tipos y profesores se
+# sortean en bloque con random.choices(k=...) y las filas se arman como texto
+# preformateado, sin pasar por dicts ni csv.DictWriter. El esquema de columnas
+# es el mismo que el del modo clásico.
+
+COLUMNAS = ['Nombre', 'RUT', 'Curso', 'Sección', 'Asignatura', 'Profesor', 'Fecha', 'Tipo', 'Nota']
+FIN_LINEA = '\r\n'  # Mismo terminador que usa csv.DictWriter (dialecto excel)
+ACTIVIDADES_POR_SEMESTRE = 5
+
+def _campo_csv(valor):
+    """Aplica el mismo entrecomillado mínimo que csv.QUOTE_MINIMAL"""
+    valor = str(valor)
+    if any(c in valor for c in ',"\r\n'):
+        return '"' + valor.replace('"', '""') + '"'
+    return valor
+
+# Días hábiles por semestre (sin fines de semana, feriados ni vacaciones de invierno)
+CALENDARIO = calendario_escolar(SEMESTRE_1_INICIO.year)
+FECHAS_SEM1 = CALENDARIO.fechas_iso(semestre=1)
+FECHAS_SEM2 = CALENDARIO.fechas_iso(semestre=2)
+NOTAS_STR = [str(n) for n in range(60, 101)]
+PROFESORES_CSV = {asig: [_campo_csv(p) for p in profs] for asig, profs in PROFESORES.items()}
+
+def generar_bloque_seccion(rng, curso, seccion, asignaturas, num_estudiante_inicial,
+                           n_estudiantes=ESTUDIANTES_POR_SECCION):
+    """
+    Genera todas las calificaciones de una sección como un bloque de texto CSV.
+    Los estudiantes se numeran desde num_estudiante_inicial + 1.
+    Devuelve (texto, filas_generadas).
+    """
+    actividades = ACTIVIDADES_POR_SEMESTRE * 2
+    n_por_asignatura = n_estudiantes * actividades
+    n_total = n_por_asignatura * len(asignaturas)
+
+    # Sorteos en bloque para toda la sección
+    notas = rng.choices(NOTAS_STR, k=n_total)
+    tipos = rng.choices(TIPOS_EVALUACION, k=n_total)
+    profesores = {
+        asig: rng.choices(PROFESORES_CSV.get(asig, ['Profesor General']), k=n_por_asignatura)
+        for asig in asignaturas
+    }
+    asignaturas_csv = [(asig, _campo_csv(asig)) for asig in asignaturas]
+    curso_seccion = f"{_campo_csv(curso)},{_campo_csv(seccion)}"
+    muestra = rng.sample
+
+    primero = num_estudiante_inicial + 1
+    ruts = ruts_canonicos(range(10000000 + primero, 10000000 + primero + n_estudiantes))
+
+    lineas = []
+    agregar = lineas.append
+    k = 0
+    for e in range(n_estudiantes):
+        num = primero + e
+        est = f"{_campo_csv(generar_nombre_estudiante(num))},{ruts[e]},{curso_seccion},"
+        for asig, asig_csv in asignaturas_csv:
+            prefijo = f"{est}{asig_csv},"
+            profs = profesores[asig]
+            p = e * actividades
+            # Fechas hábiles distintas dentro de cada semestre, sin reintentos
+            fechas = muestra(FECHAS_SEM1, ACTIVIDADES_POR_SEMESTRE) + muestra(FECHAS_SEM2, ACTIVIDADES_POR_SEMESTRE)
+            for j in range(actividades):
+                agregar(f"{prefijo}{profs[p + j]},{fechas[j]},{tipos[k]},{notas[k]}{FIN_LINEA}")
+                k += 1
+
+    return ''.join(lineas), n_total
+
+def semilla_shard(semilla, indice):
+    """
+    Semilla independiente para el shard `indice`, derivada de la semilla maestra.
+    Cada shard (colegio, curso, sección) tiene su propio flujo aleatorio, así que
+    el resultado no depende del orden ni de cuántos procesos lo generen.
+    """
+    digest = hashlib.sha256(f"{semilla}:{indice}".encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+def listar_shards(colegios=1):
+    """Lista ordenada de (indice, curso, seccion, asignaturas, num_estudiante_inicial)"""
+    shards = []
+    num_estudiante = 0
+    for _ in range(colegios):
+        for curso in CURSOS_BASICA + CURSOS_MEDIA:
+            asignaturas = ASIGNATURAS_BASICA if curso in CURSOS_BASICA else ASIGNATURAS_MEDIA
+            for seccion in SECCIONES:
+                shards.append((len(shards), curso, seccion, asignaturas, num_estudiante))
+                num_estudiante += ESTUDIANTES_POR_SECCION
+    return shards
+
+def _generar_shard(tarea):
+    """Trabajo de un proceso: genera el bloque de un shard con su propia semilla"""
+    semilla, (indice, curso, seccion, asignaturas, num_estudiante_inicial) = tarea
+    rng = random.Random(semilla_shard(semilla, indice))
+    return generar_bloque_seccion(rng, curso, seccion, asignaturas, num_estudiante_inicial)
+
+def generar_csv_por_lotes(archivo_salida, colegios=1, semilla=42, procesos=1):
+    """
+    Genera el CSV completo con el motor por lotes.
+    colegios > 1 repite la estructura de cursos con estudiantes nuevos (escala distrito).
+    procesos > 1 reparte los shards (curso/sección) en un pool de procesos; los
+    bloques se escriben en orden de shard, así que el archivo es idéntico byte a
+    byte para cualquier cantidad de procesos.
+    """
+    shards = listar_shards(colegios)
+    tareas = [(semilla, shard) for shard in shards]
+
+    print("🚀 GENERADOR DE CALIFICACIONES 2025 (modo lotes)")
+    print("=" * 60)
+    print(f"   • Colegios: {colegios}")
+    print(f"   • Shards (curso/sección): {len(shards)}")
+    print(f"   • Procesos: {procesos}")
+    print(f"⏳ Generando archivo: {archivo_salida}\n")
+
+    inicio = time.perf_counter()
+    registros_escritos = 0
+
+    with abrir(archivo_salida, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
+        csvfile.write(','.join(COLUMNAS) + FIN_LINEA)
+        if procesos > 1:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                bloques = pool.map(_generar_shard, tareas, chunksize=max(1, len(tareas) // (procesos * 8)))
+                for bloque, filas in bloques:
+                    csvfile.write(bloque)
+                    registros_escritos += filas
+        else:
+            for tarea in tareas:
+                bloque, filas = _generar_shard(tarea)
+                csvfile.write(bloque)
+                registros_escritos += filas
+
+    segundos = time.perf_counter() - inicio
+    print(f"✅ GENERACIÓN COMPLETADA")
+    print("=" * 60)
+    print(f"📁 Archivo: {archivo_salida}")
+    print(f"📊 Estudiantes generados: {len(shards) * ESTUDIANTES_POR_SECCION:,}")
+    print(f"📝 Registros escritos: {registros_escritos:,}")
+    print(f"⚡ Velocidad: {registros_escritos / max(segundos, 1e-9):,.0f} filas/s ({segundos:.2f}s)")
+    return registros_escritos
+
 # ============================================
 # GENERACIÓN PRINCIPAL
 # ============================================
 
-def generar_csv_completo():
+ARCHIVO_SALIDA = 'public/test-data/grades-consolidated-2025-COMPLETO.csv'
+
+def generar_csv_completo(archivo_salida=ARCHIVO_SALIDA):
     """Genera el archivo CSV completo con todas las calificaciones"""
     
-    archivo_salida = 'public/test-data/grades-consolidated-2025-COMPLETO.csv'
-    
     print("🚀 GENERADOR DE CALIFICACIONES 2025")
     print("=" * 60)
     print(f"\n📊 CONFIGURACIÓN:")
@@ -231,7 +363,7 @@ def generar_csv_completo():
     print(f"\n⏳ Generando archivo: {archivo_salida}")
     print("   Esto puede tomar unos minutos...\n")
     
-    with open(archivo_salida, 'w', newline='', encoding='utf-8') as csvfile:
+    with abrir(archivo_salida, 'w', newline='', encoding='utf-8') as csvfile:
         fieldnames = ['Nombre', 'RUT', 'Curso', 'Sección', 'Asignatura', 'Profesor', 'Fecha', 'Tipo', 'Nota']
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         
@@ -295,5 +427,19 @@ def generar_csv_completo():
 # ============================================
 
 if __name__ == '__main__':
-    random.seed(42)  # Para reproducibilidad
-    generar_csv_completo()
+    parser = argparse.ArgumentParser(description='Genera calificaciones 2025 para todos los cursos')
+    parser.add_argument('--modo', choices=['clasico', 'lotes'], default='clasico',
+                        help='clasico: fila a fila (archivo histórico); lotes: motor por bloques de sección')
+    parser.add_argument('--salida', default=ARCHIVO_SALIDA, help='Ruta del CSV de salida (.gz / .zst para comprimir)')
+    parser.add_argument('--colegios', type=int, default=1, help='Cantidad de colegios a generar (solo modo lotes)')
+    parser.add_argument('--semilla', type=int, default=42, help='Semilla para reproducibilidad')
+    parser.add_argument('--procesos', type=int, default=1,
+                        help='Procesos en paralelo (solo modo lotes; la salida no depende de este valor)')
+    args = parser.parse_args()
+
+    if args.modo == 'lotes':
+        generar_csv_por_lotes(args.salida, colegios=args.colegios, semilla=args.semilla,
+                              procesos=args.procesos)
+    else:
+        random.seed(args.semilla)  # Para reproducibilidad
+        generar_csv_completo(args.salida)
@@ -1,6 +1,16 @@
+import argparse
 import csv
+import hashlib
 import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'scripts'))
+from testdata.calendario import calendario_escolar
+from testdata.carga_masiva import ESTADOS_ASISTENCIA
+from testdata.comprimido import abrir
 
 # Configuration
 STUDENT_FILE = '/workspaces/peloduro_v2/public/test-data/users-consolidated-2025-CORREGIDO_v2.csv'
@@ -11,12 +21,16 @@ TARGET_COURSE = '1ro Básico'
 TARGET_SECTION = 'A'
 
 # Status probabilities
-STATUS_CHOICES = ['present', 'absent', 'late', 'excused']
+STATUS_CHOICES = list(ESTADOS_ASISTENCIA)
 STATUS_WEIGHTS = [0.90, 0.05, 0.03, 0.02]
+STATUS_CUM_WEIGHTS = [sum(STATUS_WEIGHTS[:i + 1]) for i in range(len(STATUS_WEIGHTS))]
+
+FIELDNAMES = ['date', 'course', 'section', 'studentUsername', 'rut', 'name', 'status', 'comment']
+LINE_TERMINATOR = '\r\n'  # Same terminator csv.DictWriter uses
 
 def get_students(file_path, course, section):
     students = []
-    with open(file_path, mode='r', encoding='utf-8') as csvfile:
+    with abrir(file_path, mode='r', encoding='utf-8') as csvfile:
         reader = csv.DictReader(csvfile)
         for row in reader:
             if row['course'] == course and row['section'] == section:
@@ -30,13 +44,86 @@ def generate_dates(start_date, end_date):
             yield current_date
         current_date += timedelta(days=1)
 
+def get_students_by_section(file_path):
+    """All students grouped by (course, section), in file order"""
+    sections = {}
+    with abrir(file_path, mode='r', encoding='utf-8') as csvfile:
+        for row in csv.DictReader(csvfile):
+            if row.get('role', 'student') == 'student' and row['course']:
+                sections.setdefault((row['course'], row['section']), []).append(row)
+    return sections
+
+def csv_field(value):
+    """Minimal quoting, same as csv.QUOTE_MINIMAL"""
+    value = str(value)
+    if any(c in value for c in ',"\r\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+def section_seed(seed, course, section):
+    """Independent seed per section so output does not depend on worker count"""
+    digest = hashlib.sha256(f"{seed}:{course}:{section}".encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+def generate_section_block(task):
+    """
+    Draws the whole day x student status matrix of one section at once and
+    returns it as a preformatted CSV block: (text, rows).
+    """
+    seed, course, section, students, date_strs = task
+    rng = random.Random(section_seed(seed, course, section))
+    n = len(students)
+    statuses = rng.choices(STATUS_CHOICES, cum_weights=STATUS_CUM_WEIGHTS, k=n * len(date_strs))
+    # Everything except date and status is constant per student
+    middles = [
+        f",{csv_field(course)},{csv_field(section)},{csv_field(s['username'])},"
+        f"{csv_field(s['rut'])},{csv_field(s['name'])},"
+        for s in students
+    ]
+    tail = ',' + LINE_TERMINATOR
+    lines = []
+    append = lines.append
+    k = 0
+    for date_str in date_strs:
+        for middle in middles:
+            append(f"{date_str}{middle}{statuses[k]}{tail}")
+            k += 1
+    return ''.join(lines), k
+
+def generate_all_courses(student_file, output_file, seed=42, workers=1):
+    """Attendance for every course/section in student_file, one block per section"""
+    sections = get_students_by_section(student_file)
+    # School days only: weekdays minus Chilean holidays and winter break
+    date_strs = calendario_escolar(START_DATE.year).rango(START_DATE, END_DATE)
+    tasks = [(seed, course, section, students, date_strs)
+             for (course, section), students in sections.items()]
+    print(f"Found {sum(len(s) for s in sections.values())} students in {len(sections)} sections, "
+          f"{len(date_strs)} school days")
+
+    total = 0
+    with abrir(output_file, mode='w', encoding='utf-8', newline='', buffering=1 << 20) as out:
+        out.write(','.join(FIELDNAMES) + LINE_TERMINATOR)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                blocks = pool.map(generate_section_block, tasks)
+                for block, rows in blocks:
+                    out.write(block)
+                    total += rows
+        else:
+            for task in tasks:
+                block, rows = generate_section_block(task)
+                out.write(block)
+                total += rows
+
+    print(f"Attendance file generated: {output_file} ({total:,} rows)")
+    return total
+
 def main():
     students = get_students(STUDENT_FILE, TARGET_COURSE, TARGET_SECTION)
     print(f"Found {len(students)} students in {TARGET_COURSE} {TARGET_SECTION}")
 
-    with open(OUTPUT_FILE, mode='w', encoding='utf-8', newline='') as csvfile:
-        fieldnames = ['date', 'course', 'section', 'studentUsername', 'rut', 'name', 'status', 'comment']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    with abrir(OUTPUT_FILE, mode='w', encoding='utf-8', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
         writer.writeheader()
 
         for day in generate_dates(START_DATE, END_DATE):
@@ -57,4 +144,17 @@ def main():
     print(f"Attendance file generated: {OUTPUT_FILE}")
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Generate attendance CSV for bulk-upload-attendance')
+    parser.add_argument('--all-courses', action='store_true',
+                        help='Every course/section in the student file instead of TARGET_COURSE/TARGET_SECTION')
+    parser.add_argument('--students', default=STUDENT_FILE, help='Users CSV (role,name,rut,username,course,section)')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='Output CSV path (.gz / .zst to compress)')
+    parser.add_argument('--seed', type=int, default=42, help='Master seed (--all-courses only)')
+    parser.add_argument('--workers', type=int, default=1, help='Sections generated in parallel (--all-courses only)')
+    args = parser.parse_args()
+
+    if args.all_courses:
+        generate_all_courses(args.students, args.output, seed=args.seed, workers=args.workers)
+    else:
+        STUDENT_FILE, OUTPUT_FILE = args.students, args.output
+        main()
@@ -1,5 +1,10 @@
 import csv
 import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'scripts'))
+from testdata.calendario import calendario_escolar
 
 # Datos base
 estudiantes = [
@@ -34,24 +39,14 @@ asignaturas = [
 tipos_evaluacion = ["tarea", "prueba", "evaluacion"]
 
 # Fechas distribuidas en el año 2025
+# (días hábiles, sin feriados ni vacaciones de invierno)
+CALENDARIO = calendario_escolar(2025)
+
 # Primer semestre: Marzo a Junio (5 actividades)
-fechas_sem1 = [
-    "2025-03-10", "2025-03-25",  # Marzo
-    "2025-04-08", "2025-04-22",  # Abril
-    "2025-05-06", "2025-05-20",  # Mayo
-    "2025-06-03", "2025-06-17"   # Junio
-]
+fechas_sem1 = CALENDARIO.fechas_iso(semestre=1)
 
 # Segundo semestre: Julio a Diciembre (5 actividades)
-fechas_sem2 = [
-    "2025-07-08", "2025-07-22",  # Julio
-    "2025-08-05", "2025-08-19",  # Agosto
-    "2025-09-02", "2025-09-16",  # Septiembre
-    "2025-09-30",                # Septiembre
-    "2025-10-14", "2025-10-28",  # Octubre
-    "2025-11-11", "2025-11-25",  # Noviembre
-    "2025-12-09", "2025-12-23"   # Diciembre
-]
+fechas_sem2 = CALENDARIO.fechas_iso(semestre=2)
 
 # Generar el archivo CSV
 output_file = '/workspaces/superjf_v17/public/test-data/grades-consolidated-2025-COMPLETO.csv'
@@ -2,9 +2,17 @@
 """
 Script para filtrar el archivo users-consolidated-2025.csv
 Mantiene solo profesores con asignaturas válidas según el nivel educativo
+
+Las reglas se aplican con el motor de scripts/testdata/filtros.py; con
+--reglas se puede usar cualquier otro JSON de reglas sobre cualquier CSV.
 """
 
-import csv
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'scripts'))
+from testdata.filtros import cargar_reglas, filtrar
 
 # Asignaturas permitidas por nivel
 ASIGNATURAS_BASICA = {'CNT', 'HIS', 'LEN', 'MAT'}
@@ -15,70 +23,62 @@ CURSOS_BASICA = {'1ro Básico', '2do Básico', '3ro Básico', '4to Básico',
                  '5to Básico', '6to Básico', '7mo Básico', '8vo Básico'}
 CURSOS_MEDIA = {'1ro Medio', '2do Medio', '3ro Medio', '4to Medio'}
 
-def filtrar_csv():
-    input_file = 'users-consolidated-2025.csv'
-    output_file = 'users-consolidated-2025-CORREGIDO.csv'
-    
-    registros_mantenidos = 0
-    registros_eliminados = 0
-    estudiantes = 0
-    profesores_basica = 0
-    profesores_media = 0
-    
+# Todos los estudiantes; profesores solo con asignaturas de su nivel
+REGLAS_ASIGNATURAS = {
+    'conjuntos': {
+        'ASIGNATURAS_BASICA': sorted(ASIGNATURAS_BASICA),
+        'ASIGNATURAS_MEDIA': sorted(ASIGNATURAS_MEDIA),
+        'CURSOS_BASICA': sorted(CURSOS_BASICA),
+        'CURSOS_MEDIA': sorted(CURSOS_MEDIA),
+    },
+    'reglas': [
+        {'nombre': 'Estudiantes', 'donde': {'role': 'student'}, 'accion': 'mantener'},
+        {'nombre': 'Profesores Básica',
+         'donde': {'role': 'teacher', 'course': '@CURSOS_BASICA', 'subjects': '@ASIGNATURAS_BASICA'},
+         'accion': 'mantener'},
+        {'nombre': 'Profesores Media',
+         'donde': {'role': 'teacher', 'course': '@CURSOS_MEDIA', 'subjects': '@ASIGNATURAS_MEDIA'},
+         'accion': 'mantener'},
+    ],
+    'por_defecto': 'descartar',
+}
+
+def filtrar_csv(input_file='users-consolidated-2025.csv', output_file='users-consolidated-2025-CORREGIDO.csv',
+                reglas=REGLAS_ASIGNATURAS, descartadas=None, muestras=10):
     print("🔧 FILTRANDO ARCHIVO CSV...")
     print("=" * 60)
-    
-    with open(input_file, 'r', encoding='utf-8') as infile, \
-         open(output_file, 'w', encoding='utf-8', newline='') as outfile:
-        
-        reader = csv.DictReader(infile)
-        writer = csv.DictWriter(outfile, fieldnames=reader.fieldnames)
-        writer.writeheader()
-        
-        for row in reader:
-            role = row['role']
-            course = row['course']
-            subject = row['subjects']
-            
-            # Mantener todos los estudiantes
-            if role == 'student':
-                writer.writerow(row)
-                registros_mantenidos += 1
-                estudiantes += 1
-                continue
-            
-            # Filtrar profesores según nivel y asignatura
-            if role == 'teacher':
-                # Básica: solo CNT, HIS, LEN, MAT
-                if course in CURSOS_BASICA:
-                    if subject in ASIGNATURAS_BASICA:
-                        writer.writerow(row)
-                        registros_mantenidos += 1
-                        profesores_basica += 1
-                    else:
-                        registros_eliminados += 1
-                        print(f"❌ Eliminado: {row['name']} - {course} - {subject}")
-                
-                # Media: BIO, FIS, QUI, HIS, LEN, MAT, FIL, EDC
-                elif course in CURSOS_MEDIA:
-                    if subject in ASIGNATURAS_MEDIA:
-                        writer.writerow(row)
-                        registros_mantenidos += 1
-                        profesores_media += 1
-                    else:
-                        registros_eliminados += 1
-                        print(f"❌ Eliminado: {row['name']} - {course} - {subject}")
-    
+
+    contadores, ejemplos = filtrar(input_file, output_file, reglas, descartadas=descartadas, muestras=muestras)
+
+    for row in ejemplos:
+        print(f"❌ Eliminado: {row.get('name', '')} - {row.get('course', '')} - {row.get('subjects', '')}")
+    registros_mantenidos = sum(n for (accion, _), n in contadores.items() if accion == 'mantener')
+    registros_eliminados = sum(n for (accion, _), n in contadores.items() if accion == 'descartar')
+    if registros_eliminados > len(ejemplos):
+        print(f"   ... y {registros_eliminados - len(ejemplos):,} más")
+
     print("\n" + "=" * 60)
     print("✅ FILTRADO COMPLETADO")
     print("=" * 60)
-    print(f"📊 Estudiantes: {estudiantes}")
-    print(f"👨‍🏫 Profesores Básica: {profesores_basica}")
-    print(f"👨‍🏫 Profesores Media: {profesores_media}")
-    print(f"✅ Registros mantenidos: {registros_mantenidos}")
-    print(f"❌ Registros eliminados: {registros_eliminados}")
+    for (accion, regla), n in sorted(contadores.items()):
+        icono = '📊' if accion == 'mantener' else '🗑️ '
+        print(f"{icono} {regla} ({accion}): {n:,}")
+    print(f"✅ Registros mantenidos: {registros_mantenidos:,}")
+    print(f"❌ Registros eliminados: {registros_eliminados:,}")
     print(f"\n📄 Archivo generado: {output_file}")
+    if descartadas:
+        print(f"🗑️  Filas eliminadas en: {descartadas}")
     print("=" * 60)
 
 if __name__ == '__main__':
-    filtrar_csv()
+    parser = argparse.ArgumentParser(description='Filtra un CSV según reglas declarativas')
+    parser.add_argument('--entrada', default='users-consolidated-2025.csv', help='CSV de entrada (.gz / .zst se descomprimen)')
+    parser.add_argument('--salida', default='users-consolidated-2025-CORREGIDO.csv', help='CSV de salida (.gz / .zst para comprimir)')
+    parser.add_argument('--reglas', default=None,
+                        help='JSON de reglas (por defecto: asignaturas válidas por nivel)')
+    parser.add_argument('--descartadas', default=None, help='Guarda las filas eliminadas en este CSV')
+    parser.add_argument('--muestras', type=int, default=10, help='Filas eliminadas a mostrar en consola')
+    args = parser.parse_args()
+
+    reglas = cargar_reglas(args.reglas) if args.reglas else REGLAS_ASIGNATURAS
+    filtrar_csv(args.entrada, args.salida, reglas, args.descartadas, args.muestras)
@@ -7,6 +7,15 @@ Total: 1,080 estudiantes (12 cursos × 2 secciones × 45 estudiantes)
 """
 
 import csv
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'scripts'))
+from testdata.identidades import RegistroIdentidades
+from testdata.rut import rut_con_puntos
+
+# Índice de RUTs/usernames/emails ya entregados (persistente si TESTDATA_INDICE está definida)
+REGISTRO = RegistroIdentidades.desde_entorno()
 
 # Listas de nombres y apellidos chilenos comunes
 NOMBRES = [
@@ -51,30 +60,8 @@ ESTUDIANTES_POR_SECCION = 45
 
 def generar_rut(numero):
     """Genera un RUT válido con dígito verificador"""
-    # Usar números base 11.xxx.xxx
-    base = 11000000 + numero
-    
-    # Calcular dígito verificador
-    multiplicadores = [2, 3, 4, 5, 6, 7]
-    suma = 0
-    rut_str = str(base)
-    
-    for i, digito in enumerate(reversed(rut_str)):
-        suma += int(digito) * multiplicadores[i % 6]
-    
-    resto = suma % 11
-    dv = 11 - resto
-    
-    if dv == 11:
-        dv_str = "0"
-    elif dv == 10:
-        dv_str = "K"
-    else:
-        dv_str = str(dv)
-    
-    # Formatear RUT: 11.xxx.xxx-dv
-    rut_formateado = f"{base:,}".replace(",", ".")
-    return f"{rut_formateado}-{dv_str}"
+    # Usar números base 11.xxx.xxx (o el siguiente libre), formato 11.xxx.xxx-dv
+    return rut_con_puntos(REGISTRO.asignar_rut_desde(11000000 + numero))
 
 def generar_estudiantes():
     """Genera la lista completa de estudiantes"""
@@ -95,12 +82,12 @@ def generar_estudiantes():
                 # Email basado en nombre y número
                 email_base = NOMBRES[nombre_idx].lower().replace('á', 'a').replace('é', 'e').replace('í', 'i').replace('ó', 'o').replace('ú', 'u')
                 apellido_limpio = APELLIDOS[apellido1_idx].lower().replace('á', 'a').replace('é', 'e').replace('í', 'i').replace('ó', 'o').replace('ú', 'u')
-                email = f"{email_base}.{apellido_limpio}{contador:04d}@colegio.cl"
+                email = REGISTRO.asignar_email(f"{email_base}.{apellido_limpio}{contador:04d}@colegio.cl")
                 
                 # Generar username: primera letra del nombre + apellido + últimos 4 dígitos del RUT
                 rut_numeros = rut.replace('.', '').replace('-', '')[:-1]  # Quitar dígito verificador
                 ultimos_4 = rut_numeros[-4:]
-                username = f"{email_base[0]}.{apellido_limpio}{ultimos_4}"
+                username = REGISTRO.asignar_username(f"{email_base[0]}.{apellido_limpio}{ultimos_4}")
                 
                 estudiante = {
                     "role": "student",
@@ -157,6 +144,7 @@ if __name__ == "__main__":
     nombre_archivo = "estudiantes_sistema_completo.csv"
     
     guardar_csv(estudiantes, nombre_archivo)
+    REGISTRO.guardar()
     generar_resumen(estudiantes)
     
     print(f"✅ Archivo generado: {nombre_archivo}")
@@ -7,32 +7,19 @@ Cubre todas las asignaturas que quedaron sin profesor
 
 import csv
 import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'scripts'))
+from testdata.identidades import RegistroIdentidades
+from testdata.rut import rut_con_puntos
+
+# Índice de RUTs/usernames/emails ya entregados (persistente si TESTDATA_INDICE está definida)
+REGISTRO = RegistroIdentidades.desde_entorno()
 
 def generar_rut():
-    """Genera un RUT chileno válido con dígito verificador"""
-    base = random.randint(10000000, 25999999)
-    
-    suma = 0
-    multiplicador = 2
-    
-    for digito in str(base)[::-1]:
-        suma += int(digito) * multiplicador
-        multiplicador += 1
-        if multiplicador > 7:
-            multiplicador = 2
-    
-    resto = suma % 11
-    dv = 11 - resto
-    
-    if dv == 11:
-        dv_str = '0'
-    elif dv == 10:
-        dv_str = 'K'
-    else:
-        dv_str = str(dv)
-    
-    rut_str = f"{base:,}".replace(',', '.')
-    return f"{rut_str}-{dv_str}"
+    """Genera un RUT chileno válido con dígito verificador, sin repetir RUTs ya entregados"""
+    return rut_con_puntos(REGISTRO.asignar_rut(random))
 
 def generar_profesores_faltantes():
     """Genera solo los profesores que faltan según el análisis del sistema"""
@@ -190,6 +177,7 @@ def main():
     # Guardar archivo
     nombre_archivo = 'profesores_faltantes.csv'
     guardar_csv(asignaciones, nombre_archivo)
+    REGISTRO.guardar()
     
     # Estadísticas
     print(f"✅ ARCHIVO GENERADO:\n")
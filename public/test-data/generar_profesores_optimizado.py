@@ -7,32 +7,19 @@ Restricciones: Máximo 2 asignaturas Y máximo 2 cursos por profesor
 
 import csv
 import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'scripts'))
+from testdata.identidades import RegistroIdentidades
+from testdata.rut import rut_con_puntos
+
+# Índice de RUTs/usernames/emails ya entregados (persistente si TESTDATA_INDICE está definida)
+REGISTRO = RegistroIdentidades.desde_entorno()
 
 def generar_rut():
-    """Genera un RUT chileno válido con dígito verificador"""
-    base = random.randint(10000000, 25999999)
-    
-    suma = 0
-    multiplicador = 2
-    
-    for digito in str(base)[::-1]:
-        suma += int(digito) * multiplicador
-        multiplicador += 1
-        if multiplicador > 7:
-            multiplicador = 2
-    
-    resto = suma % 11
-    dv = 11 - resto
-    
-    if dv == 11:
-        dv_str = '0'
-    elif dv == 10:
-        dv_str = 'K'
-    else:
-        dv_str = str(dv)
-    
-    rut_str = f"{base:,}".replace(',', '.')
-    return f"{rut_str}-{dv_str}"
+    """Genera un RUT chileno válido con dígito verificador, sin repetir RUTs ya entregados"""
+    return rut_con_puntos(REGISTRO.asignar_rut(random))
 
 def generar_nombres():
     """Genera nombres aleatorios chilenos"""
@@ -87,7 +74,6 @@ def generar_profesores_optimizado():
     
     profesores = []
     asignaciones = []
-    usernames_usados = set()
     
     # Generar profesores para Básica
     # Grupo 1: CNT, HIS
@@ -96,17 +82,12 @@ def generar_profesores_optimizado():
         nombre_completo, username_base = generar_nombres()
         
         # Asegurar username único
-        username = username_base
-        contador = 2
-        while username in usernames_usados:
-            username = f"{username_base}{contador}"
-            contador += 1
-        usernames_usados.add(username)
+        username = REGISTRO.asignar_username(username_base)
         
         profesor = {
             'nombre': nombre_completo,
             'username': username,
-            'email': f"{username}@colegio.cl",
+            'email': REGISTRO.asignar_email(f"{username}@colegio.cl"),
             'rut': generar_rut(),
             'asignaturas': ['CNT', 'HIS'],
             'cursos': cursos_asignados,
@@ -135,17 +116,12 @@ def generar_profesores_optimizado():
         cursos_asignados = cursos_basica[i*2:(i+1)*2]  # 2 cursos cada uno
         nombre_completo, username_base = generar_nombres()
         
-        username = username_base
-        contador = 2
-        while username in usernames_usados:
-            username = f"{username_base}{contador}"
-            contador += 1
-        usernames_usados.add(username)
+        username = REGISTRO.asignar_username(username_base)
         
         profesor = {
             'nombre': nombre_completo,
             'username': username,
-            'email': f"{username}@colegio.cl",
+            'email': REGISTRO.asignar_email(f"{username}@colegio.cl"),
             'rut': generar_rut(),
             'asignaturas': ['LEN', 'MAT'],
             'cursos': cursos_asignados,
@@ -187,17 +163,12 @@ def generar_profesores_optimizado():
         # Profesor 1: cursos 1ro y 2do Medio
         nombre_completo, username_base = generar_nombres()
         
-        username = username_base
-        contador = 2
-        while username in usernames_usados:
-            username = f"{username_base}{contador}"
-            contador += 1
-        usernames_usados.add(username)
+        username = REGISTRO.asignar_username(username_base)
         
         profesor = {
             'nombre': nombre_completo,
             'username': username,
-            'email': f"{username}@colegio.cl",
+            'email': REGISTRO.asignar_email(f"{username}@colegio.cl"),
             'rut': generar_rut(),
             'asignaturas': grupo,
             'cursos': ['1ro Medio', '2do Medio'],
@@ -223,17 +194,12 @@ def generar_profesores_optimizado():
         # Profesor 2: cursos 3ro y 4to Medio
         nombre_completo, username_base = generar_nombres()
         
-        username = username_base
-        contador = 2
-        while username in usernames_usados:
-            username = f"{username_base}{contador}"
-            contador += 1
-        usernames_usados.add(username)
+        username = REGISTRO.asignar_username(username_base)
         
         profesor = {
             'nombre': nombre_completo,
             'username': username,
-            'email': f"{username}@colegio.cl",
+            'email': REGISTRO.asignar_email(f"{username}@colegio.cl"),
             'rut': generar_rut(),
             'asignaturas': grupo,
             'cursos': ['3ro Medio', '4to Medio'],
@@ -283,6 +249,7 @@ def main():
     # Guardar archivo
     nombre_archivo = 'profesores_optimizado.csv'
     guardar_csv(asignaciones, nombre_archivo)
+    REGISTRO.guardar()
     
     # Estadísticas
     print(f"✅ ARCHIVO GENERADO:\n")
@@ -10,34 +10,19 @@ Generador de profesores con asignaciones según reglas del sistema
 
 import csv
 import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'scripts'))
+from testdata.identidades import RegistroIdentidades
+from testdata.rut import rut_con_puntos
+
+# Índice de RUTs/usernames/emails ya entregados (persistente si TESTDATA_INDICE está definida)
+REGISTRO = RegistroIdentidades.desde_entorno()
 
 def generar_rut():
-    """Genera un RUT chileno válido con dígito verificador"""
-    base = random.randint(10000000, 25999999)
-    
-    # Calcular dígito verificador usando módulo 11
-    suma = 0
-    multiplicador = 2
-    
-    for digito in str(base)[::-1]:
-        suma += int(digito) * multiplicador
-        multiplicador += 1
-        if multiplicador > 7:
-            multiplicador = 2
-    
-    resto = suma % 11
-    dv = 11 - resto
-    
-    if dv == 11:
-        dv_str = '0'
-    elif dv == 10:
-        dv_str = 'K'
-    else:
-        dv_str = str(dv)
-    
-    # Formatear con puntos y guión
-    rut_str = f"{base:,}".replace(',', '.')
-    return f"{rut_str}-{dv_str}"
+    """Genera un RUT chileno válido con dígito verificador, sin repetir RUTs ya entregados"""
+    return rut_con_puntos(REGISTRO.asignar_rut(random))
 
 def generar_profesores_y_asignaciones():
     """Genera profesores respetando las reglas: max 2 asignaturas, separación básica/media"""
@@ -75,22 +60,10 @@ def generar_profesores_y_asignaciones():
     
     profesores = []
     asignaciones = []
-    username_usado = set()
     
     def crear_username(nombre, apellido):
-        """Crea un username único"""
-        base = f"{nombre[0].lower()}.{apellido.lower()}"
-        if base not in username_usado:
-            username_usado.add(base)
-            return base
-        
-        # Si ya existe, agregar número
-        contador = 2
-        while f"{base}{contador}" in username_usado:
-            contador += 1
-        username = f"{base}{contador}"
-        username_usado.add(username)
-        return username
+        """Crea un username único (si ya existe, agrega número)"""
+        return REGISTRO.asignar_username(f"{nombre[0].lower()}.{apellido.lower()}")
     
     # PROFESORES DE EDUCACIÓN BÁSICA
     # Necesitamos cubrir 4 asignaturas: CNT, HIS, LEN, MAT
@@ -105,7 +78,7 @@ def generar_profesores_y_asignaciones():
         'role': 'teacher',
         'name': f"{nombre1} {apellido1} {random.choice(apellidos)}",
         'rut': generar_rut(),
-        'email': f"{username1}@colegio.cl",
+        'email': REGISTRO.asignar_email(f"{username1}@colegio.cl"),
         'username': username1,
         'password': '1234',
         'course': '',
@@ -139,7 +112,7 @@ def generar_profesores_y_asignaciones():
         'role': 'teacher',
         'name': f"{nombre2} {apellido2} {random.choice([a for a in apellidos if a not in [apellido1, apellido2]])}",
         'rut': generar_rut(),
-        'email': f"{username2}@colegio.cl",
+        'email': REGISTRO.asignar_email(f"{username2}@colegio.cl"),
         'username': username2,
         'password': '1234',
         'course': '',
@@ -184,7 +157,7 @@ def generar_profesores_y_asignaciones():
             'role': 'teacher',
             'name': f"{nombre} {apellido} {random.choice(apellidos)}",
             'rut': generar_rut(),
-            'email': f"{username}@colegio.cl",
+            'email': REGISTRO.asignar_email(f"{username}@colegio.cl"),
             'username': username,
             'password': '1234',
             'course': '',
@@ -237,6 +210,7 @@ def main():
     # Guardar archivos
     nombre_archivo = 'profesores_asignaciones_completo.csv'
     guardar_csv(asignaciones, nombre_archivo)
+    REGISTRO.guardar()
     
     # Estadísticas
     print(f"\n✅ ARCHIVO GENERADO:\n")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Mide el rendimiento de la carga masiva contra el servidor local que imita
+las rutas (testdata/servidor_carga.py): filas/s y latencia p50/p99 por
+petición para cada combinación de escrituras por commit (--lote), tamaño de
+archivo (--total), filas por petición (--filas) y concurrencia del cliente
+(--concurrencia).
+
+Por defecto levanta el servidor en este mismo proceso; cliente y servidor
+comparten entonces el GIL. Para medir el servidor solo, levántalo aparte con
+bulk-upload-server.py y pasa --url (las opciones del servidor y --lote se
+ignoran en ese caso).
+
+Uso:
+    python3 scripts/bench-bulk-upload.py grades-2025.csv --total 20000 100000 --filas 2000 10000 --concurrencia 1 4
+    python3 scripts/bench-bulk-upload.py attendance-2025.csv --lote 200 450 --latencia-commit 0.08 --json bench.json
+    python3 scripts/bench-bulk-upload.py grades-2025.csv --url http://localhost:8787/api/firebase/bulk-upload-grades
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from testdata.carga_masiva import zona_horaria
+from testdata.documentos import detectar_tipo_ruta
+from testdata.firestore_simulado import FirestoreSimulado
+from testdata.servidor_carga import LOTE_RUTA, RUTA_ASISTENCIA, RUTA_CALIFICACIONES, RutasCarga, ServidorCarga
+from testdata.subida import ClienteCarga, ErrorSubida, job_parte, registros_csv, subir_con_reintentos
+
+
+def percentil(valores, p):
+    """Percentil por rango más cercano (p entre 0 y 100)"""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+def tramos(encabezado, registros, filas):
+    """Cuerpos CSV de `filas` registros cada uno, con el encabezado repetido"""
+    return [encabezado + b'\r\n' + b'\r\n'.join(registros[i:i + filas]) + b'\r\n'
+            for i in range(0, len(registros), filas)]
+
+
+def medir(cliente, cuerpos, concurrencia, job, reintentos):
+    """Sube los cuerpos con `concurrencia` peticiones en vuelo; devuelve las métricas de la corrida"""
+    latencias = []
+    reintentados = [0]
+    lock = threading.Lock()
+
+    def observar(segundos, ok):
+        with lock:
+            if ok:
+                latencias.append(segundos)
+            else:
+                reintentados[0] += 1
+
+    def subir(numero, datos):
+        try:
+            return subir_con_reintentos(cliente, datos, f'{job}.csv', job_parte(job, numero), reintentos,
+                                        espera=0.2, log=lambda *_: None, observar=observar)
+        except ErrorSubida:
+            return None
+
+    inicio = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+        resultados = list(pool.map(subir, range(1, len(cuerpos) + 1), cuerpos))
+    segundos = time.monotonic() - inicio
+    return {
+        'peticiones': len(cuerpos),
+        'fallidas': sum(1 for r in resultados if r is None),
+        'reintentos': reintentados[0],
+        'guardadas': sum(r.get('saved') or 0 for r in resultados if r),
+        'segundos': round(segundos, 3),
+        'p50': round(percentil(latencias, 50), 3),
+        'p99': round(percentil(latencias, 99), 3),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark de la carga masiva contra el servidor local')
+    parser.add_argument('entrada', help='CSV de calificaciones o asistencia (.gz/.zst)')
+    parser.add_argument('--tipo', choices=['calificaciones', 'asistencia'], default=None,
+                        help='Por defecto calificaciones si hay columna de nota')
+    parser.add_argument('--total', type=int, nargs='+', default=[None],
+                        help='Filas del archivo a subir (las primeras N); por defecto todas')
+    parser.add_argument('--filas', type=int, nargs='+', default=[5000], help='Filas por petición')
+    parser.add_argument('--concurrencia', type=int, nargs='+', default=[1, 2, 4], help='Peticiones en vuelo')
+    parser.add_argument('--lote', type=int, nargs='+', default=[LOTE_RUTA], help='Escrituras por commit')
+    parser.add_argument('--reintentos', type=int, default=3)
+    parser.add_argument('--gzip', action='store_true', help='Cuerpos con Content-Encoding: gzip')
+    parser.add_argument('--url', default=None, help='Servidor externo (bulk-upload-server.py u otro)')
+    parser.add_argument('--latencia-commit', type=float, default=0.05, help='Segundos por commit de lote')
+    parser.add_argument('--latencia-op', type=float, default=0.0, help='Segundos extra por escritura del lote')
+    parser.add_argument('--fallos', type=float, default=0.0, help='Probabilidad de que falle un commit de lote')
+    parser.add_argument('--semilla', type=int, default=None)
+    parser.add_argument('--sin-pausas', action='store_true', help='Omite los setTimeout entre lotes de la ruta')
+    parser.add_argument('--tz', default=None, help='Zona horaria del servidor; por defecto la del sistema')
+    parser.add_argument('--json', default=None, help='Guarda los resultados en este archivo')
+    args = parser.parse_args()
+
+    maximo = None if None in args.total else max(args.total)
+    lector = registros_csv(args.entrada)
+    encabezado = next(lector, None)
+    if encabezado is None:
+        print(f"❌ Error: {args.entrada} está vacío")
+        sys.exit(1)
+    registros = list(islice(lector, maximo))
+    lector.close()
+    tipo = args.tipo or detectar_tipo_ruta(next(csv.reader([encabezado.decode('utf-8')])))
+
+    servidor = None
+    if args.url:
+        url = args.url
+        lotes = [None]
+    else:
+        db = FirestoreSimulado(args.latencia_commit, args.latencia_op, args.fallos, args.semilla)
+        servidor = ServidorCarga(('127.0.0.1', 0), RutasCarga(db, zona_horaria(args.tz), pausas=not args.sin_pausas))
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        ruta = RUTA_CALIFICACIONES if tipo == 'calificaciones' else RUTA_ASISTENCIA
+        url = f"http://127.0.0.1:{servidor.server_address[1]}{ruta}"
+        lotes = args.lote
+        print(f"🚀 Servidor local en {url} (commit {args.latencia_commit * 1000:.0f} ms, fallos {args.fallos:.1%}"
+              f"{', sin pausas' if args.sin_pausas else ''})")
+
+    print(f"📄 {len(registros):,} filas de {tipo}\n")
+    print(f"{'lote':>5} {'total':>9} {'filas/pet':>9} {'conc':>4} {'pet':>5} {'reint':>5} {'fall':>4} "
+          f"{'filas/s':>9} {'p50 s':>7} {'p99 s':>7}")
+    resultados = []
+    corrida = 0
+    with ClienteCarga(url, comprimir=args.gzip) as cliente:
+        for lote in lotes:
+            if servidor is not None:
+                servidor.rutas.lote = lote
+            for total in args.total:
+                parte = registros[:total] if total else registros
+                for filas in args.filas:
+                    cuerpos = tramos(encabezado, parte, filas)
+                    for concurrencia in args.concurrencia:
+                        corrida += 1
+                        commits = servidor.rutas.db.commits if servidor else 0
+                        metricas = medir(cliente, cuerpos, concurrencia, f'bench-{int(time.time())}-{corrida}',
+                                         args.reintentos)
+                        resultado = {
+                            'tipo': tipo, 'lote': lote, 'total': len(parte), 'filas': filas,
+                            'concurrencia': concurrencia, **metricas,
+                            'filas_s': round(len(parte) / max(metricas['segundos'], 1e-9), 1),
+                            'commits': servidor.rutas.db.commits - commits if servidor else None,
+                        }
+                        resultados.append(resultado)
+                        print(f"{lote or '-':>5} {len(parte):>9,} {filas:>9,} {concurrencia:>4} "
+                              f"{metricas['peticiones']:>5} {metricas['reintentos']:>5} {metricas['fallidas']:>4} "
+                              f"{resultado['filas_s']:>9,.0f} {metricas['p50']:>7.2f} {metricas['p99']:>7.2f}")
+
+    if servidor is not None:
+        servidor.shutdown()
+        servidor.server_close()
+    mejor = max(resultados, key=lambda r: r['filas_s'] if not r['fallidas'] else 0, default=None)
+    if mejor:
+        print(f"\n🏁 Mejor: lote {mejor['lote'] or '-'}, {mejor['filas']:,} filas/petición × {mejor['concurrencia']} "
+              f"en vuelo → {mejor['filas_s']:,.0f} filas/s (p99 {mejor['p99']:.2f}s)")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"📝 Resultados: {args.json}")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Levanta un servidor local que imita /api/firebase/bulk-upload-grades y
+/api/firebase/bulk-upload-attendance sobre un Firestore simulado (ver
+testdata/servidor_carga.py), para probar y medir la carga sin Firebase.
+
+GET /imports/<jobId> devuelve el progreso de cada carga.
+
+Uso:
+    python3 scripts/bulk-upload-server.py --puerto 8787 --latencia-commit 0.08 --fallos 0.01
+    python3 scripts/upload-grades-parts.py partes/ --job-id prueba \\
+        --url http://localhost:8787/api/firebase/bulk-upload-grades --progreso-url http://localhost:8787/imports/{jobId}
+"""
+
+import argparse
+from collections import Counter
+
+from testdata.carga_masiva import zona_horaria
+from testdata.firestore_simulado import FirestoreSimulado
+from testdata.servidor_carga import LOTE_RUTA, RutasCarga, ServidorCarga
+
+
+def agregar_opciones_servidor(parser):
+    """Opciones del Firestore simulado y de las rutas"""
+    parser.add_argument('--latencia-commit', type=float, default=0.05, help='Segundos por commit de lote')
+    parser.add_argument('--latencia-op', type=float, default=0.0, help='Segundos extra por escritura del lote')
+    parser.add_argument('--fallos', type=float, default=0.0, help='Probabilidad de que falle un commit de lote')
+    parser.add_argument('--semilla', type=int, default=None)
+    parser.add_argument('--sin-pausas', action='store_true', help='Omite los setTimeout entre lotes de la ruta')
+    parser.add_argument('--tz', default=None,
+                        help='Zona horaria del servidor (p. ej. America/Santiago); por defecto la del sistema')
+
+
+def crear_rutas(args, lote=LOTE_RUTA):
+    db = FirestoreSimulado(args.latencia_commit, args.latencia_op, args.fallos, args.semilla)
+    return RutasCarga(db, zona_horaria(args.tz), lote=lote, pausas=not args.sin_pausas)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Servidor local que imita las rutas de carga masiva')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8787)
+    parser.add_argument('--lote', type=int, default=LOTE_RUTA, help='Escrituras por commit (la ruta usa 200)')
+    parser.add_argument('--verboso', action='store_true', help='Registra cada petición HTTP')
+    agregar_opciones_servidor(parser)
+    args = parser.parse_args()
+
+    servidor = ServidorCarga((args.host, args.puerto), crear_rutas(args, args.lote), args.verboso)
+    print(f"🚀 Escuchando en http://{args.host}:{args.puerto} (commit {args.latencia_commit * 1000:.0f} ms, "
+          f"fallos {args.fallos:.1%}, lote {args.lote}{', sin pausas' if args.sin_pausas else ''})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        db = servidor.rutas.db
+        estados = Counter(estado for _, estado, _ in servidor.peticiones)
+        print(f"\n📊 {len(servidor.peticiones)} petición(es) {dict(estados)}; {db.commits:,} commits, "
+              f"{db.commits_fallidos:,} fallidos, {db.escrituras:,} escrituras")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Exporta las actividades (burbujas) que crearía bulk-upload-grades con un CSV
+de calificaciones, en una sola pasada y a un archivo propio: un activityDoc
+por courseId|sectionId|asignatura|tipo|día, con el mismo id, título, tema y
+fechas que la ruta (ver testdata/documentos.py).
+
+La ruta arma ese mapa en memoria durante toda la petición y lo escribe al
+final; con este archivo las actividades pueden cargarse una vez antes de las
+calificaciones. Los id de actividad no dependen del jobId, así que sirven
+para cualquier partición del CSV.
+
+Salida NDJSON (documentos listos para courses/{courseId}/activities/{id}) o
+CSV con la clave del mapa y fechas ISO, según la extensión o --formato.
+Entrada y salida pueden ser .gz/.zst.
+
+Uso:
+    python3 scripts/csv-activities.py grades-2025.csv --anio 2025 --tz America/Santiago
+    python3 scripts/csv-activities.py grades-2025.csv.gz --salida actividades-2025.csv \\
+        --secciones secciones.json --cursos cursos.json
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from testdata.carga_masiva import zona_horaria
+from testdata.documentos import csv_a_actividades, mapa_secciones_formulario
+
+
+def _salida_por_defecto(entrada, formato):
+    nombre = entrada.name
+    for extension in ('.gz', '.zst'):
+        if nombre.endswith(extension):
+            nombre = nombre[:-len(extension)]
+            break
+    return entrada.with_name(f"{Path(nombre).stem}.activities.{formato or 'ndjson'}")
+
+
+def _leer_json(ruta):
+    return ruta.read_text(encoding='utf-8') if ruta else None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Exporta las actividades de un CSV de calificaciones')
+    parser.add_argument('entrada', type=Path)
+    parser.add_argument('--salida', type=Path, default=None,
+                        help='Por defecto <entrada>.activities.ndjson junto a la entrada')
+    parser.add_argument('--formato', choices=['ndjson', 'csv'], default=None,
+                        help='Por defecto según la extensión de --salida (ndjson si no es .csv)')
+    parser.add_argument('--anio', type=int, default=None,
+                        help='Campo year de las actividades (por defecto el año actual, como la ruta)')
+    parser.add_argument('--tz', default=None,
+                        help='Zona horaria del servidor (p. ej. America/Santiago); por defecto la del sistema')
+    parser.add_argument('--secciones', type=Path, default=None,
+                        help='JSON con el arreglo de secciones que envía el frontend (campo sections)')
+    parser.add_argument('--cursos', type=Path, default=None,
+                        help='JSON con el arreglo de cursos que envía el frontend (campo courses)')
+    args = parser.parse_args()
+
+    if not args.entrada.exists():
+        print(f"❌ Error: No se encuentra el archivo {args.entrada}")
+        sys.exit(1)
+
+    # El sectionMap se arma como en la ruta, solo si vienen ambos campos
+    secciones = mapa_secciones_formulario(_leer_json(args.secciones), _leer_json(args.cursos))
+
+    inicio = time.time()
+    salida = args.salida or _salida_por_defecto(args.entrada, args.formato)
+    validas, actividades, rechazos = csv_a_actividades(args.entrada, salida, args.formato, anio=args.anio,
+                                                       zona=zona_horaria(args.tz), secciones=secciones)
+
+    print(f"✅ {actividades:,} actividades de {validas:,} calificaciones → {salida} ({time.time() - inicio:.1f}s)")
+    for motivo, n in rechazos.most_common():
+        print(f"   ❌ Omitidas ({motivo}): {n:,}")
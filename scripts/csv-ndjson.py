@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Convierte un CSV de calificaciones o asistencia a NDJSON con un documento de
+Firestore por línea, con la misma forma e IDs que escribirían
+bulk-upload-grades / bulk-upload-attendance (ver testdata/documentos.py).
+
+Las filas que la ruta rechazaría no se exportan; se resumen por motivo.
+Entrada y salida pueden ser .gz/.zst.
+
+Uso:
+    python3 scripts/csv-ndjson.py grades.csv --job-id import-grades-2025 --anio 2025 --tz America/Santiago
+    python3 scripts/csv-ndjson.py attendance.csv --salida attendance.ndjson.gz --secciones secciones.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from testdata.carga_masiva import zona_horaria
+from testdata.documentos import csv_a_ndjson, orjson
+
+
+def _salida_por_defecto(entrada):
+    nombre = entrada.name
+    for extension in ('.gz', '.zst'):
+        if nombre.endswith(extension):
+            return entrada.with_name(Path(nombre[:-len(extension)]).with_suffix('.ndjson').name + extension)
+    return entrada.with_suffix('.ndjson')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Exporta un CSV de carga como documentos de Firestore en NDJSON')
+    parser.add_argument('entrada', type=Path)
+    parser.add_argument('--salida', type=Path, default=None,
+                        help='Por defecto la entrada con extensión .ndjson (.gz/.zst se conserva)')
+    parser.add_argument('--tipo', choices=['calificaciones', 'asistencia'], default=None,
+                        help='Por defecto calificaciones si hay columna de nota')
+    parser.add_argument('--job-id', default=None,
+                        help='jobId de la carga (prefijo de los docId); los docId solo coinciden con los de Firestore '
+                             'si es el mismo jobId de la subida. Por defecto import-grades-<ms>, como la ruta')
+    parser.add_argument('--anio', type=int, default=None,
+                        help='Campo year de las calificaciones (por defecto el año actual, como la ruta)')
+    parser.add_argument('--tz', default=None,
+                        help='Zona horaria del servidor (p. ej. America/Santiago); por defecto la del sistema')
+    parser.add_argument('--secciones', type=Path, default=None,
+                        help='JSON {"Curso|Sección": sectionId} si el frontend envía el mapa de secciones')
+    args = parser.parse_args()
+
+    if not args.entrada.exists():
+        print(f"❌ Error: No se encuentra el archivo {args.entrada}")
+        sys.exit(1)
+
+    secciones = None
+    if args.secciones:
+        with open(args.secciones, 'r', encoding='utf-8') as f:
+            secciones = json.load(f)
+
+    inicio = time.time()
+    salida = args.salida or _salida_por_defecto(args.entrada)
+    tipo, escritos, rechazos = csv_a_ndjson(args.entrada, salida, args.tipo, job_id=args.job_id, anio=args.anio,
+                                            zona=zona_horaria(args.tz), secciones=secciones)
+
+    print(f"✅ {escritos:,} documentos ({tipo}) → {salida} ({time.time() - inicio:.1f}s"
+          f"{', orjson' if orjson else ''})")
+    for motivo, n in rechazos.most_common():
+        print(f"   ❌ Omitidas ({motivo}): {n:,}")
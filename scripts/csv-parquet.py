@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Convierte CSV de calificaciones, asistencia, estudiantes o asignaciones a
+Parquet columnar y de vuelta a CSV (ver testdata/columnar.py).
+
+La dirección se decide por la extensión de la entrada: .parquet -> CSV,
+cualquier otra -> Parquet. Ambas conversiones son en streaming por lotes.
+Requiere pyarrow.
+
+Uso:
+    python3 scripts/csv-parquet.py grades-consolidated-2025.csv
+    python3 scripts/csv-parquet.py grades-consolidated-2025.parquet --columnas RUT,Asignatura,Nota
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from testdata.columnar import csv_a_parquet, parquet_a_csv
+from testdata.normalizacion import ALIAS_POR_TIPO
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convierte CSV <-> Parquet')
+    parser.add_argument('entrada', type=Path)
+    parser.add_argument('--salida', type=Path, default=None,
+                        help='Por defecto la entrada con extensión .parquet / .csv')
+    parser.add_argument('--tipo', choices=sorted(ALIAS_POR_TIPO), default=None,
+                        help='Tipo de archivo (por defecto se detecta por los encabezados)')
+    parser.add_argument('--sin-tipos', action='store_true',
+                        help='Guarda fechas y notas como texto (formatos no ISO o no numéricos)')
+    parser.add_argument('--columnas', default=None,
+                        help='Solo al convertir a CSV: columnas a leer, separadas por coma')
+    parser.add_argument('--bom', action='store_true', help='Solo al convertir a CSV: escribe BOM')
+    args = parser.parse_args()
+
+    if not args.entrada.exists():
+        print(f"❌ Error: No se encuentra el archivo {args.entrada}")
+        sys.exit(1)
+
+    inicio = time.time()
+    a_csv = args.entrada.suffix.lower() == '.parquet'
+    salida = args.salida or args.entrada.with_suffix('.csv' if a_csv else '.parquet')
+    try:
+        if a_csv:
+            columnas = [c.strip() for c in args.columnas.split(',')] if args.columnas else None
+            filas = parquet_a_csv(args.entrada, salida, columnas, args.bom)
+            tipo = None
+        else:
+            tipo, filas = csv_a_parquet(args.entrada, salida, args.tipo, not args.sin_tipos)
+    except ValueError as e:
+        print(f"❌ {e}")
+        if not a_csv and 'Fila' in str(e):
+            print("💡 Usa --sin-tipos para guardar fechas y notas como texto")
+        sys.exit(1)
+
+    tamano_entrada = args.entrada.stat().st_size
+    tamano_salida = salida.stat().st_size
+    print(f"✅ {filas:,} filas{f' ({tipo})' if tipo else ''} → {salida} ({time.time() - inicio:.1f}s)")
+    print(f"   📦 {tamano_entrada / (1 << 20):.1f} MB → {tamano_salida / (1 << 20):.1f} MB "
+          f"({tamano_salida / max(tamano_entrada, 1):.0%})")
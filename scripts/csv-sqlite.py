@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Precarga una base SQLite con el esquema de la capa SQL de la app a partir
+de los CSV generados (ver testdata/base_sql.py): calificaciones y asistencia
+como las dejaría el modo SQL de la carga masiva, más usuarios y asignaciones
+de profesores.
+
+Cada opción acepta varios archivos (.csv, .csv.gz, .csv.zst). La base de
+salida se crea de cero.
+
+Uso:
+    python3 scripts/csv-sqlite.py --salida bench.sqlite --anio 2025 \\
+        --calificaciones grades-2025-1.csv grades-2025-2.csv --asistencia attendance-2025.csv \\
+        --usuarios users.csv --asignaciones teacher-assignments.csv
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from testdata.base_sql import (
+    ExportadorSqlite,
+    filas_asistencia,
+    filas_calificaciones,
+    filas_por_alias,
+    leer_csv_cliente,
+)
+from testdata.carga_masiva import leer_csv_como_ruta, zona_horaria
+from testdata.comprimido import abrir
+from testdata.normalizacion import ALIAS_ASIGNACIONES, ALIAS_USUARIOS
+
+TABLA_POR_TIPO = {
+    'calificaciones': 'grades',
+    'asistencia': 'attendance',
+    'usuarios': 'users',
+    'asignaciones': 'teacher_assignments',
+}
+
+
+def _tuplas(tipo, archivo, anio, zona, omitidas):
+    if tipo in ('calificaciones', 'asistencia'):
+        encabezados, filas = leer_csv_cliente(archivo)
+        armar = filas_calificaciones if tipo == 'calificaciones' else filas_asistencia
+        return armar(encabezados, filas, anio, zona, omitidas)
+    encabezados, filas = leer_csv_como_ruta(archivo)
+    alias = ALIAS_USUARIOS if tipo == 'usuarios' else ALIAS_ASIGNACIONES
+    return filas_por_alias(encabezados, (valores for _, valores in filas), alias)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precarga una base SQLite con el esquema SQL de la app')
+    parser.add_argument('--salida', type=Path, required=True, help='Archivo SQLite (se reemplaza si existe)')
+    for tipo in TABLA_POR_TIPO:
+        parser.add_argument(f'--{tipo}', type=Path, nargs='+', default=[])
+    parser.add_argument('--anio', type=int, default=None,
+                        help='Campo year de las calificaciones (el año seleccionado en la UI; por defecto el actual)')
+    parser.add_argument('--tz', default=None,
+                        help='Zona horaria del navegador (p. ej. America/Santiago); por defecto la del sistema')
+    args = parser.parse_args()
+
+    entradas = [(tipo, ruta) for tipo in TABLA_POR_TIPO for ruta in getattr(args, tipo)]
+    if not entradas:
+        parser.error('Indica al menos un archivo (--calificaciones, --asistencia, --usuarios o --asignaciones)')
+    faltantes = [ruta for _, ruta in entradas if not ruta.exists()]
+    if faltantes:
+        print(f"❌ Error: No se encuentra el archivo {faltantes[0]}")
+        sys.exit(1)
+
+    anio = args.anio or datetime.now().year
+    zona = zona_horaria(args.tz)
+    inicio = time.time()
+    with ExportadorSqlite(args.salida) as exportador:
+        for tipo, ruta in entradas:
+            omitidas = Counter()
+            t = time.time()
+            with abrir(ruta, 'r', encoding='utf-8-sig', newline='') as f:
+                n = exportador.cargar(TABLA_POR_TIPO[tipo], _tuplas(tipo, f, anio, zona, omitidas))
+            print(f"📥 {ruta.name}: {n:,} filas → {TABLA_POR_TIPO[tipo]} ({time.time() - t:.1f}s)")
+            for motivo, cantidad in omitidas.most_common():
+                print(f"   ⚠️ Omitidas ({motivo}): {cantidad:,}")
+        t = time.time()
+    print(f"🗂️  Índices y deduplicación: {time.time() - t:.1f}s")
+
+    for tabla, filas in exportador.filas.items():
+        if filas:
+            repetidas = exportador.repetidas.get(tabla, 0)
+            print(f"   📊 {tabla}: {filas - repetidas:,}" + (f" ({repetidas:,} id repetidos, gana la última)"
+                                                          if repetidas else ''))
+    print(f"\n✅ {args.salida} ({args.salida.stat().st_size / (1 << 20):.1f} MB, {time.time() - inicio:.1f}s)")
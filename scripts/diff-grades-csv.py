@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Compara dos versiones de un CSV consolidado de calificaciones y genera solo
+la diferencia, para subir una corrección sin recargar el archivo completo.
+
+Las filas se identifican por la clave natural de la calificación (por
+defecto RUT + Curso + Sección + Asignatura + Tipo + Fecha, ver
+README-GRADES-2025.md). Resultado, en la carpeta de salida:
+  - agregadas.csv   filas cuya clave solo existe en la versión nueva
+  - cambiadas.csv   misma clave, otros valores (se escribe la fila nueva)
+  - eliminadas.csv  filas cuya clave solo existe en la versión anterior
+agregadas + cambiadas se pueden subir directo con la carga masiva. Para que
+las cambiadas reemplacen sus documentos en vez de crear otros, la carga debe
+usar el mismo jobId que la original (forma parte del docId).
+
+Memoria acotada: ambas versiones se reparten en particiones en disco por
+crc32(clave); cada partición de la versión anterior se carga en un dict y
+la de la nueva se recorre contra él. Los archivos de salida conservan el
+orden de la versión nueva (anterior para eliminadas) intercalando las
+corridas por número de fila.
+
+Las versiones pueden venir en .gz/.zst y con --comprimir las tres salidas
+se escriben comprimidas (testdata.comprimido).
+
+Uso:
+    python3 scripts/diff-grades-csv.py ANTERIOR.csv NUEVO.csv --salida delta/
+    python3 scripts/diff-grades-csv.py ANTERIOR.csv.gz NUEVO.csv.gz --salida delta/ --comprimir gz
+"""
+
+import argparse
+import csv
+import heapq
+import sys
+import tempfile
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+
+from testdata.comprimido import abrir, tamano_estimado
+
+CLAVE_POR_DEFECTO = ('RUT', 'Curso', 'Sección', 'Asignatura', 'Tipo', 'Fecha')
+# Bytes de memoria por byte de CSV al cargar una partición en un dict
+FACTOR_MEMORIA = 6
+MAX_PARTICIONES = 256  # Archivos abiertos a la vez al particionar y al intercalar
+SALIDAS = ('agregadas', 'cambiadas', 'eliminadas')
+
+
+def _normalizar_clave(valores, indices, i_tipo):
+    return tuple(valores[i].strip().lower() if i == i_tipo else valores[i].strip() for i in indices)
+
+
+def _particionar(ruta, encabezados_destino, clave, particiones, carpeta, prefijo):
+    """
+    Reparte un CSV en `particiones` archivos con filas [numero, *valores],
+    columnas reordenadas según encabezados_destino. Devuelve (filas, encabezados)
+    """
+    with abrir(ruta, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        encabezados = next(reader, [])
+        if encabezados_destino is None:
+            encabezados_destino = encabezados
+        faltantes = [c for c in clave if c not in encabezados]
+        if faltantes:
+            print(f"❌ Error: {ruta} no tiene las columnas de clave: {', '.join(faltantes)}")
+            sys.exit(1)
+        # Columnas de la versión destino tomadas de esta (las que no existen quedan vacías)
+        origen = [encabezados.index(c) if c in encabezados else None for c in encabezados_destino]
+        indices = [encabezados_destino.index(c) for c in clave]
+        i_tipo = encabezados_destino.index('Tipo') if 'Tipo' in clave else None
+        ancho = len(encabezados)
+
+        archivos = [open(carpeta / f"{prefijo}{n:04d}.csv", 'w', encoding='utf-8', newline='')
+                    for n in range(particiones)]
+        total = 0
+        try:
+            escritores = [csv.writer(a) for a in archivos]
+            for numero, valores in enumerate(reader):
+                if not valores:
+                    continue
+                if len(valores) < ancho:
+                    valores += [''] * (ancho - len(valores))
+                fila = [valores[i] if i is not None else '' for i in origen]
+                k = _normalizar_clave(fila, indices, i_tipo)
+                n = zlib.crc32('\x1f'.join(k).encode('utf-8')) % particiones
+                escritores[n].writerow([numero, *fila])
+                total += 1
+        finally:
+            for a in archivos:
+                a.close()
+    return total, encabezados_destino
+
+
+def _con_ocurrencia(filas, indices, i_tipo):
+    """Claves repetidas dentro de una versión se distinguen por su n-ésima aparición"""
+    vistas = Counter()
+    for fila in filas:
+        k = _normalizar_clave(fila[1:], indices, i_tipo)
+        vistas[k] += 1
+        yield (k, vistas[k]), fila
+
+
+def diff(anterior, nuevo, carpeta_salida, clave=CLAVE_POR_DEFECTO, memoria_mb=512, tmpdir=None, comprimir=None):
+    inicio = time.time()
+    carpeta_salida = Path(carpeta_salida)
+    carpeta_salida.mkdir(parents=True, exist_ok=True)
+
+    tamano = tamano_estimado(anterior) + tamano_estimado(nuevo)
+    particiones = max(1, min(MAX_PARTICIONES, -(-tamano * FACTOR_MEMORIA // (max(1, memoria_mb) << 20))))
+    print(f"🧮 Presupuesto: {memoria_mb} MB → {particiones} partición(es)")
+
+    contadores = Counter()
+    columnas_cambiadas = Counter()
+    with tempfile.TemporaryDirectory(prefix='diff-', dir=tmpdir) as tmp:
+        tmp = Path(tmp)
+        print(f"📂 Particionando versión nueva: {nuevo}")
+        filas_nuevo, encabezados = _particionar(nuevo, None, clave, particiones, tmp, 'n')
+        print(f"📂 Particionando versión anterior: {anterior}")
+        filas_anterior, _ = _particionar(anterior, encabezados, clave, particiones, tmp, 'a')
+        print(f"📊 Filas: anterior {filas_anterior:,} | nueva {filas_nuevo:,}")
+
+        indices = [encabezados.index(c) for c in clave]
+        i_tipo = encabezados.index('Tipo') if 'Tipo' in clave else None
+
+        corridas = {s: [] for s in SALIDAS}
+        for n in range(particiones):
+            with open(tmp / f"a{n:04d}.csv", 'r', encoding='utf-8', newline='') as f:
+                previas = dict(_con_ocurrencia(csv.reader(f), indices, i_tipo))
+            (tmp / f"a{n:04d}.csv").unlink()
+
+            archivos = {s: open(tmp / f"{s}{n:04d}.csv", 'w', encoding='utf-8', newline='') for s in SALIDAS}
+            try:
+                escritores = {s: csv.writer(a) for s, a in archivos.items()}
+                with open(tmp / f"n{n:04d}.csv", 'r', encoding='utf-8', newline='') as f:
+                    for k, fila in _con_ocurrencia(csv.reader(f), indices, i_tipo):
+                        previa = previas.pop(k, None)
+                        if previa is None:
+                            escritores['agregadas'].writerow(fila)
+                            contadores['agregadas'] += 1
+                        elif previa[1:] != fila[1:]:
+                            escritores['cambiadas'].writerow(fila)
+                            contadores['cambiadas'] += 1
+                            for columna, a, b in zip(encabezados, previa[1:], fila[1:]):
+                                if a != b:
+                                    columnas_cambiadas[columna] += 1
+                        else:
+                            contadores['sin cambios'] += 1
+                # Lo que quedó de la versión anterior ya no existe en la nueva
+                for fila in sorted(previas.values(), key=lambda fila: int(fila[0])):
+                    escritores['eliminadas'].writerow(fila)
+                    contadores['eliminadas'] += 1
+            finally:
+                for a in archivos.values():
+                    a.close()
+            (tmp / f"n{n:04d}.csv").unlink()
+            del previas
+            for s in SALIDAS:
+                corridas[s].append(tmp / f"{s}{n:04d}.csv")
+
+        for s in SALIDAS:
+            archivos = [open(c, 'r', encoding='utf-8', newline='') for c in corridas[s]]
+            try:
+                salida = carpeta_salida / f"{s}.csv{f'.{comprimir}' if comprimir else ''}"
+                with abrir(salida, 'w', encoding='utf-8', newline='') as out:
+                    writer = csv.writer(out)
+                    writer.writerow(encabezados)
+                    for fila in heapq.merge(*(csv.reader(a) for a in archivos), key=lambda fila: int(fila[0])):
+                        writer.writerow(fila[1:])
+            finally:
+                for a in archivos:
+                    a.close()
+
+    print(f"\n✅ Diferencia generada en {carpeta_salida}/ ({time.time() - inicio:.1f}s)")
+    print(f"   ➕ Agregadas: {contadores['agregadas']:,}")
+    print(f"   ✏️  Cambiadas: {contadores['cambiadas']:,}")
+    print(f"   ➖ Eliminadas: {contadores['eliminadas']:,}")
+    print(f"   ✔️  Sin cambios: {contadores['sin cambios']:,}")
+    if columnas_cambiadas:
+        print(f"   📋 Columnas modificadas: " + ', '.join(f"{c} ({n:,})" for c, n in columnas_cambiadas.most_common()))
+    a_subir = contadores['agregadas'] + contadores['cambiadas']
+    print(f"\n💡 Filas a subir: {a_subir:,} de {filas_nuevo:,} ({a_subir / max(filas_nuevo, 1):.1%})")
+    return contadores
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Diferencia entre dos versiones de un CSV de calificaciones')
+    parser.add_argument('anterior', type=Path)
+    parser.add_argument('nuevo', type=Path)
+    parser.add_argument('--salida', type=Path, default=Path('delta'), help='Carpeta para agregadas/cambiadas/eliminadas.csv')
+    parser.add_argument('--clave', default=','.join(CLAVE_POR_DEFECTO),
+                        help='Columnas de la clave natural, separadas por coma')
+    parser.add_argument('--memoria-mb', type=int, default=512)
+    parser.add_argument('--tmpdir', type=Path, default=None)
+    parser.add_argument('--comprimir', choices=['gz', 'zst'], default=None,
+                        help='Escribe agregadas/cambiadas/eliminadas como .csv.gz o .csv.zst')
+    args = parser.parse_args()
+
+    for ruta in (args.anterior, args.nuevo):
+        if not ruta.exists():
+            print(f"❌ Error: No se encuentra el archivo {ruta}")
+            sys.exit(1)
+    diff(args.anterior, args.nuevo, args.salida, tuple(c.strip() for c in args.clave.split(',')),
+         args.memoria_mb, args.tmpdir, args.comprimir)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Carga en seco: pasa un CSV de calificaciones o asistencia por la réplica de
+bulk-upload-grades / bulk-upload-attendance (testdata/servidor_carga.py)
+sobre un Firestore en memoria (FirestoreEnMemoria) y resume qué escribiría
+la carga de verdad, sin Firebase ni servidor:
+
+- escrituras por colección (courses, grades, activities, attendance,
+  imports), cuántas crean un documento y cuántas sobrescriben uno existente;
+- distribución del tamaño de los documentos (bytes según las reglas de
+  almacenamiento de Firestore);
+- commits de lote y escrituras sueltas, y el tiempo proyectado de la carga
+  con --latencia-commit / --latencia-op más las pausas entre lotes de la ruta.
+
+Por defecto el archivo completo va en una sola petición, como lo sube el
+navegador; con --filas se parte en peticiones de ese tamaño, cada una con
+su jobId (<job-id>-001, ...) como upload-grades-parts.py.
+
+Uso:
+    python3 scripts/dry-run-bulk-upload.py grades-2025.csv --job-id carga-2025 --anio 2025 --tz America/Santiago
+    python3 scripts/dry-run-bulk-upload.py grades-2025.csv --filas 20000 --latencia-commit 0.08 --json seco.json
+    python3 scripts/dry-run-bulk-upload.py attendance-2025.csv.gz --tipo asistencia --guardar
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+from testdata.carga_masiva import zona_horaria
+from testdata.comprimido import abrir
+from testdata.documentos import detectar_tipo_ruta
+from testdata.firestore_simulado import MAX_TAMANO_DOCUMENTO, FirestoreEnMemoria
+from testdata.servidor_carga import LOTE_RUTA, RutasCarga
+from testdata.subida import job_parte, registros_csv
+
+ORDEN_COLECCIONES = ['courses', 'grades', 'activities', 'attendance', 'imports', '_health_check']
+
+
+def peticiones(ruta, filas, job):
+    """(jobId, cuerpo) de cada petición: el archivo tal cual o tramos de `filas` registros"""
+    if not filas:
+        with abrir(ruta, 'rb') as f:
+            yield job, f.read()
+        return
+    registros = registros_csv(ruta)
+    encabezado = next(registros, None)
+    if encabezado is None:
+        return
+    numero = 0
+    tramo = []
+    for registro in registros:
+        tramo.append(registro)
+        if len(tramo) >= filas:
+            numero += 1
+            yield job_parte(job, numero), encabezado + b'\r\n' + b'\r\n'.join(tramo) + b'\r\n'
+            tramo = []
+    if tramo:
+        yield job_parte(job, numero + 1), encabezado + b'\r\n' + b'\r\n'.join(tramo) + b'\r\n'
+
+
+def percentiles(valores, *ps):
+    """Percentiles por rango más cercano de un arreglo de enteros"""
+    ordenados = sorted(valores)
+    if not ordenados:
+        return [0] * len(ps)
+    return [ordenados[max(0, -(-p * len(ordenados) // 100) - 1)] for p in ps]
+
+
+def resumen_colecciones(db):
+    resumen = {}
+    for nombre in sorted(db.cuentas, key=lambda n: (ORDEN_COLECCIONES + [n]).index(n)):
+        cuenta = db.cuentas[nombre]
+        p50, p95, p99 = percentiles(cuenta.tamanos, 50, 95, 99)
+        resumen[nombre] = {
+            'escrituras': cuenta.escrituras, 'creados': cuenta.creados, 'sobrescritos': cuenta.sobrescritos,
+            'borrados': cuenta.borrados, 'bytes': cuenta.bytes, 'p50': p50, 'p95': p95, 'p99': p99,
+            'max': max(cuenta.tamanos, default=0),
+        }
+    return resumen
+
+
+def _leer_json(ruta):
+    return ruta.read_text(encoding='utf-8') if ruta else None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Simula una carga masiva en memoria y cuenta sus escrituras')
+    parser.add_argument('entrada', type=Path, help='CSV de calificaciones o asistencia (.gz/.zst)')
+    parser.add_argument('--tipo', choices=['calificaciones', 'asistencia'], default=None,
+                        help='Por defecto calificaciones si hay columna de nota')
+    parser.add_argument('--job-id', default='dry-run', help='jobId de la carga (prefijo de los docId)')
+    parser.add_argument('--anio', type=int, default=None, help='Campo year del formulario (el año seleccionado)')
+    parser.add_argument('--tz', default=None,
+                        help='Zona horaria del servidor (p. ej. America/Santiago); por defecto la del sistema')
+    parser.add_argument('--secciones', type=Path, default=None,
+                        help='JSON con el arreglo de secciones que envía el frontend (campo sections)')
+    parser.add_argument('--cursos', type=Path, default=None,
+                        help='JSON con el arreglo de cursos que envía el frontend (campo courses)')
+    parser.add_argument('--filas', type=int, default=None,
+                        help='Filas por petición; por defecto el archivo completo en una petición')
+    parser.add_argument('--lote', type=int, default=LOTE_RUTA, help='Escrituras por commit (la ruta usa 200)')
+    parser.add_argument('--latencia-commit', type=float, default=0.05,
+                        help='Segundos por commit o escritura suelta, para la proyección')
+    parser.add_argument('--latencia-op', type=float, default=0.0,
+                        help='Segundos extra por escritura, para la proyección')
+    parser.add_argument('--guardar', action='store_true',
+                        help='Guarda los documentos completos (usa más memoria; habilita los conteos por año)')
+    parser.add_argument('--json', type=Path, default=None, help='Guarda el resumen en este archivo')
+    args = parser.parse_args()
+
+    if not args.entrada.exists():
+        print(f"❌ Error: No se encuentra el archivo {args.entrada}")
+        sys.exit(1)
+
+    tipo = args.tipo
+    if tipo is None:
+        with abrir(args.entrada, 'r', encoding='utf-8-sig', newline='') as f:
+            tipo = detectar_tipo_ruta(next(csv.reader(f), []))
+
+    db = FirestoreEnMemoria(guardar=args.guardar)
+    rutas = RutasCarga(db, zona_horaria(args.tz), lote=args.lote, pausas=False)
+    subir = rutas.calificaciones if tipo == 'calificaciones' else rutas.asistencia
+    campos = {'year': str(args.anio or ''), 'sections': _leer_json(args.secciones),
+              'courses': _leer_json(args.cursos)}
+
+    inicio = time.time()
+    respuestas = []
+    for job_id, cuerpo in peticiones(args.entrada, args.filas, args.job_id):
+        estado, respuesta = subir({**campos, 'jobId': job_id}, (args.entrada.name, cuerpo))
+        respuestas.append(respuesta)
+        if estado != 200:
+            print(f"❌ {job_id}: HTTP {estado} — {respuesta.get('error')}")
+    segundos = time.time() - inicio
+
+    colecciones = resumen_colecciones(db)
+    proyectado = db.commits * args.latencia_commit + db.escrituras * args.latencia_op + rutas.pausado
+    exitosas = [r for r in respuestas if r.get('success')]
+    resumen = {
+        'tipo': tipo,
+        'peticiones': len(respuestas),
+        'fallidas': len(respuestas) - len(exitosas),
+        'guardadas': sum(r.get('saved') or 0 for r in exitosas),
+        'actividades': sum(r.get('activities') or 0 for r in exitosas),
+        'errores_fila': sum(r['totalErrors'] if 'totalErrors' in r else r.get('errors') or 0 for r in exitosas),
+        'commits_lote': db.commits_lote,
+        'escrituras_lote': db.escrituras_lote,
+        'escrituras_sueltas': db.escrituras - db.escrituras_lote,
+        'escrituras': db.escrituras,
+        'pausas_s': round(rutas.pausado, 2),
+        'proyectado_s': round(proyectado, 1),
+        'colecciones': colecciones,
+    }
+
+    print(f"🧪 Carga en seco de {args.entrada} ({tipo}): {len(respuestas)} petición(es) en {segundos:.1f}s")
+    print(f"   ✅ {resumen['guardadas']:,} guardadas, {resumen['actividades']:,} actividades, "
+          f"{resumen['errores_fila']:,} errores de fila")
+    print(f"\n{'colección':<14} {'escrituras':>10} {'creados':>9} {'sobrescr.':>9} {'MB':>8} "
+          f"{'p50 B':>6} {'p95 B':>6} {'p99 B':>6} {'máx B':>6}")
+    for nombre, c in colecciones.items():
+        print(f"{nombre:<14} {c['escrituras']:>10,} {c['creados']:>9,} {c['sobrescritos']:>9,} "
+              f"{c['bytes'] / 1e6:>8.1f} {c['p50']:>6,} {c['p95']:>6,} {c['p99']:>6,} {c['max']:>6,}")
+    print(f"\n📦 {db.commits_lote:,} commits de lote ({db.escrituras_lote:,} escrituras) y "
+          f"{resumen['escrituras_sueltas']:,} escrituras sueltas")
+    print(f"⏱️ Proyección: {proyectado:,.1f}s ({db.commits:,} × {args.latencia_commit * 1000:.0f} ms"
+          f"{f' + {db.escrituras:,} × {args.latencia_op * 1000:.1f} ms' if args.latencia_op else ''}"
+          f" + {rutas.pausado:,.1f}s de pausas de la ruta)")
+    if any(c['max'] > MAX_TAMANO_DOCUMENTO for c in colecciones.values()):
+        print(f"⚠️ Hay documentos sobre el máximo de Firestore ({MAX_TAMANO_DOCUMENTO:,} bytes)")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resumen, f, ensure_ascii=False, indent=2)
+        print(f"📝 Resumen: {args.json}")
@@ -8,17 +8,314 @@ Este script:
 4. Genera nuevo CSV sin duplicados que Firebase pueda cargar completamente
 """
 
+import argparse
 import csv
+import hashlib
+import heapq
 import sys
+import tempfile
+import zlib
+from array import array
 from collections import defaultdict
 from datetime import datetime, timedelta
 from pathlib import Path
 
-def main():
-    # Rutas
-    input_csv = Path('/workspaces/superjf_v17/public/test-data/grades-consolidated-2025-COMPLETO.csv')
-    output_csv = Path('/workspaces/superjf_v17/public/test-data/grades-consolidated-2025-UNICO.csv')
-    
+from testdata.comprimido import abrir, compresion, tamano_estimado
+from testdata.lector_mmap import FormateadorCsv, LectorMmap, es_canonico
+
+INPUT_CSV = Path('/workspaces/superjf_v17/public/test-data/grades-consolidated-2025-COMPLETO.csv')
+OUTPUT_CSV = Path('/workspaces/superjf_v17/public/test-data/grades-consolidated-2025-UNICO.csv')
+
+COLUMNAS_CLAVE = ('RUT', 'Curso', 'Asignatura', 'Tipo', 'Fecha')
+# Bytes de memoria por byte de CSV al agrupar una partición (listas + tuplas)
+FACTOR_MEMORIA = 6
+MAX_PARTICIONES = 512  # Archivos abiertos a la vez durante el particionado
+CUBETAS_HUELLAS = 1024  # Cubetas por los 10 bits altos de la huella al buscar repetidas
+
+def ajustar_grupo(filas, i_fecha):
+    """
+    Aplica la regla de duplicados a las filas (listas) de una misma clave:
+    la primera mantiene su fecha y la n-ésima recibe +n segundos.
+    Devuelve cuántas filas se corrigieron.
+    """
+    corregidas = 0
+    for seq_num in range(1, len(filas)):
+        try:
+            original_date = datetime.strptime(filas[seq_num][i_fecha], '%Y-%m-%d')
+        except ValueError:
+            continue  # Si hay error, mantener original
+        filas[seq_num][i_fecha] = (original_date + timedelta(seconds=seq_num)).strftime('%Y-%m-%d %H:%M:%S')
+        corregidas += 1
+    return corregidas
+
+def _indices_clave(headers):
+    try:
+        return [headers.index(c) for c in COLUMNAS_CLAVE]
+    except ValueError as e:
+        print(f"❌ Error: columna requerida no encontrada ({e})")
+        sys.exit(1)
+
+def _normalizar(valores, ancho):
+    """Igual que DictReader + DictWriter: rellena con '' las filas cortas"""
+    if len(valores) < ancho:
+        valores.extend([''] * (ancho - len(valores)))
+    return valores
+
+def clave_fila(valores, indices):
+    i_rut, i_curso, i_asignatura, i_tipo, i_fecha = indices
+    rut, curso, asignatura, tipo, fecha = (
+        valores[i_rut], valores[i_curso], valores[i_asignatura], valores[i_tipo], valores[i_fecha])
+    return (rut.strip(), curso.strip(), asignatura.strip(), tipo.strip().lower(), fecha.strip())
+
+def deduplicar_externo(input_csv, output_csv, memoria_mb=512, tmpdir=None):
+    """
+    Deduplicación con memoria acotada por particiones hash en disco:
+    1. Cada fila (con su número de fila) va a la partición crc32(clave) % P,
+       así todos los duplicados de una clave quedan en la misma partición.
+    2. Cada partición se agrupa en memoria, se corrige con la misma regla de
+       segundos y se escribe como corrida ordenada por la primera aparición
+       del grupo.
+    3. Las corridas se intercalan con heapq.merge, de modo que el archivo
+       final es idéntico al del modo en memoria.
+    """
+    tamano = tamano_estimado(input_csv)
+    particiones = max(1, min(MAX_PARTICIONES, -(-tamano * FACTOR_MEMORIA // (max(1, memoria_mb) << 20))))
+    print(f"🧮 Presupuesto: {memoria_mb} MB → {particiones} partición(es)")
+
+    total_filas = claves_unicas = claves_dup = registros_dup = duplicates_fixed = 0
+
+    with tempfile.TemporaryDirectory(prefix='dedup-', dir=tmpdir) as carpeta:
+        carpeta = Path(carpeta)
+
+        # 1. Particionar
+        with abrir(input_csv, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            headers = next(reader)
+            indices = _indices_clave(headers)
+            ancho = len(headers)
+            archivos = [open(carpeta / f"p{n:04d}.csv", 'w', encoding='utf-8', newline='') for n in range(particiones)]
+            try:
+                escritores = [csv.writer(a) for a in archivos]
+                for idx, valores in enumerate(reader):
+                    if not valores:
+                        continue  # Línea vacía: DictReader la omite
+                    valores = _normalizar(valores, ancho)[:ancho]
+                    clave = clave_fila(valores, indices)
+                    n = zlib.crc32('\x1f'.join(clave).encode('utf-8')) % particiones
+                    escritores[n].writerow([idx, *valores])
+                    total_filas += 1
+            finally:
+                for a in archivos:
+                    a.close()
+        print(f"📊 Filas leídas: {total_filas:,}")
+
+        # 2. Resolver cada partición en una corrida ordenada
+        print(f"\n⚙️  Procesando duplicados por partición...")
+        i_fecha = indices[COLUMNAS_CLAVE.index('Fecha')]
+        corridas = []
+        for n in range(particiones):
+            particion = carpeta / f"p{n:04d}.csv"
+            grupos = defaultdict(list)
+            with open(particion, 'r', encoding='utf-8', newline='') as f:
+                for fila in csv.reader(f):
+                    grupos[clave_fila(fila, [i + 1 for i in indices])].append(fila)
+            particion.unlink()
+
+            corrida = carpeta / f"r{n:04d}.csv"
+            with open(corrida, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                for filas in grupos.values():
+                    claves_unicas += 1
+                    if len(filas) > 1:
+                        claves_dup += 1
+                        registros_dup += len(filas) - 1
+                        duplicates_fixed += ajustar_grupo(filas, i_fecha + 1)
+                        # Todo el grupo sale en la posición de su primera aparición
+                        primero = filas[0][0]
+                        for fila in filas:
+                            fila[0] = primero
+                    writer.writerows(filas)
+            corridas.append(corrida)
+            del grupos
+
+        print(f"\n🔍 Análisis de duplicados:")
+        print(f"   - Total de claves únicas: {claves_unicas:,}")
+        print(f"   - Claves con duplicados: {claves_dup:,}")
+        print(f"   - Total de registros duplicados: {registros_dup:,}")
+        print(f"✅ Duplicados procesados: {duplicates_fixed:,}")
+
+        # 3. Intercalar corridas
+        print(f"\n💾 Escribiendo CSV limpio: {output_csv}")
+        archivos = [open(c, 'r', encoding='utf-8', newline='') for c in corridas]
+        try:
+            with abrir(output_csv, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(headers)
+                for fila in heapq.merge(*(csv.reader(a) for a in archivos), key=lambda fila: int(fila[0])):
+                    writer.writerow(fila[1:])
+        finally:
+            for a in archivos:
+                a.close()
+
+    print(f"\n✅ ¡Completado!")
+    print(f"   📂 Archivo generado: {output_csv}")
+    print(f"   📊 Registros totales: {total_filas:,}")
+    print(f"   🔧 Duplicados corregidos: {duplicates_fixed:,}")
+
+def _digest_clave(clave, bits):
+    """Huella de bits/8 bytes de la clave"""
+    return hashlib.blake2b('\x1f'.join(clave).encode('utf-8'), digest_size=bits // 8).digest()
+
+def _lector_huellas(huellas, palabras):
+    """huella(idx) -> entero de la fila idx en un array('Q') de `palabras` palabras por fila"""
+    if palabras == 1:
+        return huellas.__getitem__
+    return lambda idx: huellas[2 * idx] << 64 | huellas[2 * idx + 1]
+
+def _huellas_repetidas(cubetas, palabras):
+    """
+    Huellas (como enteros) que aparecen más de una vez. Cada cubeta se ordena
+    por separado, así que las huellas materializadas como objetos a la vez
+    son solo las de una cubeta.
+    """
+    repetidas = set()
+    for n, cubeta in enumerate(cubetas):
+        if palabras == 1:
+            ordenadas = sorted(cubeta)
+        else:
+            ordenadas = sorted(a << 64 | b for a, b in zip(cubeta[::2], cubeta[1::2]))
+        cubetas[n] = None
+        repetidas.update(h for h, siguiente in zip(ordenadas, ordenadas[1:]) if h == siguiente)
+    return repetidas
+
+def _reescribir_mmap(input_csv, output_csv, headers, huella, repetidas, por_primera_fila):
+    """Pasada 3 de deduplicar_compacto copiando como bytes las filas canónicas"""
+    ancho = len(headers)
+    formatear = FormateadorCsv()
+    with LectorMmap(input_csv) as lector, abrir(output_csv, 'wb') as out:
+        out.write(formatear(headers))
+        pendientes = []
+        idx = -1
+        for registro in lector.registros():
+            if not registro:
+                continue  # Línea vacía (csv.reader la entrega como [])
+            idx += 1
+            if huella(idx) not in repetidas:
+                if es_canonico(registro, ancho):
+                    pendientes.append(registro)
+                else:
+                    pendientes.append(formatear(_normalizar(lector.parsear(registro), ancho)[:ancho])[:-2])
+            elif idx in por_primera_fila:
+                pendientes.extend(formatear(valores)[:-2] for valores in por_primera_fila.pop(idx))
+            if len(pendientes) >= 8192:
+                out.write(b'\r\n'.join(pendientes) + b'\r\n')
+                pendientes = []
+        if pendientes:
+            out.write(b'\r\n'.join(pendientes) + b'\r\n')
+
+def deduplicar_compacto(input_csv, output_csv, bits=64):
+    """
+    Deduplicación en memoria con claves compactas, en tres pasadas:
+    1. Se guarda la huella blake2b (64 o 128 bits) de cada fila en un
+       array('Q') de una o dos palabras por fila, indexado por número de
+       fila, y una copia repartida en cubetas por sus bits altos; las
+       huellas repetidas salen de ordenar cada cubeta. No se conserva
+       ninguna fila ni tupla de strings, ni un objeto por fila.
+    2. Solo si hubo huellas repetidas, se materializan las filas de esas
+       huellas agrupadas por su clave real (una colisión de hash entre
+       claves distintas simplemente queda como dos grupos de una fila).
+    3. Se reescribe el archivo: las filas sin huella repetida pasan tal
+       cual y cada grupo sale completo en su primera aparición.
+    El resultado es idéntico al del modo en memoria.
+
+    Con la entrada sin comprimir, las pasadas 2 y 3 recorren el archivo con
+    LectorMmap: solo se parsean las filas de huella repetida y las demás se
+    copian como bytes si csv.writer las escribiría igual.
+    """
+    # 1. Huellas
+    palabras = bits // 64
+    huellas = array('Q')
+    cubetas = [array('Q') for _ in range(CUBETAS_HUELLAS)]
+    with abrir(input_csv, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        headers = next(reader)
+        indices = _indices_clave(headers)
+        ancho = len(headers)
+        for valores in reader:
+            if not valores:
+                continue  # Línea vacía: DictReader la omite
+            h = _digest_clave(clave_fila(_normalizar(valores, ancho), indices), bits)
+            huellas.frombytes(h)
+            cubetas[h[0] << 2 | h[1] >> 6].frombytes(h)
+    repetidas = _huellas_repetidas(cubetas, palabras)
+    del cubetas
+    huella = _lector_huellas(huellas, palabras)
+    total_filas = len(huellas) // palabras
+    print(f"📊 Filas leídas: {total_filas:,}")
+
+    # 2. Materializar solo los grupos con huella repetida
+    grupos = {}
+    i_fecha = indices[COLUMNAS_CLAVE.index('Fecha')]
+    if repetidas and compresion(input_csv) is None:
+        with LectorMmap(input_csv) as lector:
+            idx = -1
+            for registro in lector.registros():
+                if not registro:
+                    continue
+                idx += 1
+                if huella(idx) in repetidas:
+                    valores = _normalizar(lector.parsear(registro), ancho)[:ancho]
+                    grupos.setdefault(clave_fila(valores, indices), []).append((idx, valores))
+    elif repetidas:
+        with abrir(input_csv, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            next(reader)
+            for idx, valores in enumerate(valores for valores in reader if valores):
+                if huella(idx) in repetidas:
+                    valores = _normalizar(valores, ancho)[:ancho]
+                    grupos.setdefault(clave_fila(valores, indices), []).append((idx, valores))
+
+    claves_dup = registros_dup = duplicates_fixed = 0
+    por_primera_fila = {}
+    for filas in grupos.values():
+        if len(filas) > 1:
+            claves_dup += 1
+            registros_dup += len(filas) - 1
+            valores = [v for _, v in filas]
+            duplicates_fixed += ajustar_grupo(valores, i_fecha)
+            por_primera_fila[filas[0][0]] = valores
+        else:
+            por_primera_fila[filas[0][0]] = [filas[0][1]]
+    del grupos
+
+    print(f"\n🔍 Análisis de duplicados:")
+    print(f"   - Total de claves únicas: {total_filas - registros_dup:,}")
+    print(f"   - Claves con duplicados: {claves_dup:,}")
+    print(f"   - Total de registros duplicados: {registros_dup:,}")
+    print(f"✅ Duplicados procesados: {duplicates_fixed:,}")
+
+    # 3. Reescribir
+    print(f"\n💾 Escribiendo CSV limpio: {output_csv}")
+    if compresion(input_csv) is None:
+        _reescribir_mmap(input_csv, output_csv, headers, huella, repetidas, por_primera_fila)
+    else:
+        with abrir(input_csv, 'r', encoding='utf-8', newline='') as f, \
+                abrir(output_csv, 'w', encoding='utf-8', newline='') as out:
+            reader = csv.reader(f)
+            writer = csv.writer(out)
+            writer.writerow(next(reader))
+            for idx, valores in enumerate(valores for valores in reader if valores):
+                if huella(idx) not in repetidas:
+                    writer.writerow(_normalizar(valores, ancho)[:ancho])
+                elif idx in por_primera_fila:
+                    writer.writerows(por_primera_fila.pop(idx))
+
+    print(f"\n✅ ¡Completado!")
+    print(f"   📂 Archivo generado: {output_csv}")
+    print(f"   📊 Registros totales: {total_filas:,}")
+    print(f"   🔧 Duplicados corregidos: {duplicates_fixed:,}")
+
+def main(input_csv=INPUT_CSV, output_csv=OUTPUT_CSV):
     if not input_csv.exists():
         print(f"❌ Error: No se encuentra el archivo {input_csv}")
         sys.exit(1)
@@ -27,7 +324,7 @@ def main():
     
     # Leer todas las filas
     rows = []
-    with open(input_csv, 'r', encoding='utf-8') as f:
+    with abrir(input_csv, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         headers = reader.fieldnames
         for row in reader:
@@ -99,7 +396,7 @@ def main():
     
     # Escribir nuevo CSV
     print(f"\n💾 Escribiendo CSV limpio: {output_csv}")
-    with open(output_csv, 'w', encoding='utf-8', newline='') as f:
+    with abrir(output_csv, 'w', encoding='utf-8', newline='') as f:
         writer = csv.DictWriter(f, fieldnames=headers)
         writer.writeheader()
         writer.writerows(processed_rows)
@@ -111,4 +408,25 @@ def main():
     print(f"\n💡 Ahora puedes usar este archivo en la carga masiva de Firebase")
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Corrige duplicados del CSV de calificaciones')
+    parser.add_argument('--entrada', type=Path, default=INPUT_CSV, help='CSV de entrada (.gz / .zst se descomprimen)')
+    parser.add_argument('--salida', type=Path, default=OUTPUT_CSV, help='CSV de salida (.gz / .zst para comprimir)')
+    parser.add_argument('--modo', choices=['memoria', 'compacto', 'externo'], default='memoria',
+                        help='compacto: huellas de 64/128 bits en vez de filas; '
+                             'externo: particiones en disco para archivos que no caben en RAM')
+    parser.add_argument('--bits', type=int, choices=[64, 128], default=64, help='Tamaño de huella del modo compacto')
+    parser.add_argument('--memoria-mb', type=int, default=512, help='Presupuesto de memoria del modo externo')
+    parser.add_argument('--tmpdir', type=Path, default=None, help='Carpeta para las particiones temporales')
+    args = parser.parse_args()
+
+    if args.modo != 'memoria':
+        if not args.entrada.exists():
+            print(f"❌ Error: No se encuentra el archivo {args.entrada}")
+            sys.exit(1)
+        print(f"📂 Leyendo CSV: {args.entrada}")
+    if args.modo == 'externo':
+        deduplicar_externo(args.entrada, args.salida, memoria_mb=args.memoria_mb, tmpdir=args.tmpdir)
+    elif args.modo == 'compacto':
+        deduplicar_compacto(args.entrada, args.salida, bits=args.bits)
+    else:
+        main(args.entrada, args.salida)
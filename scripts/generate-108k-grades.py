@@ -5,23 +5,174 @@ Toma el CSV actual (107,710 registros) y genera 290 registros adicionales
 modificando levemente las fechas para llegar a 108,000 total.
 """
 
+import argparse
 import csv
 import random
+import tempfile
 from datetime import datetime, timedelta
 from pathlib import Path
 
-def main():
-    # Rutas
-    input_csv = Path('/workspaces/superjf_v17/public/test-data/grades-consolidated-2025-SIN-DUPS.csv')
-    output_csv = Path('/workspaces/superjf_v17/public/test-data/grades-consolidated-2025-108K.csv')
+from testdata.comprimido import abrir, compresion, tamano_estimado
+from testdata.lector_mmap import LectorMmap
+
+INPUT_CSV = Path('/workspaces/superjf_v17/public/test-data/grades-consolidated-2025-SIN-DUPS.csv')
+OUTPUT_CSV = Path('/workspaces/superjf_v17/public/test-data/grades-consolidated-2025-108K.csv')
+TARGET_RECORDS = 108000
+
+def variar_fila(base_row, i, rng=random):
+    """Copia de base_row con la fecha desplazada unos segundos y la nota levemente variada"""
+    base_row = base_row.copy()
+    
+    # Modificar la fecha para hacerla única
+    try:
+        # Intentar parsear fecha con hora
+        if ' ' in base_row['Fecha']:
+            original_date = datetime.strptime(base_row['Fecha'], '%Y-%m-%d %H:%M:%S')
+        else:
+            original_date = datetime.strptime(base_row['Fecha'], '%Y-%m-%d')
+        
+        # Añadir tiempo aleatorio (entre 1-3600 segundos)
+        new_date = original_date + timedelta(seconds=rng.randint(1, 3600))
+        base_row['Fecha'] = new_date.strftime('%Y-%m-%d %H:%M:%S')
+        
+        # Variar ligeramente la nota (+/- 1-3 puntos)
+        try:
+            original_score = float(base_row['Nota'])
+            variation = rng.randint(-3, 3)
+            new_score = max(0, min(100, original_score + variation))
+            base_row['Nota'] = str(int(new_score))
+        except:
+            pass  # Mantener nota original si hay error
+        
+    except ValueError:
+        # Si hay error parseando fecha, mantener original pero añadir timestamp
+        base_row['Fecha'] = f"{base_row['Fecha']} 00:00:{i % 60:02d}"
     
-    TARGET_RECORDS = 108000
+    return base_row
+
+def contar_filas(ruta):
+    """
+    Cuenta las filas de datos que entrega csv.DictReader: sin líneas vacías
+    y con los saltos de línea dentro de comillas como parte del campo.
+    Sin compresión se recorre con LectorMmap, sin parsear los campos.
+    """
+    if compresion(ruta) is None:
+        with LectorMmap(ruta) as lector:
+            return sum(1 for registro in lector.registros() if registro)
+    with abrir(ruta, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return sum(1 for valores in reader if valores)
+
+def copias_por_fila(n_filas, needed, rng):
+    """
+    Reparte `needed` elecciones con reemplazo entre n_filas, igual que llamar
+    random.choice `needed` veces, pero en orden de fila y con memoria O(1):
+    genera los `needed` uniformes ya ordenados (método de espaciamientos) y
+    produce (indice_fila, copias) a medida que el recorrido avanza.
+    """
+    actual = 0.0
+    pendiente = None
+    for restantes in range(needed, 0, -1):
+        # Siguiente estadístico de orden de `restantes` uniformes en [actual, 1)
+        actual = 1.0 - (1.0 - actual) * rng.random() ** (1.0 / restantes)
+        idx = min(int(actual * n_filas), n_filas - 1)
+        if pendiente is not None and idx != pendiente[0]:
+            yield pendiente
+            pendiente = None
+        pendiente = (idx, pendiente[1] + 1) if pendiente else (idx, 1)
+    if pendiente is not None:
+        yield pendiente
+
+def _mezclar_externo(filas, headers, output_csv, rng, buckets, tmpdir=None):
+    """
+    Mezcla disco: reparte cada fila en un bucket temporal al azar, luego
+    mezcla cada bucket en memoria y los concatena. La memoria máxima es la de
+    un bucket (~ total / buckets).
+    """
+    with tempfile.TemporaryDirectory(prefix='pad108k-', dir=tmpdir) as carpeta:
+        rutas = [Path(carpeta) / f"bucket-{b:04d}.csv" for b in range(buckets)]
+        archivos = [open(r, 'w', encoding='utf-8', newline='') for r in rutas]
+        try:
+            escritores = [csv.DictWriter(a, fieldnames=headers) for a in archivos]
+            total = 0
+            for fila in filas:
+                escritores[rng.randrange(buckets)].writerow(fila)
+                total += 1
+        finally:
+            for a in archivos:
+                a.close()
+
+        with abrir(output_csv, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=headers)
+            writer.writeheader()
+            for ruta in rutas:
+                with open(ruta, 'r', encoding='utf-8', newline='') as b:
+                    bloque = list(csv.DictReader(b, fieldnames=headers))
+                rng.shuffle(bloque)
+                writer.writerows(bloque)
+                ruta.unlink()
+    return total
+
+def main_streaming(input_csv, output_csv, target=TARGET_RECORDS, semilla=42, mezclar=False, memoria_mb=256):
+    """
+    Relleno en una pasada y con memoria constante: cada fila base se escribe
+    tal cual y, justo después, las variaciones sintéticas que le tocaron.
+    Con mezclar=True el resultado pasa por una mezcla externa en disco.
+    """
+    rng = random.Random(semilla)
+
+    print(f"📂 Contando filas: {input_csv}")
+    current_count = contar_filas(input_csv)
+    needed = target - current_count
+    print(f"📊 Registros actuales: {current_count:,}")
+    print(f"🎯 Meta: {target:,}")
+    print(f"➕ Registros a generar: {max(0, needed):,}")
     
+    if needed <= 0:
+        print(f"✅ Ya tienes {current_count:,} registros (suficientes)")
+        return
+
+    def filas_con_relleno(reader):
+        copias = copias_por_fila(current_count, needed, rng)
+        siguiente = next(copias, None)
+        generados = 0
+        for idx, row in enumerate(reader):
+            yield row
+            while siguiente is not None and siguiente[0] == idx:
+                for _ in range(siguiente[1]):
+                    yield variar_fila(row, generados, rng)
+                    generados += 1
+                siguiente = next(copias, None)
+
+    print(f"\n💾 Escribiendo CSV (streaming{', con mezcla externa' if mezclar else ''}): {output_csv}")
+    with abrir(input_csv, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        headers = reader.fieldnames
+        if mezclar:
+            buckets = max(1, -(-tamano_estimado(input_csv) * target // max(current_count, 1) // (max(1, memoria_mb) << 20)))
+            # Generador propio para la mezcla: el contenido no cambia al activar --mezclar
+            total = _mezclar_externo(filas_con_relleno(reader), headers, output_csv,
+                                     random.Random(f"{semilla}:mezcla"), buckets)
+        else:
+            with abrir(output_csv, 'w', encoding='utf-8', newline='') as out:
+                writer = csv.DictWriter(out, fieldnames=headers)
+                writer.writeheader()
+                total = 0
+                for row in filas_con_relleno(reader):
+                    writer.writerow(row)
+                    total += 1
+
+    print(f"\n✅ ¡Completado!")
+    print(f"   📂 Archivo generado: {output_csv}")
+    print(f"   📊 Registros totales: {total:,}")
+
+def main(input_csv=INPUT_CSV, output_csv=OUTPUT_CSV):
     print(f"📂 Leyendo CSV: {input_csv}")
     
     # Leer todas las filas
     rows = []
-    with open(input_csv, 'r', encoding='utf-8') as f:
+    with abrir(input_csv, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         headers = reader.fieldnames
         for row in reader:
@@ -43,33 +194,8 @@ def main():
     
     additional_rows = []
     for i in range(needed):
-        # Seleccionar fila aleatoria como base
-        base_row = random.choice(rows).copy()
-        
-        # Modificar la fecha para hacerla única
-        try:
-            # Intentar parsear fecha con hora
-            if ' ' in base_row['Fecha']:
-                original_date = datetime.strptime(base_row['Fecha'], '%Y-%m-%d %H:%M:%S')
-            else:
-                original_date = datetime.strptime(base_row['Fecha'], '%Y-%m-%d')
-            
-            # Añadir tiempo aleatorio (entre 1-3600 segundos)
-            new_date = original_date + timedelta(seconds=random.randint(1, 3600))
-            base_row['Fecha'] = new_date.strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Variar ligeramente la nota (+/- 1-3 puntos)
-            try:
-                original_score = float(base_row['Nota'])
-                variation = random.randint(-3, 3)
-                new_score = max(0, min(100, original_score + variation))
-                base_row['Nota'] = str(int(new_score))
-            except:
-                pass  # Mantener nota original si hay error
-            
-        except ValueError:
-            # Si hay error parseando fecha, mantener original pero añadir timestamp
-            base_row['Fecha'] = f"{base_row['Fecha']} 00:00:{i % 60:02d}"
+        # Seleccionar fila aleatoria como base y variar fecha/nota
+        base_row = variar_fila(random.choice(rows), i)
         
         additional_rows.append(base_row)
         
@@ -86,7 +212,7 @@ def main():
     
     # Escribir nuevo CSV
     print(f"\n💾 Escribiendo CSV: {output_csv}")
-    with open(output_csv, 'w', encoding='utf-8', newline='') as f:
+    with abrir(output_csv, 'w', encoding='utf-8', newline='') as f:
         writer = csv.DictWriter(f, fieldnames=headers)
         writer.writeheader()
         writer.writerows(all_rows)
@@ -100,5 +226,21 @@ def main():
     print(f"   Firebase debería guardar los {TARGET_RECORDS:,} registros correctamente")
 
 if __name__ == '__main__':
-    random.seed(42)  # Seed para reproducibilidad
-    main()
+    parser = argparse.ArgumentParser(description='Rellena el CSV de calificaciones hasta TARGET_RECORDS')
+    parser.add_argument('--entrada', type=Path, default=INPUT_CSV, help='CSV de entrada (.gz / .zst se descomprimen)')
+    parser.add_argument('--salida', type=Path, default=OUTPUT_CSV, help='CSV de salida (.gz / .zst para comprimir)')
+    parser.add_argument('--meta', type=int, default=TARGET_RECORDS, help='Total de registros deseado')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Una pasada con memoria constante (para archivos de varios GB)')
+    parser.add_argument('--mezclar', action='store_true',
+                        help='Con --streaming: mezcla externa en disco en vez de dejar el relleno junto a su fila base')
+    parser.add_argument('--memoria-mb', type=int, default=256, help='Memoria por bucket de la mezcla externa')
+    args = parser.parse_args()
+
+    if args.streaming:
+        main_streaming(args.entrada, args.salida, target=args.meta, mezclar=args.mezclar,
+                       memoria_mb=args.memoria_mb)
+    else:
+        TARGET_RECORDS = args.meta
+        random.seed(42)  # Seed para reproducibilidad
+        main(args.entrada, args.salida)
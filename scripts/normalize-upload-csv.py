@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Normaliza un CSV de calificaciones, asistencia, usuarios o asignaciones a
+un formato canónico antes de subirlo o procesarlo con los demás scripts:
+UTF-8 (sin BOM salvo --bom), texto en NFC, coma como delimitador y
+encabezados con los nombres canónicos (Nombre, RUT, Curso, Sección... para
+calificaciones; date, course, section, studentUsername... para asistencia).
+
+Ver testdata/normalizacion.py para el detalle. El archivo se procesa en
+bloques grandes y la memoria no depende de su tamaño.
+
+Uso:
+    python3 scripts/normalize-upload-csv.py profesores.csv --salida profesores-normalizado.csv
+    python3 scripts/normalize-upload-csv.py asistencia.csv --en-lugar
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from testdata.normalizacion import ALIAS_POR_TIPO, normalizar
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Normaliza codificación, NFC y encabezados de un CSV de carga')
+    parser.add_argument('entrada', type=Path)
+    parser.add_argument('--salida', type=Path, default=None,
+                        help='Por defecto <entrada>-normalizado.csv')
+    parser.add_argument('--en-lugar', action='store_true', help='Reemplaza el archivo de entrada')
+    parser.add_argument('--tipo', choices=sorted(ALIAS_POR_TIPO), default=None,
+                        help='Tipo de archivo (por defecto se detecta por los encabezados)')
+    parser.add_argument('--codificacion', default=None,
+                        help='Codificación de entrada (por defecto: BOM, utf-8 o cp1252)')
+    parser.add_argument('--bom', action='store_true', help='Escribe BOM (para abrir en Excel)')
+    args = parser.parse_args()
+
+    if not args.entrada.exists():
+        print(f"❌ Error: No se encuentra el archivo {args.entrada}")
+        sys.exit(1)
+    if args.en_lugar:
+        salida = args.entrada.with_name(args.entrada.name + '.tmp')
+    else:
+        salida = args.salida or args.entrada.with_name(f"{args.entrada.stem}-normalizado.csv")
+
+    inicio = time.time()
+    try:
+        r = normalizar(args.entrada, salida, args.tipo, args.codificacion, args.bom)
+    except UnicodeDecodeError as e:
+        salida.unlink(missing_ok=True)
+        print(f"❌ Error de codificación en el byte {e.start} (se leyó como {e.encoding}); "
+              f"indica la correcta con --codificacion")
+        sys.exit(1)
+    if args.en_lugar:
+        os.replace(salida, args.entrada)
+        salida = args.entrada
+
+    print(f"📂 {args.entrada} ({r['tipo'] or 'tipo no reconocido'}, {r['codificacion']}, "
+          f"delimitador {r['delimitador']!r})")
+    for antes, despues in r['renombradas'].items():
+        print(f"   🔤 {antes} → {despues}")
+    if r['repetidas']:
+        print(f"⚠️  Columnas repetidas para un mismo campo (se dejan como están): {', '.join(r['repetidas'])}")
+    if r['bloques']:
+        cache = r['cache_nfc']
+        print(f"   🧩 {r['bloques_nfc']} de {r['bloques']} bloque(s) necesitaron NFC "
+              f"(caché: {cache.hits:,} aciertos, {cache.currsize:,} valores)")
+    print(f"✅ {r['lineas']:,} líneas → {salida} ({time.time() - inicio:.1f}s)")
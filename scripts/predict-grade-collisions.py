@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Predice, antes de subir un CSV de calificaciones, qué filas se van a
+sobrescribir en Firestore.
+
+bulk-upload-grades escribe cada fila en courses/{courseId}/grades/{docId}
+con merge: true, donde
+    testId = toId(courseId, sectionId, asignatura, tipo, +gradedAt, actividad)
+    docId  = toId(jobIdShort, rut, courseId, testId)
+Dos filas con el mismo docId terminan en un solo documento (gana la última).
+Este script calcula esos mismos IDs en una pasada (con la réplica de toId /
+parseFlexibleDate de testdata.carga_masiva), reporta las colisiones y,
+opcionalmente, genera un CSV corregido:
+  - actividad: a las filas que chocan se les agrega un sufijo en la columna
+    actividad, así obtienen un testId propio y no se pierde ninguna nota.
+  - descartar: se eliminan las filas que de todas formas quedarían
+    sobrescritas (el resultado en Firestore es el mismo, con menos escrituras).
+
+Uso:
+    python3 scripts/predict-grade-collisions.py grades.csv --tz America/Santiago
+    python3 scripts/predict-grade-collisions.py grades.csv --reporte colisiones.csv \\
+        --corregir grades-sin-colisiones.csv --estrategia actividad
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from testdata.carga_masiva import (
+    ALIAS_CALIFICACIONES,
+    Columnas,
+    MapaSecciones,
+    ids_calificacion,
+    job_id_corto,
+    job_id_por_defecto,
+    leer_csv_como_ruta,
+    normalizar_tipo,
+    parse_flexible_date,
+    parse_score,
+    zona_horaria,
+)
+
+REQUERIDOS = ('nombre', 'rut', 'curso', 'fecha', 'nota')
+MAX_EJEMPLOS = 10
+
+
+def _huella(doc_id):
+    return hashlib.blake2b(doc_id.encode('utf-8'), digest_size=16).digest()
+
+
+class Predictor:
+    """Calcula el docId de cada fila igual que la ruta y detecta los repetidos"""
+
+    def __init__(self, columnas, job_id, secciones=None, zona=None):
+        self.columnas = columnas
+        self.job_corto = job_id_corto(job_id)
+        self.secciones = secciones or MapaSecciones()
+        self.zona = zona
+        self.rechazos = Counter()
+
+    def partes(self, valores):
+        """
+        (rut, curso, sectionId, asignatura, tipo, fecha, actividad) o None si la
+        ruta rechazaría la fila (se cuenta el motivo en self.rechazos)
+        """
+        valor = self.columnas.valor
+        rut = valor(valores, 'rut')
+        curso = valor(valores, 'curso')
+        fecha_str = valor(valores, 'fecha')
+        nota_str = valor(valores, 'nota')
+        if not (valor(valores, 'nombre') and rut and curso and fecha_str and nota_str):
+            self.rechazos['faltan campos requeridos'] += 1
+            return None
+        if parse_score(nota_str) is None:
+            self.rechazos['nota inválida'] += 1
+            return None
+        fecha = parse_flexible_date(fecha_str, self.zona)
+        if fecha is None:
+            self.rechazos['fecha inválida'] += 1
+            return None
+        return (
+            rut,
+            curso,
+            self.secciones.section_id(curso, valor(valores, 'seccion')),
+            valor(valores, 'asignatura'),
+            normalizar_tipo(valor(valores, 'tipo')),
+            fecha,
+            valor(valores, 'actividad'),
+        )
+
+    def doc_id(self, partes, actividad=None):
+        rut, curso, section_id, asignatura, tipo, fecha, actual = partes
+        return ids_calificacion(self.job_corto, rut, curso, section_id, asignatura, tipo, fecha,
+                                actual if actividad is None else actividad)[2]
+
+
+def _cargar_secciones(ruta):
+    """JSON {"1ro Básico|A": "<sectionId>", ...} (el sectionMap que arma la ruta)"""
+    if not ruta:
+        return MapaSecciones()
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return MapaSecciones(json.load(f))
+
+
+def predecir(entrada, job_id, secciones=None, zona=None, reporte=None, corregir=None, estrategia='actividad'):
+    inicio = time.time()
+    with open(entrada, 'r', encoding='utf-8-sig', newline='') as f:
+        encabezados, filas = leer_csv_como_ruta(f)
+        columnas = Columnas(encabezados, ALIAS_CALIFICACIONES)
+        faltantes = columnas.faltantes(REQUERIDOS)
+        if faltantes:
+            print(f"❌ Error: columnas requeridas no encontradas: {', '.join(faltantes)}")
+            sys.exit(1)
+        predictor = Predictor(columnas, job_id, secciones, zona)
+
+        # Con estrategia 'actividad' se corrige en la misma pasada
+        salida = writer = None
+        i_actividad = None
+        if corregir and estrategia == 'actividad':
+            i_actividad = columnas.posiciones['actividad'][0] if columnas.posiciones['actividad'] else None
+            salida = open(corregir, 'w', encoding='utf-8', newline='')
+            writer = csv.writer(salida)
+            writer.writerow(encabezados + (['actividad'] if i_actividad is None else []))
+
+        ultima_fila = {}  # huella docId original -> última fila que lo escribe (el reporte)
+        usados = set()  # huellas de los docId del CSV corregido (para desambiguar)
+        escritor_reporte = archivo_reporte = None
+        if reporte:
+            archivo_reporte = open(reporte, 'w', encoding='utf-8', newline='')
+            escritor_reporte = csv.writer(archivo_reporte)
+            escritor_reporte.writerow(['fila', 'fila_sobrescrita', 'docId'])
+
+        total = validas = colisiones = corregidas = 0
+        ejemplos = []
+        try:
+            for numero, valores in filas:
+                total += 1
+                partes = predictor.partes(valores)
+                if partes is None:
+                    if writer:
+                        writer.writerow(_con_actividad(valores, len(encabezados), i_actividad))
+                    continue
+                validas += 1
+                doc_id = predictor.doc_id(partes)
+                huella = _huella(doc_id)
+                anterior = ultima_fila.get(huella)
+                if anterior is not None:
+                    colisiones += 1
+                    if escritor_reporte:
+                        escritor_reporte.writerow([numero, anterior, doc_id])
+                    if len(ejemplos) < MAX_EJEMPLOS:
+                        ejemplos.append((numero, anterior, doc_id))
+                ultima_fila[huella] = numero
+                if writer:
+                    # Una fila sin colisión en el original puede chocar con la actividad nueva de otra
+                    if huella in usados:
+                        valores, huella = _desambiguar(predictor, columnas, valores, partes,
+                                                       len(encabezados), i_actividad, usados)
+                        corregidas += 1
+                    else:
+                        valores = _con_actividad(valores, len(encabezados), i_actividad)
+                    usados.add(huella)
+                    writer.writerow(valores)
+        finally:
+            if salida:
+                salida.close()
+            if archivo_reporte:
+                archivo_reporte.close()
+
+    print(f"📊 Filas leídas: {total:,}")
+    print(f"   ✅ Válidas para la ruta: {validas:,}")
+    for motivo, n in predictor.rechazos.most_common():
+        print(f"   ❌ Rechazadas ({motivo}): {n:,}")
+    print(f"\n🔍 Colisiones de docId: {colisiones:,}")
+    print(f"   📄 Documentos distintos en Firestore: {len(ultima_fila):,}")
+    if not corregidas:
+        print(f"   💸 Escrituras que se sobrescriben: {colisiones:,}")
+    for numero, anterior, doc_id in ejemplos:
+        print(f"   • Fila {numero} sobrescribe la fila {anterior}: {doc_id}")
+    if reporte:
+        print(f"\n📝 Reporte: {reporte}")
+
+    if corregir and estrategia == 'descartar':
+        escritas = _escribir_sin_sobrescritas(entrada, corregir, predictor, ultima_fila)
+        print(f"\n💾 CSV corregido (descartar): {corregir} ({escritas:,} filas, {colisiones:,} descartadas)")
+    elif corregir:
+        print(f"\n💾 CSV corregido (actividad): {corregir} ({corregidas:,} filas con actividad nueva)")
+
+    print(f"\n⏱️  {time.time() - inicio:.1f}s")
+    return colisiones
+
+
+def _con_actividad(valores, n_encabezados, i_actividad, actividad=''):
+    """
+    Fila para el CSV corregido: si el original no tiene columna de actividad,
+    la nueva va en la posición n_encabezados (se rellena una fila corta y se
+    corren los valores sobrantes de una fila larga, que la ruta ignora)
+    """
+    if i_actividad is not None:
+        return valores
+    faltan = max(0, n_encabezados - len(valores))
+    return valores[:n_encabezados] + [''] * faltan + [actividad] + valores[n_encabezados:]
+
+
+def _desambiguar(predictor, columnas, valores, partes, n_encabezados, i_actividad, usados):
+    """Agrega ' (n)' a la actividad de la fila hasta que su docId no esté usado"""
+    i = columnas.posicion_valor(valores, 'actividad')
+    if i is None:
+        # Sin actividad: se escribe en la primera columna de actividad (o la nueva al final)
+        valores = _con_actividad(valores, n_encabezados, i_actividad)
+        i = i_actividad if i_actividad is not None else n_encabezados
+        if i >= len(valores):
+            valores = valores + [''] * (i + 1 - len(valores))
+    else:
+        valores = list(valores)
+    base = valores[i].strip()
+    n = 2
+    while True:
+        actividad = f"{base} ({n})" if base else str(n)
+        huella = _huella(predictor.doc_id(partes, actividad))
+        if huella not in usados:
+            valores[i] = actividad
+            return valores, huella
+        n += 1
+
+
+def _escribir_sin_sobrescritas(entrada, salida, predictor, ultima_fila):
+    """Segunda pasada: deja solo la última fila de cada docId (más las rechazadas, tal cual)"""
+    escritas = 0
+    with open(entrada, 'r', encoding='utf-8-sig', newline='') as f, \
+            open(salida, 'w', encoding='utf-8', newline='') as out:
+        encabezados, filas = leer_csv_como_ruta(f)
+        writer = csv.writer(out)
+        writer.writerow(encabezados)
+        for numero, valores in filas:
+            partes = predictor.partes(valores)
+            if partes is not None and ultima_fila[_huella(predictor.doc_id(partes))] != numero:
+                continue
+            writer.writerow(valores)
+            escritas += 1
+    return escritas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Predice colisiones de docId de bulk-upload-grades')
+    parser.add_argument('entrada', type=Path)
+    parser.add_argument('--job-id', default=None,
+                        help='jobId de la carga; los docId del reporte solo coinciden con los de Firestore si es '
+                             'el mismo jobId de la subida (las colisiones no dependen de él). Por defecto '
+                             'import-grades-<ms>, como la ruta cuando el formulario no envía uno')
+    parser.add_argument('--tz', default=None,
+                        help='Zona horaria del servidor (p. ej. America/Santiago); por defecto la del sistema')
+    parser.add_argument('--secciones', type=Path, default=None,
+                        help='JSON {"Curso|Sección": sectionId} si el frontend envía el mapa de secciones')
+    parser.add_argument('--reporte', type=Path, default=None, help='CSV con todas las colisiones')
+    parser.add_argument('--corregir', type=Path, default=None, help='Escribe un CSV corregido en esta ruta')
+    parser.add_argument('--estrategia', choices=['actividad', 'descartar'], default='actividad')
+    args = parser.parse_args()
+
+    if not args.entrada.exists():
+        print(f"❌ Error: No se encuentra el archivo {args.entrada}")
+        sys.exit(1)
+
+    colisiones = predecir(args.entrada, args.job_id or job_id_por_defecto(), _cargar_secciones(args.secciones), zona_horaria(args.tz),
+                          args.reporte, args.corregir, args.estrategia)
+    sys.exit(1 if colisiones and not args.corregir else 0)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Divide un CSV consolidado (calificaciones o asistencia) en partes listas
+para la carga masiva, con un manifiesto de filas y checksums.
+
+- Cada parte repite el encabezado.
+- Las partes se cortan en límites de curso/sección: un grupo contiguo de
+  filas del mismo curso+sección no se reparte entre partes mientras quepa
+  en una.
+- El tamaño objetivo (--filas o --mb) se ajusta a múltiplos de LOTE_RUTA
+  (la ruta confirma un batch de Firestore cada 200 escrituras). Cuando un
+  grupo no cabe en una parte se corta en múltiplos de LOTE_RUTA.
+- manifiesto.json lista por parte: archivo, filas, bytes, sha256, lotes de
+  Firestore, rango de filas del original y grupos curso|sección incluidos,
+  para subir partes en paralelo o reanudar solo las que fallaron.
+
+Uso:
+    python3 scripts/split-upload-csv.py grades-consolidated-2025-108K.csv --filas 20000 --salida partes/
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from testdata.carga_masiva import ALIAS_ASISTENCIA, ALIAS_CALIFICACIONES, LOTE_RUTA, Columnas
+
+
+class _Formateador:
+    """Serializa filas con csv.writer (CRLF, QUOTE_MINIMAL) a str, sin archivo intermedio"""
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def __call__(self, valores):
+        self._writer.writerow(valores)
+        linea = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return linea
+
+
+class Divisor:
+    """Arma partes a partir de grupos contiguos de filas ya serializadas"""
+
+    def __init__(self, carpeta, base, encabezado, max_filas=None, max_bytes=None):
+        self.carpeta = Path(carpeta)
+        self.base = base
+        self.encabezado = encabezado.encode('utf-8')
+        self.max_filas = max_filas
+        self.max_bytes = max_bytes
+        self.partes = []
+        self._actual = None
+
+    def _cabe(self, filas, bytes_):
+        if self.max_filas and filas > self.max_filas:
+            return False
+        if self.max_bytes and len(self.encabezado) + bytes_ > self.max_bytes:
+            return False
+        return True
+
+    def _abrir(self):
+        numero = len(self.partes) + 1
+        ruta = self.carpeta / f"{self.base}.parte-{numero:03d}.csv"
+        archivo = open(ruta, 'wb')
+        archivo.write(self.encabezado)
+        sha = hashlib.sha256(self.encabezado)
+        self._actual = {
+            'archivo': ruta.name, 'filas': 0, 'bytes': len(self.encabezado),
+            'fila_inicial': None, 'fila_final': None, 'grupos': Counter(),
+            '_f': archivo, '_sha': sha,
+        }
+
+    def cerrar(self):
+        if self._actual is None:
+            return
+        parte = self._actual
+        parte['_f'].close()
+        parte['sha256'] = parte.pop('_sha').hexdigest()
+        del parte['_f']
+        parte['lotes_firestore'] = -(-parte['filas'] // LOTE_RUTA)
+        parte['grupos'] = dict(parte['grupos'])
+        self.partes.append(parte)
+        self._actual = None
+
+    def _escribir(self, grupo, filas):
+        """filas: lista de (numero_fila, linea_bytes)"""
+        if self._actual is None:
+            self._abrir()
+        parte = self._actual
+        datos = b''.join(linea for _, linea in filas)
+        parte['_f'].write(datos)
+        parte['_sha'].update(datos)
+        parte['bytes'] += len(datos)
+        parte['filas'] += len(filas)
+        parte['grupos'][grupo] += len(filas)
+        if parte['fila_inicial'] is None:
+            parte['fila_inicial'] = filas[0][0]
+        parte['fila_final'] = filas[-1][0]
+
+    def _libre(self):
+        """(filas, bytes) ya ocupados en la parte actual"""
+        if self._actual is None:
+            return 0, 0
+        return self._actual['filas'], self._actual['bytes'] - len(self.encabezado)
+
+    def _trozo(self, filas):
+        """Filas del inicio que caben en una parte vacía, recortadas a múltiplo de LOTE_RUTA"""
+        n = acumulado = 0
+        for _, linea in filas:
+            if not self._cabe(n + 1, acumulado + len(linea)):
+                break
+            acumulado += len(linea)
+            n += 1
+        if n >= LOTE_RUTA:
+            n -= n % LOTE_RUTA
+        return max(n, 1)
+
+    def descargar(self, grupo, filas):
+        """
+        Escribe en partes propias los trozos completos de un grupo que ya no
+        cabe en una parte y devuelve las filas restantes (el grupo sigue).
+        """
+        if self._libre()[0]:
+            self.cerrar()
+        while filas:
+            n = self._trozo(filas)
+            if n == len(filas):
+                break
+            self._escribir(grupo, filas[:n])
+            self.cerrar()
+            filas = filas[n:]
+        return filas
+
+    def agregar_grupo(self, grupo, filas):
+        """Agrega un grupo completo: a la parte actual si cabe, si no a una nueva"""
+        ocupadas, ocupados = self._libre()
+        bytes_ = sum(len(linea) for _, linea in filas)
+        if ocupadas and not self._cabe(ocupadas + len(filas), ocupados + bytes_):
+            self.cerrar()
+        if not self._cabe(len(filas), bytes_):
+            filas = self.descargar(grupo, filas)
+        if filas:
+            self._escribir(grupo, filas)
+
+
+def dividir(entrada, carpeta, max_filas=None, max_mb=None):
+    inicio = time.time()
+    carpeta = Path(carpeta)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    if max_filas:
+        max_filas = -(-max_filas // LOTE_RUTA) * LOTE_RUTA
+    max_bytes = int(max_mb * (1 << 20)) if max_mb else None
+
+    formatear = _Formateador()
+    with open(entrada, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        encabezados = next(reader, [])
+        columnas = Columnas(encabezados, ALIAS_CALIFICACIONES)
+        if not columnas.posiciones['curso']:
+            columnas = Columnas(encabezados, ALIAS_ASISTENCIA)
+        if not columnas.posiciones['curso']:
+            print("⚠️  Sin columna de curso: las partes se cortan solo por tamaño")
+
+        divisor = Divisor(carpeta, Path(entrada).stem, formatear(encabezados), max_filas, max_bytes)
+        grupo_actual = None
+        pendientes = []
+        bytes_pendientes = 0
+        vistos = set()
+        no_contiguos = 0
+        total = 0
+        for numero, valores in enumerate(reader, start=2):
+            if not valores:
+                continue
+            total += 1
+            grupo = f"{columnas.valor(valores, 'curso')}|{columnas.valor(valores, 'seccion')}"
+            if grupo != grupo_actual:
+                if pendientes:
+                    divisor.agregar_grupo(grupo_actual, pendientes)
+                if grupo in vistos:
+                    no_contiguos += 1
+                vistos.add(grupo)
+                grupo_actual, pendientes, bytes_pendientes = grupo, [], 0
+            linea = formatear(valores).encode('utf-8')
+            pendientes.append((numero, linea))
+            bytes_pendientes += len(linea)
+            # Un grupo más grande que una parte se descarga a medida que llega
+            if not divisor._cabe(len(pendientes), bytes_pendientes):
+                pendientes = divisor.descargar(grupo_actual, pendientes)
+                bytes_pendientes = sum(len(linea) for _, linea in pendientes)
+        if pendientes:
+            divisor.agregar_grupo(grupo_actual, pendientes)
+        divisor.cerrar()
+
+    manifiesto = {
+        'origen': Path(entrada).name,
+        'filas': total,
+        'lote_ruta': LOTE_RUTA,
+        'max_filas': max_filas,
+        'max_bytes': max_bytes,
+        'partes': divisor.partes,
+    }
+    with open(carpeta / 'manifiesto.json', 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+
+    print(f"✅ {total:,} filas → {len(divisor.partes)} parte(s) en {carpeta}/ ({time.time() - inicio:.1f}s)")
+    for parte in divisor.partes:
+        print(f"   📄 {parte['archivo']}: {parte['filas']:,} filas, {parte['bytes'] / (1 << 20):.1f} MB, "
+              f"{len(parte['grupos'])} grupo(s), {parte['lotes_firestore']} lotes")
+    if no_contiguos:
+        print(f"⚠️  {no_contiguos:,} grupo(s) curso|sección aparecen en tramos separados; "
+              f"ordena el archivo por curso y sección para que no se repartan entre partes")
+    print(f"📝 Manifiesto: {carpeta / 'manifiesto.json'}")
+    return manifiesto
+
+
+def verificar(carpeta):
+    """Comprueba filas y sha256 de cada parte contra el manifiesto"""
+    carpeta = Path(carpeta)
+    with open(carpeta / 'manifiesto.json', 'r', encoding='utf-8') as f:
+        manifiesto = json.load(f)
+    errores = 0
+    for parte in manifiesto['partes']:
+        ruta = carpeta / parte['archivo']
+        if not ruta.exists():
+            print(f"❌ Falta {parte['archivo']}")
+            errores += 1
+            continue
+        datos = ruta.read_bytes()
+        filas = sum(1 for valores in csv.reader(io.StringIO(datos.decode('utf-8-sig'), newline='')) if valores) - 1
+        if hashlib.sha256(datos).hexdigest() != parte['sha256']:
+            print(f"❌ {parte['archivo']}: checksum distinto")
+            errores += 1
+        elif filas != parte['filas']:
+            print(f"❌ {parte['archivo']}: {filas:,} filas, el manifiesto dice {parte['filas']:,}")
+            errores += 1
+        else:
+            print(f"✅ {parte['archivo']}")
+    return errores
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Divide un CSV consolidado en partes para la carga masiva')
+    parser.add_argument('entrada', type=Path, nargs='?')
+    parser.add_argument('--salida', type=Path, default=Path('partes'))
+    parser.add_argument('--filas', type=int, default=None,
+                        help=f'Máximo de filas por parte (se redondea a múltiplo de {LOTE_RUTA})')
+    parser.add_argument('--mb', type=float, default=None, help='Máximo de MB por parte')
+    parser.add_argument('--verificar', action='store_true', help='Verifica las partes de --salida contra su manifiesto')
+    args = parser.parse_args()
+
+    if args.verificar:
+        sys.exit(1 if verificar(args.salida) else 0)
+    if args.entrada is None or not args.entrada.exists():
+        print(f"❌ Error: No se encuentra el archivo {args.entrada}")
+        sys.exit(1)
+    if not args.filas and not args.mb:
+        args.filas = 50000  # Límite recomendado por la ruta para un archivo
+    dividir(args.entrada, args.salida, args.filas, args.mb)
@@ -0,0 +1,56 @@
+"""
+Regresión de testdata/columnar.py: un CSV deduplicado por
+fix-duplicate-grades.py (fechas con hora en los duplicados) se guarda con
+tipos y vuelve al mismo CSV byte a byte.
+
+    python3 -m pytest scripts/test_columnar.py
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from testdata import columnar  # noqa: E402
+
+SCRIPT = Path(__file__).with_name('fix-duplicate-grades.py')
+
+
+def _deduplicado(carpeta):
+    """Las primeras filas no tienen duplicados; las fechas con hora aparecen después del primer lote"""
+    filas = [f'Alumno {i},{10000000 + i}-1,1ro Básico,A,Matemáticas,Profe,2025-03-{1 + i % 28:02d},tarea,{i % 70}'
+             for i in range(200)]
+    filas += filas[150:] * 3
+    entrada = carpeta / 'entrada.csv'
+    entrada.write_text('Nombre,RUT,Curso,Sección,Asignatura,Profesor,Fecha,Tipo,Nota\n' + '\n'.join(filas) + '\n',
+                       encoding='utf-8')
+    salida = carpeta / 'unico.csv'
+    subprocess.run([sys.executable, SCRIPT, '--entrada', entrada, '--salida', salida, '--modo', 'compacto'],
+                   cwd=SCRIPT.parent, check=True, capture_output=True)
+    return salida
+
+
+def test_fechas_con_hora_ida_y_vuelta(tmp_path, monkeypatch):
+    monkeypatch.setattr(columnar, 'FILAS_POR_LOTE', 64)
+    entrada = _deduplicado(tmp_path)
+    assert b'2025-03-' in entrada.read_bytes() and b':00:01,' in entrada.read_bytes()
+
+    parquet = tmp_path / 'unico.parquet'
+    assert columnar.csv_a_parquet(entrada, parquet) == ('calificaciones', 350)
+    esquema = columnar.pq.ParquetFile(str(parquet)).schema_arrow
+    assert columnar.pa.types.is_timestamp(esquema.field('Fecha').type)
+
+    vuelta = tmp_path / 'vuelta.csv'
+    assert columnar.parquet_a_csv(parquet, vuelta) == 350
+    assert vuelta.read_bytes() == entrada.read_bytes()
+
+
+def test_fecha_a_medianoche_explicita_se_rechaza(tmp_path):
+    entrada = tmp_path / 'medianoche.csv'
+    entrada.write_text('Nombre,RUT,Curso,Asignatura,Fecha,Tipo,Nota\nA,1-9,1ro,Mat,2025-03-01 00:00:00,tarea,7\n',
+                       encoding='utf-8')
+    with pytest.raises(ValueError, match='Fila 2, columna Fecha'):
+        columnar.csv_a_parquet(entrada, tmp_path / 'medianoche.parquet')
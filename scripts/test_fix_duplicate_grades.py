@@ -0,0 +1,51 @@
+"""
+Regresión de fix-duplicate-grades.py: los modos de bajo consumo deben dejar
+el mismo archivo que el modo en memoria, también con líneas vacías en la
+entrada (csv.DictReader las omite).
+
+    python3 -m pytest scripts/test_fix_duplicate_grades.py
+"""
+
+import gzip
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPT = Path(__file__).with_name('fix-duplicate-grades.py')
+ENCABEZADO = 'Nombre,RUT,Curso,Sección,Asignatura,Profesor,Fecha,Tipo,Nota\n'
+
+
+def _entrada(carpeta):
+    """CSV con duplicados, una línea vacía a mitad del archivo y otra al final"""
+    filas = []
+    for i in range(300):
+        rut = f'{10000000 + i % 40}-{i % 10}'
+        filas.append(f'Alumno {i},{rut},1ro Básico,A,Matemáticas,Profe,2025-03-{1 + i % 5:02d},tarea,{60 + i % 40}\n')
+    filas.insert(150, '\n')
+    ruta = carpeta / 'entrada.csv'
+    ruta.write_text(ENCABEZADO + ''.join(filas) + '\n', encoding='utf-8')
+    return ruta
+
+
+def _deduplicar(entrada, salida, *opciones):
+    subprocess.run([sys.executable, SCRIPT, '--entrada', entrada, '--salida', salida, *opciones],
+                   cwd=SCRIPT.parent, check=True, capture_output=True)
+    return salida.read_bytes()
+
+
+def test_modos_iguales_con_lineas_vacias(tmp_path):
+    entrada = _entrada(tmp_path)
+    comprimida = tmp_path / 'entrada.csv.gz'
+    with gzip.open(comprimida, 'wb') as f:
+        f.write(entrada.read_bytes())
+    esperado = _deduplicar(entrada, tmp_path / 'memoria.csv', '--modo', 'memoria')
+    assert esperado.count(b'\r\n') == 301
+    assert b'\r\n,,' not in esperado
+    for nombre, opciones in {
+        'externo': ['--modo', 'externo', '--memoria-mb', '0'],
+        'compacto64': ['--modo', 'compacto', '--bits', '64'],
+        'compacto128': ['--modo', 'compacto', '--bits', '128'],
+    }.items():
+        assert _deduplicar(entrada, tmp_path / f'{nombre}.csv', *opciones) == esperado, nombre
+        # Sin mmap: las pasadas 2 y 3 del modo compacto leen con csv.reader
+        assert _deduplicar(comprimida, tmp_path / f'{nombre}-gz.csv', *opciones) == esperado, nombre
@@ -0,0 +1,6 @@
+"""
+Utilidades compartidas por los generadores y herramientas de datos de prueba.
+
+Los scripts de public/test-data y de la raíz agregan scripts/ al sys.path
+para poder importar este paquete.
+"""
@@ -0,0 +1,306 @@
+"""
+Exportación directa a SQLite con el esquema de la capa SQL de la app
+(docs/supabase/*_schema.sql, que leen src/lib/sql-database.ts e idb-sql.ts).
+
+Las filas se arman igual que el modo SQL/IndexedDB de bulk-uploads.tsx
+(GradeRecord / AttendanceRecord: mismos id, testId, fechas ISO y status),
+para que una base precargada sea indistinguible de una subida desde la UI.
+Ese modo busca las columnas por nombre exacto en minúsculas (sin quitar
+acentos): un encabezado "Sección" no se reconoce y sectionId queda null,
+igual que en la app.
+
+La app no tiene tablas SQL de usuarios ni de asignaciones; se exportan a
+`users` y `teacher_assignments` con los campos de testdata.normalizacion
+para que los entornos de benchmark tengan el conjunto completo.
+
+Carga rápida:
+- PRAGMA sin journal ni fsync durante la carga (el archivo se genera de
+  cero; si la carga falla se descarta);
+- executemany en transacciones de FILAS_POR_TRANSACCION filas;
+- las tablas se crean sin PRIMARY KEY y los índices (incluido el único por
+  id) se construyen al final, ordenando una sola vez en vez de mantener el
+  B-tree en cada inserción. Antes se eliminan los id repetidos conservando
+  la última fila, que es lo que deja el upsert onConflict 'id' de la app.
+"""
+
+import csv
+import sqlite3
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from operator import itemgetter
+
+from .carga_masiva import (
+    Columnas,
+    detectar_delimitador_cliente,
+    epoch_ms,
+    iso_js,
+    number_js,
+    parse_date_cliente,
+    to_id_cliente,
+)
+from .normalizacion import ALIAS_USUARIOS
+
+FILAS_POR_TRANSACCION = 100_000
+
+TABLAS = {
+    'grades': [
+        ('id', 'TEXT NOT NULL'), ('test_id', 'TEXT NOT NULL'), ('student_id', 'TEXT NOT NULL'),
+        ('student_name', 'TEXT'), ('score', 'NUMERIC'), ('course_id', 'TEXT'), ('section_id', 'TEXT'),
+        ('subject_id', 'TEXT'), ('title', 'TEXT'), ('graded_at', 'TEXT'), ('year', 'INTEGER NOT NULL'),
+        ('type', 'TEXT'), ('created_at', 'TEXT'), ('updated_at', 'TEXT'), ('topic', 'TEXT'),
+    ],
+    'attendance': [
+        ('id', 'TEXT NOT NULL'), ('date', 'TEXT NOT NULL'), ('course_id', 'TEXT'), ('section_id', 'TEXT'),
+        ('student_id', 'TEXT NOT NULL'), ('status', 'TEXT NOT NULL'), ('present', 'INTEGER'),
+        ('comment', 'TEXT'), ('created_at', 'TEXT'), ('updated_at', 'TEXT'), ('year', 'INTEGER NOT NULL'),
+    ],
+    'users': [(campo, 'TEXT') for campo in ALIAS_USUARIOS],
+    'teacher_assignments': [
+        ('teacher_username', 'TEXT'), ('teacher_email', 'TEXT'), ('course', 'TEXT'), ('section', 'TEXT'),
+        ('subjects', 'TEXT'),
+    ],
+}
+# Clave de upsert de cada tabla (None = sin clave, se insertan todas las filas)
+CLAVES = {'grades': 'id', 'attendance': 'id', 'users': 'username', 'teacher_assignments': None}
+# Los mismos índices que docs/supabase/*_schema.sql
+INDICES = [
+    'CREATE INDEX idx_grades_year ON grades (year)',
+    'CREATE INDEX idx_grades_student ON grades (student_id)',
+    'CREATE INDEX idx_grades_topic ON grades (topic) WHERE topic IS NOT NULL',
+    'CREATE INDEX idx_attendance_year ON attendance (year)',
+    'CREATE INDEX idx_attendance_date ON attendance (date)',
+    'CREATE INDEX idx_attendance_student ON attendance (student_id)',
+]
+
+# Alias del modo SQL de bulk-uploads.tsx: r['nombre'] || r['student'] || ...
+ALIAS_CLIENTE_CALIFICACIONES = {
+    'nombre': ['nombre', 'student', 'studentname'],
+    'rut': ['rut', 'studentid', 'id'],
+    'curso': ['curso', 'course', 'courseid'],
+    'seccion': ['seccion', 'section', 'sectionid'],
+    'asignatura': ['asignatura', 'subject', 'subjectid'],
+    'tipo': ['tipo', 'type'],
+    'nota': ['nota', 'score'],
+    'fecha': ['fecha', 'gradedat', 'date'],
+    'tema': ['tema', 'topic', 'theme'],
+}
+ALIAS_CLIENTE_ASISTENCIA = {
+    'fecha': ['fecha', 'date'],
+    'rut': ['rut', 'studentid', 'student_id', 'id'],
+    'curso': ['curso', 'course', 'courseid', 'course_id'],
+    'seccion': ['seccion', 'section', 'sectionid', 'section_id'],
+    'estado': ['estado', 'status'],
+    'comentario': ['comentario', 'comment', 'observacion'],
+}
+ESTADOS_CLIENTE = [
+    ('absent', ('absent', 'ausente', 'a', 'falta', '0', 'no')),
+    ('late', ('late', 'tarde', 'atrasado', 't', 'atraso')),
+    ('excused', ('excused', 'justificado', 'j', 'excusa', 'justificada')),
+]
+
+
+def leer_csv_cliente(archivo):
+    """
+    parseCSVforSQL: (encabezados en minúsculas, iterador de listas de campos
+    recortados) de un archivo abierto en modo texto con newline=''. Las
+    líneas en blanco se omiten.
+    """
+    lineas = (l for l in archivo if not l.isspace())
+    primera = next(lineas, None)
+    if primera is None:
+        return [], iter(())
+    primera = primera.lstrip(chr(0xfeff)).rstrip('\r\n')
+    delimitador = detectar_delimitador_cliente(primera)
+    encabezados = [h.lower().strip() for h in next(csv.reader([primera], delimiter=delimitador), [])]
+    return encabezados, (list(map(str.strip, campos)) for campos in csv.reader(lineas, delimiter=delimitador))
+
+
+class _CamposCliente:
+    """
+    r['a'] || r['b'] || ... sobre listas (con encabezados repetidos vale la
+    última columna). tupla() devuelve los valores de todos los campos de una
+    vez; si cada campo tiene a lo más una columna es un solo itemgetter.
+    """
+
+    def __init__(self, encabezados, alias):
+        ultima = {h: i for i, h in enumerate(encabezados)}
+        self.campos = list(alias)
+        self.posiciones = {campo: [ultima[a] for a in lista if a in ultima] for campo, lista in alias.items()}
+        self._ancho = len(encabezados)
+        self._directo = None
+        if all(len(p) <= 1 for p in self.posiciones.values()):
+            # Los campos sin columna leen el '' que se agrega al final de la fila
+            self._directo = itemgetter(*(p[0] if p else self._ancho for p in self.posiciones.values()))
+
+    def valor(self, valores, campo):
+        for i in self.posiciones[campo]:
+            if i < len(valores) and valores[i]:
+                return valores[i]
+        return ''
+
+    def tupla(self, valores):
+        if self._directo is not None and len(valores) == self._ancho:
+            valores.append('')
+            return self._directo(valores)
+        return tuple(self.valor(valores, c) for c in self.campos)
+
+
+_iso = lru_cache(maxsize=1 << 16)(iso_js)
+_epoch_ms = lru_cache(maxsize=1 << 16)(epoch_ms)
+# toId de cada parte por separado (cursos, RUTs, asignaturas se repiten). Es
+# lo mismo que toId del texto unido con '_': las partes ya vienen recortadas
+# y toId de algo que ya es un id lo deja igual
+_id = lru_cache(maxsize=1 << 18)(to_id_cliente)
+
+
+@lru_cache(maxsize=1 << 10)
+def _nota(texto):
+    return number_js(texto.replace(',', '.', 1))
+
+
+def _ahora():
+    return iso_js(datetime.now(timezone.utc))
+
+
+def filas_calificaciones(encabezados, filas, anio, zona=None, omitidas=None):
+    """Tuplas en el orden de TABLAS['grades'], como el GradeRecord del modo SQL"""
+    tupla = _CamposCliente(encabezados, ALIAS_CLIENTE_CALIFICACIONES).tupla
+    omitidas = Counter() if omitidas is None else omitidas
+    ahora = _ahora()
+    for valores in filas:
+        nombre, rut, curso, seccion, asignatura, tipo, nota_str, fecha_str, tema = tupla(valores)
+        if not (nombre and rut and curso and nota_str and fecha_str):
+            omitidas['faltan campos'] += 1
+            continue
+        score = _nota(nota_str)
+        fecha = parse_date_cliente(fecha_str, zona)
+        if score is None or fecha is None:
+            omitidas['nota o fecha inválida'] += 1
+            continue
+        tipo = (tipo or 'evaluacion').lower()
+        if tipo not in ('tarea', 'prueba', 'evaluacion'):
+            tipo = 'evaluacion'
+        course_id = _id(curso)
+        section_id = _id(seccion)
+        subject_id = _id(asignatura) if asignatura else None
+        test_id = f"{course_id}_{section_id or 'all'}_{subject_id or 'general'}_{tipo}_{_epoch_ms(fecha)}"
+        iso = _iso(fecha)
+        yield (
+            f"{_id(rut)}_{course_id}_{test_id}", test_id, rut, nombre, score, course_id, section_id,
+            subject_id, tema or f"{asignatura or 'Evaluación'} {iso[:10]}", iso, anio, tipo,
+            ahora, ahora, tema or None,
+        )
+
+
+def _estado_cliente(estado):
+    for status, valores in ESTADOS_CLIENTE:
+        if estado in valores:
+            return status
+    return 'present'
+
+
+@lru_cache(maxsize=1 << 16)
+def _anio_local(fecha, zona):
+    """date.getFullYear(): año en la hora local del navegador"""
+    return (fecha.astimezone(zona) if zona else fecha.astimezone()).year
+
+
+def filas_asistencia(encabezados, filas, anio, zona=None, omitidas=None):
+    """Tuplas en el orden de TABLAS['attendance'], como el AttendanceRecord del modo SQL"""
+    tupla = _CamposCliente(encabezados, ALIAS_CLIENTE_ASISTENCIA).tupla
+    omitidas = Counter() if omitidas is None else omitidas
+    ahora = _ahora()
+    for valores in filas:
+        fecha_str, rut, curso, seccion, estado, comentario = tupla(valores)
+        fecha = parse_date_cliente(fecha_str, zona) if fecha_str and rut else None
+        if fecha is None:
+            omitidas['faltan campos o fecha inválida'] += 1
+            continue
+        status = _estado_cliente((estado or 'present').lower().strip())
+        course_id = _id(curso)
+        iso = _iso(fecha)
+        yield (
+            f"{_id(rut)}_{course_id or 'all'}_{iso[:10]}", iso, course_id, _id(seccion), rut,
+            status, int(status in ('present', 'late')), comentario or None, ahora, ahora,
+            _anio_local(fecha, zona) or anio,
+        )
+
+
+def filas_por_alias(encabezados, filas, alias):
+    """Tuplas con el valor (recortado) de cada campo de `alias`, en su orden"""
+    columnas = Columnas(encabezados, alias)
+    campos = list(alias)
+    for valores in filas:
+        yield tuple(columnas.valor(valores, c) or None for c in campos)
+
+
+class ExportadorSqlite:
+    """
+    Base SQLite nueva en `ruta` (se reemplaza si existe). cargar() se puede
+    llamar varias veces por tabla; cerrar() deduplica, crea los índices y
+    deja la base lista para usar.
+    """
+
+    def __init__(self, ruta, filas_por_transaccion=FILAS_POR_TRANSACCION):
+        self.ruta = ruta
+        self.filas_por_transaccion = filas_por_transaccion
+        ruta.unlink(missing_ok=True)
+        self.con = sqlite3.connect(str(ruta), isolation_level=None)
+        for pragma in ('journal_mode = OFF', 'synchronous = OFF', 'locking_mode = EXCLUSIVE',
+                       'temp_store = MEMORY', 'cache_size = -262144'):
+            self.con.execute(f'PRAGMA {pragma}')
+        for tabla, columnas in TABLAS.items():
+            self.con.execute(f"CREATE TABLE {tabla} ({', '.join(f'{c} {t}' for c, t in columnas)})")
+        self.filas = dict.fromkeys(TABLAS, 0)
+        self.repetidas = {}
+
+    def cargar(self, tabla, tuplas):
+        """Inserta las tuplas en transacciones de filas_por_transaccion. Devuelve cuántas se insertaron"""
+        sql = f"INSERT INTO {tabla} VALUES ({', '.join('?' * len(TABLAS[tabla]))})"
+        total = 0
+        lote = []
+        for tupla in tuplas:
+            lote.append(tupla)
+            if len(lote) >= self.filas_por_transaccion:
+                total += self._transaccion(sql, lote)
+                lote = []
+        if lote:
+            total += self._transaccion(sql, lote)
+        self.filas[tabla] += total
+        return total
+
+    def _transaccion(self, sql, lote):
+        self.con.execute('BEGIN')
+        self.con.executemany(sql, lote)
+        self.con.execute('COMMIT')
+        return len(lote)
+
+    def cerrar(self):
+        """Deduplica por clave, crea índices y ANALYZE. Deja en self.repetidas las filas eliminadas por tabla"""
+        repetidas = self.repetidas
+        try:
+            self.con.execute('BEGIN')
+            for tabla, clave in CLAVES.items():
+                if clave is None:
+                    continue
+                repetidas[tabla] = self.con.execute(
+                    f"DELETE FROM {tabla} WHERE rowid NOT IN (SELECT max(rowid) FROM {tabla} GROUP BY {clave})"
+                ).rowcount
+                self.con.execute(f"CREATE UNIQUE INDEX pk_{tabla} ON {tabla} ({clave})")
+            for indice in INDICES:
+                self.con.execute(indice)
+            self.con.execute('COMMIT')
+            self.con.execute('ANALYZE')
+            self.con.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_exc, *exc):
+        if tipo_exc is None:
+            self.cerrar()
+        else:
+            self.con.close()
@@ -0,0 +1,147 @@
+"""
+Calendario escolar chileno precalculado por año.
+
+Se construye una sola vez por año: lista ordenada de días hábiles (lunes a
+viernes, sin feriados ni vacaciones de invierno), el semestre de cada día y
+sus cadenas YYYY-MM-DD ya formateadas. Con eso los generadores pueden:
+- recorrer los días hábiles sin avanzar timedelta por timedelta,
+- sortear k fechas distintas de un semestre en O(k) con rng.sample,
+- evitar strftime repetidos.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from functools import lru_cache
+
+# Feriados de fecha fija (mes, día)
+FERIADOS_FIJOS = [
+    (1, 1),    # Año Nuevo
+    (5, 1),    # Día del Trabajo
+    (5, 21),   # Glorias Navales
+    (7, 16),   # Virgen del Carmen
+    (8, 15),   # Asunción de la Virgen
+    (9, 18),   # Independencia Nacional
+    (9, 19),   # Glorias del Ejército
+    (11, 1),   # Todos los Santos
+    (12, 8),   # Inmaculada Concepción
+    (12, 25),  # Navidad
+]
+
+# Día Nacional de los Pueblos Indígenas (solsticio de invierno)
+SOLSTICIO_INVIERNO = {2024: 20, 2025: 20, 2028: 20, 2029: 20}
+
+# Vacaciones de invierno conocidas (inicio, fin), ambos incluidos
+VACACIONES_INVIERNO = {
+    2024: (date(2024, 6, 24), date(2024, 7, 5)),
+    2025: (date(2025, 6, 23), date(2025, 7, 4)),
+}
+
+
+def domingo_de_pascua(anio):
+    """Algoritmo anónimo gregoriano (Meeus/Jones/Butcher)"""
+    a = anio % 19
+    b, c = divmod(anio, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(anio, mes, dia + 1)
+
+
+def _trasladar_a_lunes(d):
+    """Ley 19.668: martes-jueves pasan al lunes anterior, viernes al lunes siguiente"""
+    dia = d.weekday()
+    if 1 <= dia <= 3:
+        return d - timedelta(days=dia)
+    if dia == 4:
+        return d + timedelta(days=3)
+    return d
+
+
+def feriados(anio):
+    """Conjunto de feriados nacionales del año"""
+    resultado = {date(anio, mes, dia) for mes, dia in FERIADOS_FIJOS}
+    pascua = domingo_de_pascua(anio)
+    resultado.add(pascua - timedelta(days=2))  # Viernes Santo
+    resultado.add(pascua - timedelta(days=1))  # Sábado Santo
+    resultado.add(date(anio, 6, SOLSTICIO_INVIERNO.get(anio, 21)))
+    resultado.add(_trasladar_a_lunes(date(anio, 6, 29)))   # San Pedro y San Pablo
+    resultado.add(_trasladar_a_lunes(date(anio, 10, 12)))  # Encuentro de Dos Mundos
+    # Iglesias Evangélicas: si cae martes pasa al viernes anterior, si cae miércoles al viernes siguiente
+    evangelicas = date(anio, 10, 31)
+    if evangelicas.weekday() == 1:
+        evangelicas -= timedelta(days=4)
+    elif evangelicas.weekday() == 2:
+        evangelicas += timedelta(days=2)
+    resultado.add(evangelicas)
+    return resultado
+
+
+def vacaciones_invierno(anio):
+    """Rango de vacaciones de invierno; por defecto dos semanas desde el lunes siguiente al 21 de junio"""
+    if anio in VACACIONES_INVIERNO:
+        return VACACIONES_INVIERNO[anio]
+    inicio = date(anio, 6, 22)
+    inicio += timedelta(days=(7 - inicio.weekday()) % 7)
+    return inicio, inicio + timedelta(days=11)
+
+
+class CalendarioEscolar:
+    """Días hábiles de un año escolar con índice por semestre"""
+
+    def __init__(self, anio, inicio=None, fin=None):
+        self.anio = anio
+        self.inicio = inicio or date(anio, 3, 1)
+        self.fin = fin or date(anio, 12, 31)
+        no_habiles = feriados(anio)
+        self.vacaciones = vacaciones_invierno(anio)
+
+        self.dias = []
+        d = self.inicio
+        while d <= self.fin:
+            if d.weekday() < 5 and d not in no_habiles and not self.vacaciones[0] <= d <= self.vacaciones[1]:
+                self.dias.append(d)
+            d += timedelta(days=1)
+        self.iso = [d.isoformat() for d in self.dias]
+
+        # Semestre 1: antes de las vacaciones de invierno; semestre 2: después
+        corte = next((i for i, d in enumerate(self.dias) if d > self.vacaciones[1]), len(self.dias))
+        self._rangos = {1: (0, corte), 2: (corte, len(self.dias))}
+        self._iso_por_semestre = {s: self.iso[a:b] for s, (a, b) in self._rangos.items()}
+        self._posicion = {d: i for i, d in enumerate(self.dias)}
+
+    def __len__(self):
+        return len(self.dias)
+
+    def es_habil(self, d):
+        return d in self._posicion
+
+    def semestre(self, d):
+        """1 o 2 para un día hábil; None si no es hábil"""
+        i = self._posicion.get(d)
+        if i is None:
+            return None
+        return 1 if i < self._rangos[1][1] else 2
+
+    def fechas_iso(self, semestre=None):
+        """Cadenas YYYY-MM-DD de los días hábiles (todo el año o un semestre). No modificar"""
+        return self.iso if semestre is None else self._iso_por_semestre[semestre]
+
+    def rango(self, desde, hasta, semestre=None):
+        """Días hábiles ISO entre desde y hasta (ambos incluidos)"""
+        fechas = self.fechas_iso(semestre)
+        return fechas[bisect_left(fechas, desde.isoformat()):bisect_right(fechas, hasta.isoformat())]
+
+    def muestrear(self, rng, k, semestre=None):
+        """k fechas ISO distintas del año o de un semestre, sin reintentos (O(k))"""
+        return rng.sample(self.fechas_iso(semestre), k)
+
+
+@lru_cache(maxsize=None)
+def calendario_escolar(anio, inicio=None, fin=None):
+    """Calendario del año, construido una sola vez por proceso"""
+    return CalendarioEscolar(anio, inicio, fin)
@@ -0,0 +1,550 @@
+"""
+Réplica en Python de los helpers de las rutas de carga masiva
+(src/app/api/firebase/bulk-upload-*/route.ts).
+
+Permite calcular offline exactamente lo mismo que el servidor: lectura del
+CSV (normalización de comillas + papaparse con header), alias de columnas,
+toId, parseFlexibleDate, parseScore y los IDs de documento que se escriben
+en Firestore. Cualquier cambio en esas funciones de la ruta debe reflejarse
+aquí.
+
+Diferencias conocidas: el parser nativo `new Date(raw)` de V8 acepta formatos
+libres ("March 7, 2025"...) que aquí no se reproducen; esas fechas se tratan
+como inválidas.
+"""
+
+import csv
+import re
+import time
+import unicodedata
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+# Alias de columnas tal como aparecen en getColumnValue(row, [...]) de cada ruta
+ALIAS_CALIFICACIONES = {
+    'nombre': ['nombre', 'student', 'studentname', 'studentName', 'student_name'],
+    'rut': ['rut', 'studentid', 'id', 'studentrut', 'studentRut', 'student_rut'],
+    'curso': ['curso', 'course', 'courseid', 'courseId', 'course_id'],
+    'seccion': ['seccion', 'section', 'sectionid', 'sectionId', 'section_id'],
+    'asignatura': ['asignatura', 'subject', 'subjectid', 'subjectId', 'subject_id', 'materia'],
+    'profesor': ['profesor', 'teacher', 'teachername', 'teacherName', 'teacher_name'],
+    'fecha': ['fecha', 'gradedat', 'date', 'activitydate', 'activityDate', 'activity_date'],
+    'tipo': ['tipo', 'type', 'activitytype', 'activityType', 'activity_type'],
+    'tema': ['tema', 'topic', 'theme'],
+    'actividad': ['actividad', 'activity', 'title', 'nombre_actividad', 'activitynumber',
+                  'activityNumber', 'activity_number'],
+    'nota': ['nota', 'score', 'grade', 'calificacion', 'nota_final'],
+    'semestre': ['semestre', 'semester', 'periodo', 'period'],
+}
+
+ALIAS_ASISTENCIA = {
+    'fecha': ['date', 'fecha'],
+    'curso': ['course', 'curso'],
+    'seccion': ['section', 'seccion'],
+    'username': ['studentusername', 'username'],
+    'rut': ['rut'],
+    'nombre': ['name', 'nombre'],
+    'estado': ['status', 'estado'],
+    'comentario': ['comment', 'comentario', 'observacion'],
+}
+
+# Sin encabezado reconocible, bulk-upload-attendance asume estas columnas
+ENCABEZADOS_ASISTENCIA = ['date', 'course', 'section', 'studentusername', 'rut', 'name', 'status', 'comment']
+PALABRAS_ENCABEZADO_ASISTENCIA = ['date', 'fecha', 'course', 'curso', 'section', 'seccion', 'username',
+                                  'studentusername', 'rut', 'status', 'estado', 'name', 'nombre']
+
+TIPOS_EVALUACION = ('tarea', 'prueba', 'evaluacion')
+# status de AttendanceRecord en la app (el modo SQL de bulk-uploads.tsx normaliza a estos cuatro)
+ESTADOS_ASISTENCIA = ('present', 'absent', 'late', 'excused')
+LOTE_RUTA = 200  # opsInBatch >= 200 en bulk-upload-grades / bulk-upload-attendance
+
+# \s de JavaScript (no incluye \x1c-\x1f ni \x85, que sí están en el \s de Python)
+_BLANCOS_JS = ''.join(map(chr, [0x09, 0x0a, 0x0b, 0x0c, 0x0d, 0x20, 0xa0, 0x1680, *range(0x2000, 0x200b),
+                                  0x2028, 0x2029, 0x202f, 0x205f, 0x3000, 0xfeff]))
+_RE_ESPACIOS = re.compile(f'[{re.escape(_BLANCOS_JS)}]+')
+_RE_NO_ID = re.compile(r'[^a-z0-9_\-]')
+_ACENTOS = str.maketrans({
+    **dict.fromkeys('áàäâ', 'a'), **dict.fromkeys('éèëê', 'e'), **dict.fromkeys('íìïî', 'i'),
+    **dict.fromkeys('óòöô', 'o'), **dict.fromkeys('úùüû', 'u'), 'ñ': 'n',
+})
+
+
+# ---------------- toId ----------------
+
+@lru_cache(maxsize=1 << 16)
+def _slug(parte):
+    """Una parte de toId: minúsculas, espacios -> '_', sin acentos ni caracteres especiales"""
+    return _RE_NO_ID.sub('', _RE_ESPACIOS.sub('_', parte.lower()).translate(_ACENTOS))
+
+
+def to_id(*partes):
+    """toId(...parts) de la ruta. Los slugs de cada parte se memorizan (cursos, asignaturas, tipos se repiten)"""
+    return '-'.join(filter(None, [_slug(p if isinstance(p, str) else str(p)) if p else '' for p in partes]))
+
+
+# ---------------- Fechas ----------------
+
+_RE_TRAE_HORA = re.compile(r'[Tt]|:\d{2}')
+_RE_YMD = re.compile(r'^(\d{4})/(\d{1,2})/(\d{1,2})$')
+_RE_DMY = re.compile(r'^(\d{1,2})/(\d{1,2})/(\d{4})$')
+_FORMATOS_NATIVOS = ('%Y/%m/%d %H:%M:%S', '%Y/%m/%d %H:%M')
+
+
+def zona_horaria(nombre=None):
+    """tzinfo para interpretar horas locales como lo haría el servidor (None = zona del sistema)"""
+    if not nombre:
+        return None
+    if ZoneInfo is None:
+        raise ValueError('Se requiere Python 3.9+ (zoneinfo) para usar una zona horaria explícita')
+    return ZoneInfo(nombre)
+
+
+def _localizar(dt, zona):
+    if dt.tzinfo is not None:
+        return dt
+    return dt.replace(tzinfo=zona) if zona else dt.astimezone()
+
+
+def _fecha_nativa(raw, zona):
+    """Subconjunto de `new Date(raw)` de V8: ISO 8601 (con o sin hora/zona) y YYYY/MM/DD HH:MM[:SS]"""
+    try:
+        dt = datetime.fromisoformat(raw.replace('z', 'Z'))
+        # ISO solo fecha se interpreta en UTC; con hora y sin zona, en hora local
+        if not _RE_TRAE_HORA.search(raw):
+            return dt.replace(tzinfo=timezone.utc)
+        return _localizar(dt, zona)
+    except ValueError:
+        pass
+    for formato in _FORMATOS_NATIVOS:
+        try:
+            return _localizar(datetime.strptime(raw, formato), zona)
+        except ValueError:
+            continue
+    return None
+
+
+def _mediodia_local(y, m, d, zona):
+    """new Date(y, m - 1, d, 12): meses y días fuera de rango se desbordan igual que en JS"""
+    if 0 <= y <= 99:
+        y += 1900
+    y += (m - 1) // 12
+    m = (m - 1) % 12 + 1
+    try:
+        dia = date(y, m, 1) + timedelta(days=d - 1)
+    except (ValueError, OverflowError):
+        return None
+    return _localizar(datetime(dia.year, dia.month, dia.day, 12), zona)
+
+
+@lru_cache(maxsize=1 << 16)
+def parse_flexible_date(texto, zona=None):
+    """
+    parseFlexibleDate de la ruta. Devuelve un datetime con zona o None.
+    Fechas sin hora (YYYY-MM-DD, DD/MM/YYYY, con '-', '/' o '.') quedan a las
+    12:00 de la zona `zona` (la del servidor; None = zona del sistema).
+    Memorizada: en un CSV las mismas fechas se repiten miles de veces.
+    """
+    raw = str(texto or '').strip()
+    if not raw:
+        return None
+    if _RE_TRAE_HORA.search(raw):
+        return _fecha_nativa(raw, zona)
+
+    t = raw.replace('.', '/').replace('-', '/')
+    match = _RE_YMD.match(t)
+    if match:
+        y, m, d = (int(g) for g in match.groups())
+    else:
+        match = _RE_DMY.match(t)
+        if not match:
+            return _fecha_nativa(raw, zona)
+        d, m, y = (int(g) for g in match.groups())
+
+    if not y or not m or not d:
+        return None
+    return _mediodia_local(y, m, d, zona)
+
+
+@lru_cache(maxsize=1 << 16)
+def fecha_desbordada(texto):
+    """
+    True si es una fecha sin hora que la ruta acepta pero corre de día/mes
+    (p. ej. 2025-02-30 -> 2 de marzo, 2025-13-01 -> enero de 2026)
+    """
+    raw = str(texto or '').strip()
+    if _RE_TRAE_HORA.search(raw):
+        return False
+    t = raw.replace('.', '/').replace('-', '/')
+    match = _RE_YMD.match(t)
+    if match:
+        y, m, d = (int(g) for g in match.groups())
+    else:
+        match = _RE_DMY.match(t)
+        if not match:
+            return False
+        d, m, y = (int(g) for g in match.groups())
+    if not y or not m or not d:
+        return False
+    try:
+        date(y, m, d)
+    except ValueError:
+        return True
+    return False
+
+
+_EPOCA = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def epoch_ms(dt):
+    """+date de JavaScript: milisegundos desde la época (truncados)"""
+    return (dt - _EPOCA) // timedelta(milliseconds=1)
+
+
+@lru_cache(maxsize=1 << 16)
+def _epoch_ms_str(dt):
+    return str(epoch_ms(dt))
+
+
+def dia_iso_utc(dt):
+    """date.toISOString().slice(0, 10)"""
+    return dt.astimezone(timezone.utc).strftime('%Y-%m-%d')
+
+
+# ---------------- Notas ----------------
+
+_RE_NUMERO_JS = re.compile(r'^[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?$')
+_RE_ENTERO_JS = re.compile(r'^0(?:[xX][0-9a-fA-F]+|[oO][0-7]+|[bB][01]+)$')
+
+
+def _number_js(texto):
+    """Number(str) de JavaScript (NaN -> None)"""
+    t = texto.strip(_BLANCOS_JS)
+    if not t:
+        return 0.0
+    if _RE_NUMERO_JS.match(t):
+        return float(t)
+    if _RE_ENTERO_JS.match(t):
+        return float(int(t, 0))
+    if t in ('Infinity', '+Infinity', '-Infinity'):
+        return float(t.replace('Infinity', 'inf'))
+    return None
+
+
+def parse_score(texto):
+    """parseScore de la ruta: acepta 0-100 (coma decimal incluida). None si es inválida"""
+    if texto is None:
+        return None
+    raw = _number_js(str(texto).replace(',', '.', 1))
+    if raw is None or raw in (float('inf'), float('-inf')):
+        return None
+    return raw if 0 <= raw <= 100 else None
+
+
+# ---------------- Lectura del CSV ----------------
+
+def normalizar_encabezado(s):
+    """norm() de la ruta: minúsculas, sin diacríticos, sin espacios extremos"""
+    s = unicodedata.normalize('NFD', str(s or '').lower())
+    return ''.join(c for c in s if not 0x300 <= ord(c) <= 0x36f).strip()
+
+
+def _linea_normalizada(linea):
+    """normalizeCSVQuoting: una línea completa entre comillas pierde las comillas externas"""
+    recortada = linea.strip()
+    if len(recortada) >= 2 and recortada[0] == '"' and recortada[-1] == '"':
+        return recortada[1:-1].replace('""', '"')
+    return linea
+
+
+def _encabezados_papa(crudos):
+    """transformHeader (lower + trim) y renombrado de duplicados como papaparse 5.x (x, x_1, x_2...)"""
+    vistos = {}
+    resultado = []
+    for h in crudos:
+        h = h.lower().strip()
+        if h in vistos:
+            n = vistos[h]
+            while f"{h}_{n}" in vistos:
+                n += 1
+            vistos[h] = n + 1
+            h = f"{h}_{n}"
+        vistos.setdefault(h, 1)
+        resultado.append(h)
+    return resultado
+
+
+def parsear_lineas(lineas, normalizar_comillas=True, delimitador=','):
+    """
+    Filas no vacías (listas de valores) de un iterable de líneas sin salto
+    final. normalizar_comillas aplica normalizeCSVQuoting (solo lo hace la
+    ruta de calificaciones).
+    """
+    if normalizar_comillas:
+        lineas = (_linea_normalizada(l) if l else l for l in lineas)
+    return (valores for valores in csv.reader(lineas, delimiter=delimitador) if valores)  # skipEmptyLines
+
+
+def detectar_delimitador(primera_linea):
+    """Detección de delimitador de bulk-upload-attendance (',' salvo mayoría de ';' o tabs)"""
+    comas, puntos_coma, tabs = (primera_linea.count(c) for c in (',', ';', '\t'))
+    if puntos_coma > comas and puntos_coma > tabs:
+        return ';'
+    if tabs > comas and tabs > puntos_coma:
+        return '\t'
+    return ','
+
+
+def parece_encabezado_asistencia(primera_linea):
+    """looksLikeHeader de bulk-upload-attendance; si es False la ruta usa ENCABEZADOS_ASISTENCIA"""
+    minusculas = primera_linea.lower()
+    return (any(p in minusculas for p in PALABRAS_ENCABEZADO_ASISTENCIA)
+            and not re.match(r'\d{4}-\d{2}-\d{2}', primera_linea))
+
+
+def leer_csv_como_ruta(archivo):
+    """
+    Lee un CSV abierto en modo texto igual que parseCSVWithPapa de la ruta.
+    Devuelve (encabezados, iterador de (numero_fila, valores)); numero_fila
+    es el mismo `rowNumber` que aparece en los errores del servidor. Los
+    encabezados se devuelven tal cual (Columnas les aplica transformHeader).
+    """
+    lineas = (linea.rstrip('\r\n') for linea in archivo)
+    primera = next(lineas, None)
+    if primera is None:
+        return [], iter(())
+    encabezados = next(csv.reader([primera.lstrip(chr(0xfeff))]), [])
+
+    filas = enumerate(parsear_lineas(lineas), start=2)
+    return encabezados, filas
+
+
+class Columnas:
+    """
+    getColumnValue precalculado para un encabezado: por cada campo, las
+    posiciones de las columnas que coinciden con sus alias, en orden de alias.
+    """
+
+    def __init__(self, encabezados, alias):
+        self.encabezados = _encabezados_papa(encabezados)
+        normalizados = [normalizar_encabezado(h) for h in self.encabezados]
+        self.posiciones = {}
+        for campo, lista in alias.items():
+            posiciones = []
+            for a in dict.fromkeys(normalizar_encabezado(a) for a in lista):
+                if a in normalizados:
+                    posiciones.append(normalizados.index(a))
+            self.posiciones[campo] = posiciones
+
+    def valor(self, valores, campo):
+        """Primer valor no vacío (recortado) entre las columnas del campo; '' si no hay"""
+        for i in self.posiciones[campo]:
+            if i < len(valores) and valores[i]:
+                return valores[i].strip()
+        return ''
+
+    def posicion_valor(self, valores, campo):
+        """Posición de la columna que aporta el valor del campo (None si ninguna)"""
+        for i in self.posiciones[campo]:
+            if i < len(valores) and valores[i]:
+                return i
+        return None
+
+    def faltantes(self, campos):
+        return [c for c in campos if not self.posiciones[c]]
+
+
+# ---------------- IDs de calificaciones ----------------
+
+def normalizar_tipo(tipo):
+    tipo = tipo.lower()
+    return tipo if tipo in TIPOS_EVALUACION else 'evaluacion'
+
+
+def _curso_normalizado(curso):
+    return (_RE_ESPACIOS.sub('_', curso.lower())
+            .replace('á', 'a').replace('é', 'e').replace('í', 'i')
+            .replace('ó', 'o').replace('ú', 'u').replace('ñ', 'n'))
+
+
+class MapaSecciones:
+    """sectionMap de la ruta ("Curso|Sección" -> sectionId) con su búsqueda exacta, normalizada y fallback toId"""
+
+    def __init__(self, mapa=None):
+        self.mapa = dict(mapa or {})
+        self._normalizado = {}
+        for clave, valor in self.mapa.items():
+            curso, _, seccion = clave.partition('|')
+            self._normalizado.setdefault((_curso_normalizado(curso), seccion.lower().strip()), valor)
+        self._cache = {}
+
+    def section_id(self, curso, seccion):
+        if not seccion:
+            return None
+        clave = (curso, seccion)
+        if clave not in self._cache:
+            self._cache[clave] = (
+                self.mapa.get(f"{curso}|{seccion}")
+                or self._normalizado.get((_curso_normalizado(curso), seccion.lower().strip()))
+                or to_id(seccion)
+            )
+        return self._cache[clave]
+
+
+def job_id_corto(job_id):
+    """jobIdShort = toId(jobId).slice(-12) || 'job'"""
+    return to_id(str(job_id))[-12:] or 'job'
+
+
+def job_id_por_defecto():
+    """jobId que asigna la ruta cuando el formulario no trae uno: import-grades-<ms>"""
+    return f'import-grades-{int(time.time() * 1000)}'
+
+
+def ids_calificacion(job_corto, rut, curso, section_id, asignatura, tipo, fecha, actividad):
+    """(courseId, testId, docId) exactamente como en bulk-upload-grades"""
+    course_id = to_id(curso)
+    test_id = to_id(course_id or 'general', section_id or 'all', asignatura or 'general',
+                    tipo, _epoch_ms_str(fecha), actividad or '')
+    return course_id, test_id, to_id(job_corto, rut, course_id, test_id)
+
+
+# ---------------- IDs de asistencia ----------------
+
+def levenshtein(a, b):
+    """Distancia de edición (inserción, borrado, sustitución), como levenshtein() de la ruta"""
+    if len(a) < len(b):
+        a, b = b, a
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        actual = [i]
+        for j, cb in enumerate(b, 1):
+            actual.append(min(anterior[j - 1] + (ca != cb), actual[j - 1] + 1, anterior[j] + 1))
+        anterior = actual
+    return anterior[-1]
+
+
+class MapaSeccionesAsistencia:
+    """
+    Búsqueda de sectionId de bulk-upload-attendance: exacta, normalizada
+    (normalizeKey = norm() de encabezados) y por último el curso más cercano
+    con la misma sección a distancia de edición <= 3. Sin fallback toId: si
+    nada coincide el sectionId es null.
+    """
+
+    MAX_DISTANCIA = 3
+
+    def __init__(self, mapa=None):
+        self.mapa = dict(mapa or {})
+        self._entradas = []
+        for clave, valor in self.mapa.items():
+            curso, _, seccion = clave.partition('|')
+            self._entradas.append((normalizar_encabezado(curso), normalizar_encabezado(seccion), valor))
+        self._cache = {}
+
+    def section_id(self, curso, seccion):
+        if not (curso and seccion):
+            return None
+        clave = (curso, seccion)
+        if clave not in self._cache:
+            self._cache[clave] = self.mapa.get(f"{curso}|{seccion}") or self._buscar(curso, seccion)
+        return self._cache[clave]
+
+    def _buscar(self, curso, seccion):
+        curso_n, seccion_n = normalizar_encabezado(curso), normalizar_encabezado(seccion)
+        for mapa_curso, mapa_seccion, valor in self._entradas:
+            if mapa_curso == curso_n and mapa_seccion == seccion_n:
+                return valor
+        mejor, distancia_min = None, self.MAX_DISTANCIA + 1
+        for mapa_curso, mapa_seccion, valor in self._entradas:
+            if mapa_seccion != seccion_n:
+                continue
+            distancia = levenshtein(mapa_curso, curso_n)
+            if distancia < distancia_min:
+                mejor, distancia_min = valor, distancia
+        return mejor
+
+
+def id_asistencia(fecha_str, curso, seccion, identificador):
+    """(courseId, attendanceId) exactamente como en bulk-upload-attendance"""
+    return to_id(curso), to_id(fecha_str, curso, seccion or '', identificador)
+
+
+# ---------------- Modo SQL del cliente (bulk-uploads.tsx) ----------------
+# Con SQL/IndexedDB habilitado el CSV no pasa por las rutas: bulk-uploads.tsx
+# lo parsea en el navegador (parseCSVforSQL) con sus propios toId y parseDate,
+# que NO son los de las rutas (sin reemplazo de acentos: "Básico" -> "bsico").
+
+DELIMITADORES_CLIENTE = (';', ',', '\t', '|')
+_RE_YMD_CLIENTE = re.compile(r'^\d{4}/\d{1,2}/\d{1,2}$')
+_RE_ISO_FECHA = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+def to_id_cliente(s):
+    """toId local de bulk-uploads.tsx (modo SQL): None si s es vacío"""
+    if not s:
+        return None
+    return _RE_NO_ID.sub('', _RE_ESPACIOS.sub('_', s.lower().strip(_BLANCOS_JS)))
+
+
+def detectar_delimitador_cliente(linea):
+    """detectDelimiter de parseCSVforSQL: el más frecuente entre ; , tab | (en empate el primero)"""
+    mejor, maximo = ',', 0
+    for d in DELIMITADORES_CLIENTE:
+        n = linea.count(d)
+        if n > maximo:
+            mejor, maximo = d, n
+    return mejor
+
+
+def _dia_desbordado(y, m, d):
+    """Fecha de V8 para y-m-d: mes 1-12 y día 1-31, los días de más pasan al mes siguiente"""
+    if not (1 <= m <= 12 and 1 <= d <= 31):
+        return None
+    try:
+        return date(y, m, 1) + timedelta(days=d - 1)
+    except (ValueError, OverflowError):
+        return None
+
+
+@lru_cache(maxsize=1 << 16)
+def parse_date_cliente(texto, zona=None):
+    """
+    parseDate local de bulk-uploads.tsx (modo SQL). YYYY-MM-DD y DD/MM/YYYY
+    quedan a medianoche UTC; YYYY-M-D sin ceros no es ISO y V8 lo toma a
+    medianoche local (zona `zona`, None = la del sistema).
+    """
+    s = str(texto or '').strip(_BLANCOS_JS)
+    if not s:
+        return None
+    t = s.replace('.', '/').replace('-', '/')
+    if _RE_YMD_CLIENTE.match(t):
+        iso = t.replace('/', '-')
+    elif _RE_DMY.match(t):
+        d, m, y = t.split('/')
+        iso = f"{y}-{m.zfill(2)}-{d.zfill(2)}"
+    else:
+        return _fecha_nativa(s, zona)
+    y, m, d = (int(p) for p in iso.split('-'))
+    dia = _dia_desbordado(y, m, d)
+    if dia is None:
+        return None
+    medianoche = datetime(dia.year, dia.month, dia.day)
+    if _RE_ISO_FECHA.match(iso):
+        return medianoche.replace(tzinfo=timezone.utc)
+    return _localizar(medianoche, zona)
+
+
+def number_js(texto):
+    """Number(str) de JavaScript; None si es NaN o infinito (Number.isFinite)"""
+    n = _number_js(str(texto))
+    return None if n is None or n in (float('inf'), float('-inf')) else n
+
+
+def iso_js(dt):
+    """date.toISOString(): UTC con milisegundos y 'Z'"""
+    return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.') + f"{dt.microsecond // 1000:03d}Z"
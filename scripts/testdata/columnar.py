@@ -0,0 +1,275 @@
+"""
+Salida columnar (Parquet) para los CSV de calificaciones, asistencia,
+estudiantes/usuarios y asignaciones de profesores.
+
+En CSV cada fila repite textos como "Historia, Geografía y Ciencias Sociales"
+o el nombre del profesor. En Parquet:
+- las columnas categóricas (curso, sección, asignatura, profesor, tipo,
+  estado, rol...) se guardan como diccionario (un índice por fila);
+- Fecha/date es date32 y Nota es float64; si alguna fecha trae hora
+  ("2025-03-01 00:00:01", como las que deja fix-duplicate-grades.py) la
+  columna pasa a timestamp('s'), reescribiendo los row groups ya escritos,
+  y al leer las fechas sin hora vuelven como AAAA-MM-DD;
+- el resto queda como texto.
+El esquema se arma desde el encabezado del CSV (alias resueltos con
+testdata.normalizacion), así que el orden y los nombres de columnas se
+conservan y parquet_a_csv devuelve el mismo CSV (salvo notas escritas con
+ceros de más, "6.50" vuelve como "6.5").
+
+Requiere pyarrow (dependencia opcional: pip install pyarrow). Sin él el
+módulo se importa igual, pero escribir o leer lanza ValueError.
+"""
+
+import csv
+import os
+from datetime import date, datetime, time
+from functools import lru_cache
+
+from .carga_masiva import Columnas
+from .normalizacion import ALIAS_POR_TIPO, detectar_tipo
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Dependencia opcional
+    pa = pq = None
+
+FILAS_POR_LOTE = 64 * 1024
+COMPRESION = 'zstd'
+
+CAMPOS_FECHA = {'calificaciones': {'fecha'}, 'asistencia': {'fecha'}}
+CAMPOS_NOTA = {'calificaciones': {'nota'}}
+CAMPOS_CATEGORICOS = {
+    'calificaciones': {'nombre', 'rut', 'curso', 'seccion', 'asignatura', 'profesor', 'tipo', 'tema',
+                       'actividad', 'semestre'},
+    'asistencia': {'curso', 'seccion', 'username', 'rut', 'nombre', 'estado', 'comentario'},
+    'usuarios': {'role', 'password', 'course', 'section', 'subjects'},
+    'asignaciones': {'teacherUsername', 'teacherEmail', 'course', 'section', 'subjects'},
+}
+
+
+def _requerir_pyarrow():
+    if pa is None:
+        raise ValueError('Se requiere pyarrow para la salida columnar (pip install pyarrow)')
+
+
+FORMATO_FECHA_HORA = '%Y-%m-%d %H:%M:%S'
+
+
+class _FechaConHora(Exception):
+    """Una columna date32 recibió una fecha con hora"""
+
+
+@lru_cache(maxsize=4096)
+def _fecha(texto):
+    """
+    date de "AAAA-MM-DD" o datetime de "AAAA-MM-DD HH:MM:SS"; ValueError si
+    no se podría volver al mismo texto (otro formato, o hora 00:00:00, que
+    al leer no se distingue de una fecha sin hora).
+    """
+    if not texto:
+        return None
+    if len(texto) == 10:
+        valor = date.fromisoformat(texto)
+        if valor.isoformat() == texto:
+            return valor
+    else:
+        valor = datetime.strptime(texto, FORMATO_FECHA_HORA)
+        if valor.time() != time(0) and valor.strftime(FORMATO_FECHA_HORA) == texto:
+            return valor
+    raise ValueError(texto)
+
+
+def _fechas_arrow(fechas, tipo):
+    if pa.types.is_date32(tipo):
+        if any(type(f) is datetime for f in fechas):
+            raise _FechaConHora
+        return pa.array(fechas, type=tipo)
+    return pa.array([datetime.combine(f, time(0)) if type(f) is date else f for f in fechas], type=tipo)
+
+
+def _nota(texto):
+    return float(texto) if texto else None
+
+
+def _formato_nota(valor):
+    return str(int(valor)) if valor.is_integer() else repr(valor)
+
+
+def esquema_columnas(encabezados, tipo=None, tipado=True):
+    """
+    (tipo, [(nombre, clase)]) con clase 'fecha', 'nota', 'categoria' o 'texto'
+    por columna, en el orden del encabezado. Con tipado=False fechas y notas
+    quedan como texto (para archivos con formatos que no son ISO / numéricos).
+    """
+    tipo = tipo or detectar_tipo(encabezados)
+    clases = ['texto'] * len(encabezados)
+    if tipo:
+        columnas = Columnas(encabezados, ALIAS_POR_TIPO[tipo])
+        for campo, posiciones in columnas.posiciones.items():
+            if not posiciones:
+                continue
+            i = posiciones[0]
+            if tipado and campo in CAMPOS_FECHA.get(tipo, ()):
+                clases[i] = 'fecha'
+            elif tipado and campo in CAMPOS_NOTA.get(tipo, ()):
+                clases[i] = 'nota'
+            elif campo in CAMPOS_CATEGORICOS.get(tipo, ()):
+                clases[i] = 'categoria'
+    return tipo, list(zip(encabezados, clases))
+
+
+def _esquema_arrow(columnas, tipo):
+    tipos = {
+        'fecha': pa.date32(),
+        'nota': pa.float64(),
+        'categoria': pa.dictionary(pa.int32(), pa.string()),
+        'texto': pa.string(),
+    }
+    return pa.schema([pa.field(nombre, tipos[clase]) for nombre, clase in columnas],
+                     metadata={'tipo': tipo or '', 'clases': ','.join(c for _, c in columnas)})
+
+
+def _lote_arrow(filas, columnas, esquema, primera_fila):
+    arreglos = []
+    for i, (nombre, clase) in enumerate(columnas):
+        valores = [f[i] if i < len(f) else '' for f in filas]
+        try:
+            if clase == 'fecha':
+                arreglos.append(_fechas_arrow([_fecha(v) for v in valores], esquema.field(i).type))
+            elif clase == 'nota':
+                arreglos.append(pa.array([_nota(v) for v in valores], type=pa.float64()))
+            elif clase == 'categoria':
+                arreglos.append(pa.array(valores, type=pa.string()).dictionary_encode())
+            else:
+                arreglos.append(pa.array(valores, type=pa.string()))
+        except ValueError:
+            for n, v in enumerate(valores):
+                try:
+                    _fecha(v) if clase == 'fecha' else _nota(v)
+                except ValueError:
+                    esperado = ('una fecha AAAA-MM-DD o AAAA-MM-DD HH:MM:SS (con hora distinta de 00:00:00)'
+                                if clase == 'fecha' else 'un número')
+                    raise ValueError(f"Fila {primera_fila + n}, columna {nombre}: {v!r} no es {esperado}") from None
+            raise
+    return pa.RecordBatch.from_arrays(arreglos, schema=esquema)
+
+
+class EscritorParquet:
+    """
+    Escritor por filas (listas en el orden de `encabezados`) que acumula
+    FILAS_POR_LOTE filas y las escribe como un row group. Sirve para que un
+    generador escriba Parquet en vez de CSV sin armar la tabla en memoria.
+    """
+
+    def __init__(self, ruta, encabezados, tipo=None, tipado=True):
+        _requerir_pyarrow()
+        self.tipo, self.columnas = esquema_columnas(encabezados, tipo, tipado)
+        self.esquema = _esquema_arrow(self.columnas, self.tipo)
+        self._ruta = str(ruta)
+        self._writer = pq.ParquetWriter(self._ruta, self.esquema, compression=COMPRESION)
+        self._pendientes = []
+        self.filas = 0
+
+    def writerow(self, valores):
+        self._pendientes.append(valores)
+        if len(self._pendientes) >= FILAS_POR_LOTE:
+            self._vaciar()
+
+    def writerows(self, filas):
+        for valores in filas:
+            self.writerow(valores)
+
+    def _vaciar(self):
+        if self._pendientes:
+            try:
+                lote = _lote_arrow(self._pendientes, self.columnas, self.esquema, self.filas + 2)
+            except _FechaConHora:
+                self._fechas_con_hora()
+                lote = _lote_arrow(self._pendientes, self.columnas, self.esquema, self.filas + 2)
+            self._writer.write_batch(lote)
+            self.filas += len(self._pendientes)
+            self._pendientes = []
+
+    def _fechas_con_hora(self):
+        """Pasa las columnas de fecha a timestamp('s') y reescribe lo ya escrito con ese esquema"""
+        tipos = [pa.timestamp('s') if clase == 'fecha' else campo.type
+                 for campo, (_, clase) in zip(self.esquema, self.columnas)]
+        self.esquema = pa.schema([campo.with_type(t) for campo, t in zip(self.esquema, tipos)],
+                                 metadata=self.esquema.metadata)
+        self._writer.close()
+        anterior = self._ruta + '.date32'
+        os.replace(self._ruta, anterior)
+        try:
+            self._writer = pq.ParquetWriter(self._ruta, self.esquema, compression=COMPRESION)
+            for lote in pq.ParquetFile(anterior).iter_batches(batch_size=FILAS_POR_LOTE):
+                self._writer.write_batch(lote.cast(self.esquema))
+        finally:
+            os.remove(anterior)
+
+    def close(self):
+        self._vaciar()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def csv_a_parquet(entrada, salida, tipo=None, tipado=True):
+    """Convierte un CSV (utf-8 con o sin BOM) a Parquet en streaming. Devuelve (tipo, filas)"""
+    with open(entrada, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        encabezados = next(reader, [])
+        with EscritorParquet(salida, encabezados, tipo, tipado) as escritor:
+            escritor.writerows(valores for valores in reader if valores)
+    return escritor.tipo, escritor.filas
+
+
+def leer_filas(ruta, columnas=None, filas_por_lote=FILAS_POR_LOTE):
+    """
+    (encabezados, iterador de filas como listas de str) leyendo el Parquet por
+    lotes; con `columnas` solo se leen esas columnas del disco.
+    """
+    _requerir_pyarrow()
+    archivo = pq.ParquetFile(str(ruta))
+    encabezados = list(columnas) if columnas else archivo.schema_arrow.names
+
+    def filas():
+        for lote in archivo.iter_batches(batch_size=filas_por_lote, columns=columnas):
+            textos = []
+            for arreglo in lote.columns:
+                if pa.types.is_dictionary(arreglo.type):
+                    # Cada valor distinto se convierte una vez; las filas son índices
+                    diccionario = ['' if v is None else v for v in arreglo.dictionary.to_pylist()] + ['']
+                    indices = arreglo.indices.fill_null(len(diccionario) - 1).to_pylist()
+                    valores = [diccionario[i] for i in indices]
+                elif pa.types.is_date32(arreglo.type):
+                    valores = ['' if v is None else v for v in arreglo.cast(pa.string()).to_pylist()]
+                elif pa.types.is_timestamp(arreglo.type):
+                    # Parquet guarda timestamp('s') en ms; las fechas sin hora quedaron a medianoche
+                    valores = ['' if v is None else v[:10] if v.endswith(' 00:00:00') else v
+                               for v in arreglo.cast(pa.timestamp('s')).cast(pa.string()).to_pylist()]
+                elif pa.types.is_floating(arreglo.type):
+                    valores = ['' if v is None else _formato_nota(v) for v in arreglo.to_pylist()]
+                else:
+                    valores = ['' if v is None else v for v in arreglo.to_pylist()]
+                textos.append(valores)
+            yield from map(list, zip(*textos))
+
+    return encabezados, filas()
+
+
+def parquet_a_csv(entrada, salida, columnas=None, bom=False):
+    """Escribe el Parquet como CSV (csv.writer, CRLF). Devuelve la cantidad de filas"""
+    encabezados, filas = leer_filas(entrada, columnas)
+    total = 0
+    with open(salida, 'w', encoding='utf-8-sig' if bom else 'utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(encabezados)
+        for valores in filas:
+            writer.writerow(valores)
+            total += 1
+    return total
@@ -0,0 +1,145 @@
+"""
+Apertura transparente de archivos comprimidos para los scripts de datos.
+
+abrir(ruta, mode, ...) se usa igual que open(): si la ruta termina en .gz
+o .zst el archivo se (des)comprime en streaming; con cualquier otra
+extensión devuelve exactamente lo mismo que open(), de modo que el
+comportamiento sin compresión no cambia.
+
+Al escribir, la compresión puede correr en un hilo aparte (hilo=True, por
+defecto): el hilo principal formatea el CSV y entrega bloques de BLOQUE bytes
+por una cola acotada; zlib y zstd liberan el GIL mientras comprimen, así que
+ambas cosas se solapan.
+
+gzip usa la biblioteca estándar; zstd requiere el paquete opcional
+`zstandard` (pip install zstandard).
+"""
+
+import gzip
+import io
+import queue
+import threading
+import zlib
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # Dependencia opcional
+    zstandard = None
+
+EXTENSIONES = {'.gz': 'gzip', '.gzip': 'gzip', '.zst': 'zstd', '.zstd': 'zstd'}
+NIVEL_POR_DEFECTO = {'gzip': 6, 'zstd': 3}
+BLOQUE = 1 << 20  # Bytes por escritura entregada al compresor
+COLA = 8  # Bloques en vuelo hacia el hilo compresor
+# Razón de compresión típica de nuestros CSV, para estimar el tamaño descomprimido
+FACTOR_COMPRESION = {'gzip': 8, 'zstd': 10}
+
+
+def compresion(ruta):
+    """'gzip', 'zstd' o None según la extensión"""
+    return EXTENSIONES.get(Path(ruta).suffix.lower())
+
+
+def tamano_estimado(ruta):
+    """Tamaño en bytes del contenido descomprimido (estimado si el archivo está comprimido)"""
+    tamano = Path(ruta).stat().st_size
+    tipo = compresion(ruta)
+    return tamano * FACTOR_COMPRESION[tipo] if tipo else tamano
+
+
+def _requerir_zstd():
+    if zstandard is None:
+        raise ValueError('Se requiere el paquete zstandard para archivos .zst (pip install zstandard)')
+
+
+def _compresor(tipo, nivel):
+    """(comprimir(bytes) -> bytes, terminar() -> bytes)"""
+    if tipo == 'gzip':
+        c = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # Encabezado gzip
+    else:
+        _requerir_zstd()
+        c = zstandard.ZstdCompressor(level=nivel).compressobj()
+    return c.compress, c.flush
+
+
+class _SalidaComprimida(io.RawIOBase):
+    """Flujo binario de escritura que comprime, en el mismo hilo o en uno aparte"""
+
+    def __init__(self, ruta, tipo, nivel, hilo):
+        self._comprimir, self._terminar = _compresor(tipo, nivel)
+        self._archivo = open(ruta, 'wb')
+        self._error = None
+        self._hilo = None
+        if hilo:
+            self._cola = queue.Queue(maxsize=COLA)
+            self._hilo = threading.Thread(target=self._trabajar, name=f"comprimir-{Path(ruta).name}", daemon=True)
+            self._hilo.start()
+
+    def writable(self):
+        return True
+
+    def _trabajar(self):
+        while True:
+            datos = self._cola.get()
+            if datos is None:
+                return
+            if self._error is None:
+                try:
+                    self._archivo.write(self._comprimir(datos))
+                except BaseException as e:  # Se relanza en el hilo principal; se sigue vaciando la cola
+                    self._error = e
+
+    def _revisar(self):
+        if self._error is not None:
+            raise self._error
+
+    def write(self, datos):
+        datos = bytes(datos)
+        if self._hilo is None:
+            self._archivo.write(self._comprimir(datos))
+        else:
+            self._revisar()
+            self._cola.put(datos)
+        return len(datos)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._hilo is not None:
+                self._cola.put(None)
+                self._hilo.join()
+                self._revisar()
+            self._archivo.write(self._terminar())
+        finally:
+            self._archivo.close()
+            super().close()
+
+
+def _lector(ruta, tipo):
+    if tipo == 'gzip':
+        return gzip.open(ruta, 'rb')
+    _requerir_zstd()
+    crudo = zstandard.ZstdDecompressor().stream_reader(open(ruta, 'rb'), read_across_frames=True, closefd=True)
+    return io.BufferedReader(crudo, BLOQUE)
+
+
+def abrir(ruta, mode='r', buffering=-1, encoding=None, errors=None, newline=None, *, hilo=True, nivel=None):
+    """
+    open() con (des)compresión según la extensión. Solo modos 'r', 'w', 'rb' y
+    'wb' para archivos comprimidos (sin append ni seek).
+    """
+    tipo = compresion(ruta)
+    if tipo is None:
+        return open(ruta, mode, buffering, encoding, errors, newline)
+    if mode.replace('t', '') not in ('r', 'w', 'rb', 'wb'):
+        raise ValueError(f"Modo '{mode}' no soportado para archivos {tipo}")
+
+    if 'r' in mode:
+        binario = _lector(ruta, tipo)
+    else:
+        salida = _SalidaComprimida(ruta, tipo, nivel or NIVEL_POR_DEFECTO[tipo], hilo)
+        binario = io.BufferedWriter(salida, buffering if buffering > 1 else BLOQUE)
+    if 'b' in mode:
+        return binario
+    return io.TextIOWrapper(binario, encoding=encoding or 'utf-8', errors=errors, newline=newline)
@@ -0,0 +1,146 @@
+"""
+Control AIMD (aumento aditivo, disminución multiplicativa) del tamaño de
+petición y de la concurrencia de la carga masiva.
+
+bulk-upload-grades confirma un batch cada 200 escrituras y duerme entre
+lotes; cuánto aguanta depende de la carga del servidor y de Firestore, así
+que en vez de fijar filas por petición y peticiones en vuelo, el cliente
+las ajusta con lo que observa en cada respuesta:
+
+- Filas por petición: crecen de a `paso_filas` mientras la latencia de la
+  petición queda bajo `latencia_objetivo` (lejos del maxDuration de 300 s de
+  la ruta); se multiplican por `factor` si la superan.
+- Concurrencia: crece en 1 por cada ronda completa de peticiones exitosas
+  (como la ventana de TCP); se multiplica por `factor` si el costo por fila
+  (segundos / filas) sube más de `holgura` sobre el mejor de la ventana
+  reciente, señal de que las peticiones en vuelo compiten entre sí.
+- Errores reintentables: si superan `umbral_errores` en la ventana, bajan
+  ambos.
+
+Una bajada solo se aplica una vez por señal: las respuestas de peticiones
+iniciadas antes de la última bajada no vuelven a bajar ni subir nada.
+Las filas se redondean a múltiplos de LOTE_RUTA.
+
+El mejor punto de operación (self.mejor) se mide solo con las peticiones
+de la ventana que corrieron en ese punto (mismas filas y concurrencia al
+iniciar), y solo cuando hay al menos una ronda completa de ellas.
+"""
+
+import threading
+import time
+from collections import deque
+
+from .carga_masiva import LOTE_RUTA
+
+
+def _redondear(filas):
+    return max(LOTE_RUTA, int(filas) // LOTE_RUTA * LOTE_RUTA)
+
+
+class ControladorAimd:
+    def __init__(self, filas=2000, concurrencia=2, filas_min=LOTE_RUTA, filas_max=50000, concurrencia_min=1,
+                 concurrencia_max=8, latencia_objetivo=60.0, paso_filas=1000, factor=0.5, holgura=0.5,
+                 umbral_errores=0.1, ventana=20, log=print):
+        self.filas_min = _redondear(filas_min)
+        self.filas_max = _redondear(filas_max)
+        self.concurrencia_min = max(1, concurrencia_min)
+        self.concurrencia_max = max(self.concurrencia_min, concurrencia_max)
+        self.latencia_objetivo = latencia_objetivo
+        self.paso_filas = paso_filas
+        self.factor = factor
+        self.holgura = holgura
+        self.umbral_errores = umbral_errores
+        self.log = log
+        self._filas = min(max(filas, self.filas_min), self.filas_max)
+        self._concurrencia = min(max(concurrencia, self.concurrencia_min), self.concurrencia_max)
+        self._credito = 0.0
+        self._epoca = 0
+        self._ventana = deque(maxlen=ventana)  # (inicio, fin, filas, segundos, ok, concurrencia)
+        self._respuestas = 0
+        self.mejor = None  # (filas/s, filas, concurrencia)
+        self._lock = threading.Lock()
+
+    @property
+    def filas(self):
+        """Filas para la próxima petición (múltiplo de LOTE_RUTA)"""
+        return _redondear(self._filas)
+
+    @property
+    def concurrencia(self):
+        """Peticiones en vuelo permitidas"""
+        return int(self._concurrencia)
+
+    def iniciar(self):
+        """Marca de la petición que empieza (época y concurrencia vigentes); se devuelve en registrar()"""
+        return self._epoca, self.concurrencia
+
+    def tasa_errores(self):
+        if not self._ventana:
+            return 0.0
+        return sum(1 for entrada in self._ventana if not entrada[4]) / len(self._ventana)
+
+    def filas_por_segundo(self, punto=None):
+        """Filas/s de las peticiones exitosas de la ventana; con `punto` (filas, concurrencia), solo las de ese punto"""
+        exitosas = [(inicio, fin, filas) for inicio, fin, filas, _, ok, concurrencia in self._ventana
+                    if ok and (punto is None or (filas, concurrencia) == punto)]
+        if not exitosas:
+            return 0.0
+        desde = min(inicio for inicio, _, _ in exitosas)
+        hasta = max(fin for _, fin, _ in exitosas)
+        return sum(filas for *_, filas in exitosas) / max(hasta - desde, 1e-6)
+
+    def _costo_base(self):
+        costos = [segundos / filas for _, _, filas, segundos, ok, _ in self._ventana if ok and filas]
+        return min(costos) if costos else None
+
+    def registrar(self, marca, filas, segundos, ok):
+        """Resultado de un intento: `filas` enviadas, `segundos` de latencia, `ok` si la ruta lo confirmó"""
+        with self._lock:
+            self._registrar(marca, filas, segundos, ok)
+
+    def _registrar(self, marca, filas, segundos, ok):
+        epoca, concurrencia = marca
+        fin = time.monotonic()
+        base = self._costo_base()
+        self._ventana.append((fin - segundos, fin, filas, segundos, ok, concurrencia))
+        self._respuestas += 1
+        antes = (self.filas, self.concurrencia)
+        motivo = None
+
+        if epoca == self._epoca:
+            if not ok:
+                if self.tasa_errores() > self.umbral_errores:
+                    self._bajar(filas=True, concurrencia=True)
+                    motivo = f'errores {self.tasa_errores():.0%}'
+            elif segundos > self.latencia_objetivo:
+                self._bajar(filas=True)
+                motivo = f'latencia {segundos:.1f}s > {self.latencia_objetivo:.0f}s'
+            elif (base is not None and self._concurrencia > self.concurrencia_min
+                  and segundos / max(filas, 1) > base * (1 + self.holgura)):
+                self._bajar(concurrencia=True)
+                motivo = f'costo por fila +{segundos / max(filas, 1) / base - 1:.0%}'
+            else:
+                self._filas = min(self.filas_max, self._filas + self.paso_filas)
+                self._credito += 1 / self._concurrencia
+                if self._credito >= 1:
+                    self._credito = 0.0
+                    self._concurrencia = min(self.concurrencia_max, self._concurrencia + 1)
+
+        ritmo = self.filas_por_segundo()
+        punto = (filas, concurrencia)
+        if ok and sum(1 for e in self._ventana if e[4] and (e[2], e[5]) == punto) >= concurrencia:
+            ritmo_punto = self.filas_por_segundo(punto)
+            if self.mejor is None or ritmo_punto > self.mejor[0]:
+                self.mejor = (ritmo_punto, filas, concurrencia)
+        if motivo or antes[1] != self.concurrencia or self._respuestas % self._ventana.maxlen == 0:
+            self.log(f"   🎛️ {self.filas:,} filas/petición × {self.concurrencia} en vuelo"
+                     f"{f' ({motivo})' if motivo else ''} — {segundos:.1f}s, errores {self.tasa_errores():.0%}, "
+                     f"{ritmo:,.0f} filas/s")
+
+    def _bajar(self, filas=False, concurrencia=False):
+        if filas:
+            self._filas = max(self.filas_min, self._filas * self.factor)
+        if concurrencia:
+            self._concurrencia = max(self.concurrencia_min, int(self._concurrencia * self.factor))
+            self._credito = 0.0
+        self._epoca += 1
@@ -0,0 +1,459 @@
+"""
+Exportación NDJSON de calificaciones y asistencia con la forma exacta de los
+documentos que escriben bulk-upload-grades (gradeDoc) y bulk-upload-attendance
+(attendanceData).
+
+La ruta vuelve a derivar en el servidor, fila por fila, courseId, sectionId,
+subjectId, testId, type, gradedAt y year. Aquí se calculan offline con la
+réplica de testdata.carga_masiva, y cada línea del NDJSON es un documento
+listo para escribir en
+    courses/{courseId}/grades/{id}       (calificaciones)
+    courses/{courseId}/attendance/{id}   (asistencia)
+sin parsear ni normalizar CSV.
+
+csv_a_actividades exporta aparte, en una sola pasada, el activitiesMap que
+bulk-upload-grades arma en memoria mientras recorre las filas y escribe al
+final (courses/{courseId}/activities/{id}), para cargarlo antes que las
+calificaciones.
+
+Los Timestamp se escriben como {"_seconds": s, "_nanoseconds": n}, que es lo
+que produce JSON.stringify de un admin.firestore.Timestamp. createdAt y
+updatedAt llevan la hora de la exportación (la ruta usa la hora de la carga).
+
+Se usa orjson si está instalado (dependencia opcional: pip install orjson);
+si no, el codificador en C de json de la biblioteca estándar.
+"""
+
+import csv
+import json
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import chain
+
+from .carga_masiva import (
+    ALIAS_ASISTENCIA,
+    ALIAS_CALIFICACIONES,
+    ENCABEZADOS_ASISTENCIA,
+    Columnas,
+    MapaSecciones,
+    MapaSeccionesAsistencia,
+    detectar_delimitador,
+    dia_iso_utc,
+    epoch_ms,
+    id_asistencia,
+    ids_calificacion,
+    iso_js,
+    job_id_corto,
+    job_id_por_defecto,
+    leer_csv_como_ruta,
+    normalizar_tipo,
+    parece_encabezado_asistencia,
+    parse_flexible_date,
+    parse_score,
+    to_id,
+)
+from .comprimido import abrir
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional
+    orjson = None
+
+LINEAS_POR_ESCRITURA = 4096
+COLUMNAS_ACTIVIDADES = [
+    'activityId', 'key', 'courseId', 'sectionId', 'subjectId', 'subjectName', 'taskType', 'title', 'topic',
+    'day', 'startAt', 'openAt', 'dueDate', 'status', 'assignedById', 'assignedByName', 'year', 'createdAt',
+]
+_EPOCA = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_JSON = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), check_circular=False)
+
+
+def codificar(documento):
+    """Documento -> bytes UTF-8 de una línea JSON (sin salto)"""
+    if orjson is not None:
+        return orjson.dumps(documento)
+    return _JSON.encode(documento).encode('utf-8')
+
+
+@lru_cache(maxsize=1 << 16)
+def timestamp(dt):
+    """
+    admin.firestore.Timestamp.fromDate(dt) tal como lo serializa JSON.stringify.
+    Memorizada (las fechas se repiten); el dict devuelto es compartido, no modificarlo.
+    """
+    ms = epoch_ms(dt)
+    return {'_seconds': ms // 1000, '_nanoseconds': ms % 1000 * 1_000_000}
+
+
+@lru_cache(maxsize=1 << 16)
+def _dia(dt):
+    return dia_iso_utc(dt)
+
+
+def _ahora(ahora):
+    return timestamp(ahora or datetime.now(timezone.utc))
+
+
+class _Documentos:
+    def _rechazar(self, motivo):
+        """Cuenta el motivo (también queda en self.ultimo_rechazo) y devuelve None"""
+        self.rechazos[motivo] += 1
+        self.ultimo_rechazo = motivo
+        return None
+
+
+class DocumentosCalificaciones(_Documentos):
+    """
+    gradeDoc de cada fila; las filas que la ruta rechaza devuelven None y se
+    cuentan en self.rechazos. Con actividades=True también arma, como la
+    ruta, el activitiesMap (self.actividades: clave -> activityDoc).
+    """
+
+    tipo = 'calificaciones'
+
+    def __init__(self, encabezados, job_id=None, secciones=None, zona=None, anio=None, ahora=None,
+                 actividades=False):
+        self.columnas = Columnas(encabezados, ALIAS_CALIFICACIONES)
+        # Sin jobId, el que asigna la ruta (import-grades-<ms>)
+        self.job_corto = job_id_corto(job_id or job_id_por_defecto())
+        self.secciones = secciones if isinstance(secciones, MapaSecciones) else MapaSecciones(secciones)
+        self.zona = zona
+        self.anio = anio or datetime.now().year
+        self.ahora = _ahora(ahora)
+        self.rechazos = Counter()
+        self.ultimo_rechazo = None
+        self.actividades = {} if actividades else None
+
+    def documento(self, valores):
+        valor = self.columnas.valor
+        nombre = valor(valores, 'nombre')
+        rut = valor(valores, 'rut')
+        curso = valor(valores, 'curso')
+        fecha_str = valor(valores, 'fecha')
+        nota_str = valor(valores, 'nota')
+        if not (nombre and rut and curso and fecha_str and nota_str):
+            return self._rechazar('faltan campos requeridos')
+        score = parse_score(nota_str)
+        if score is None:
+            return self._rechazar('nota inválida')
+        fecha = parse_flexible_date(fecha_str, self.zona)
+        if fecha is None:
+            return self._rechazar('fecha inválida')
+
+        asignatura = valor(valores, 'asignatura')
+        profesor = valor(valores, 'profesor')
+        tema = valor(valores, 'tema') or None
+        tipo = normalizar_tipo(valor(valores, 'tipo'))
+        section_id = self.secciones.section_id(curso, valor(valores, 'seccion'))
+        course_id, test_id, doc_id = ids_calificacion(self.job_corto, rut, curso, section_id, asignatura,
+                                                      tipo, fecha, valor(valores, 'actividad'))
+        if asignatura and self.actividades is not None:
+            self._actividad(course_id, section_id, asignatura, tipo, fecha, tema, profesor)
+        return {
+            'id': doc_id,
+            'testId': test_id,
+            'jobId': self.job_corto,
+            'studentId': rut,
+            'studentName': nombre,
+            'score': score,
+            'courseId': course_id,
+            'sectionId': section_id,
+            'subjectId': to_id(asignatura) if asignatura else None,
+            'subjectName': asignatura or None,
+            'subject': asignatura or None,
+            'title': tema or f"{asignatura or 'Evaluación'} {_dia(fecha)}",
+            'gradedAt': timestamp(fecha),
+            'year': self.anio,
+            'type': tipo,
+            'createdAt': self.ahora,
+            'updatedAt': self.ahora,
+            'teacherName': profesor or None,
+            'topic': tema,
+        }
+
+    def _actividad(self, course_id, section_id, asignatura, tipo, fecha, tema, profesor):
+        """activityDoc de la primera fila de cada courseId|sección|asignatura|tipo|día"""
+        seccion = section_id or 'all'
+        dia = _dia(fecha)
+        clave = (course_id, seccion, to_id(asignatura), tipo, dia)
+        if clave in self.actividades:
+            return
+        inicio = timestamp(fecha)
+        self.actividades[clave] = {
+            'id': to_id(course_id, seccion, asignatura, tipo, dia),
+            'taskType': tipo,
+            'title': tema or f"{tipo.upper()} {asignatura} {dia}",
+            'subjectId': to_id(asignatura),
+            'subjectName': asignatura,
+            'topic': tema,
+            'courseId': course_id,
+            'sectionId': section_id,
+            'createdAt': self.ahora,
+            'startAt': inicio,
+            'openAt': inicio,
+            'dueDate': inicio,
+            'status': 'completed',
+            'assignedById': 'system',
+            'assignedByName': profesor or 'System',
+            'year': self.anio,
+        }
+
+
+class DocumentosAsistencia(_Documentos):
+    """attendanceData de cada fila; las filas que la ruta rechaza devuelven None y se cuentan en self.rechazos"""
+
+    tipo = 'asistencia'
+
+    def __init__(self, encabezados, secciones=None, zona=None, ahora=None):
+        self.columnas = Columnas(encabezados, ALIAS_ASISTENCIA)
+        self.secciones = (secciones if isinstance(secciones, MapaSeccionesAsistencia)
+                          else MapaSeccionesAsistencia(secciones))
+        self.zona = zona
+        self.ahora = _ahora(ahora)
+        self.rechazos = Counter()
+        self.ultimo_rechazo = None
+
+    def documento(self, valores):
+        valor = self.columnas.valor
+        fecha_str = valor(valores, 'fecha')
+        curso = valor(valores, 'curso')
+        seccion = valor(valores, 'seccion')
+        username = valor(valores, 'username')
+        rut = valor(valores, 'rut')
+        estado = valor(valores, 'estado')
+        identificador = username or rut
+        if not (fecha_str and curso and identificador and estado):
+            return self._rechazar('faltan campos obligatorios')
+        fecha = parse_flexible_date(fecha_str, self.zona)
+        if fecha is None:
+            return self._rechazar('fecha inválida')
+
+        course_id, attendance_id = id_asistencia(fecha_str, curso, seccion, identificador)
+        return {
+            'id': attendance_id,
+            'date': timestamp(fecha),
+            'dateString': fecha_str,
+            'courseId': course_id,
+            'course': curso,
+            'section': seccion or None,
+            'studentUsername': username or None,
+            'studentIdentifier': identificador,
+            'rut': rut or None,
+            'studentName': valor(valores, 'nombre') or None,
+            'status': estado,
+            # recordYear: año de la fecha en la hora local del servidor
+            'year': fecha.astimezone(self.zona).year if self.zona else fecha.astimezone().year,
+            'createdAt': self.ahora,
+            'updatedAt': self.ahora,
+            'sectionId': self.secciones.section_id(curso, seccion),
+            'comment': valor(valores, 'comentario') or None,
+        }
+
+
+def documentos(tipo, encabezados, **opciones):
+    """DocumentosCalificaciones o DocumentosAsistencia según `tipo`"""
+    if tipo == 'calificaciones':
+        return DocumentosCalificaciones(encabezados, **opciones)
+    for opcion in ('job_id', 'anio', 'actividades'):
+        opciones.pop(opcion, None)
+    return DocumentosAsistencia(encabezados, **opciones)
+
+
+def mapa_secciones_formulario(secciones, cursos):
+    """
+    sectionMap ("Curso|Sección" -> sectionId) que ambas rutas arman con los
+    campos `sections` y `courses` del formulario (JSON o listas ya leídas).
+    """
+    if not (secciones and cursos):
+        return {}
+    secciones = json.loads(secciones) if isinstance(secciones, (str, bytes)) else secciones
+    cursos = json.loads(cursos) if isinstance(cursos, (str, bytes)) else cursos
+    nombres = {str(c['id']): str(c['name']).strip() for c in cursos if c and c.get('id') and c.get('name')}
+    mapa = {}
+    for s in secciones:
+        if s and s.get('id') and s.get('courseId') and s.get('name'):
+            curso = nombres.get(str(s['courseId']))
+            if curso:
+                mapa[f"{curso}|{str(s['name']).strip()}"] = str(s['id'])
+    return mapa
+
+
+class EscritorNdjson:
+    """
+    Escritor por filas (listas en el orden de `encabezados`), con la misma
+    interfaz que csv.writer / EscritorParquet, que escribe un documento por
+    línea. Las filas que la ruta rechazaría se omiten (ver self.rechazos).
+    Acepta rutas .gz/.zst (testdata.comprimido).
+    """
+
+    def __init__(self, ruta, encabezados, tipo='calificaciones', **opciones):
+        self.documentos = documentos(tipo, encabezados, **opciones)
+        self._archivo = abrir(ruta, 'wb')
+        self._pendientes = []
+        self.filas = 0
+
+    @property
+    def rechazos(self):
+        return self.documentos.rechazos
+
+    def writerow(self, valores):
+        documento = self.documentos.documento(valores)
+        if documento is None:
+            return
+        self._pendientes.append(codificar(documento))
+        if len(self._pendientes) >= LINEAS_POR_ESCRITURA:
+            self._vaciar()
+
+    def writerows(self, filas):
+        for valores in filas:
+            self.writerow(valores)
+
+    def _vaciar(self):
+        if self._pendientes:
+            self._archivo.write(b'\n'.join(self._pendientes) + b'\n')
+            self.filas += len(self._pendientes)
+            self._pendientes = []
+
+    def close(self):
+        try:
+            self._vaciar()
+        finally:
+            self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def leer_como_ruta(lineas, tipo):
+    """
+    (encabezados, iterador de filas) de un iterable de líneas (p. ej. el
+    archivo abierto con newline=''), leídas como lo hace la ruta de `tipo`:
+    calificaciones con leer_csv_como_ruta; asistencia con detección de
+    delimitador y de encabezado (sin encabezado se usan ENCABEZADOS_ASISTENCIA).
+    """
+    if tipo == 'calificaciones':
+        encabezados, filas = leer_csv_como_ruta(lineas)
+        return encabezados, (valores for _, valores in filas)
+    lineas = iter(lineas)
+    primera = next(lineas, '')
+    delimitador = detectar_delimitador(primera.lstrip(chr(0xfeff)).rstrip('\r\n'))
+    if parece_encabezado_asistencia(primera):
+        reader = csv.reader(chain([primera.lstrip(chr(0xfeff))], lineas), delimiter=delimitador)
+        encabezados = next(reader, [])
+    else:
+        reader = csv.reader(chain([primera], lineas), delimiter=delimitador)
+        encabezados = list(ENCABEZADOS_ASISTENCIA)
+    return encabezados, (valores for valores in reader if valores)  # skipEmptyLines
+
+
+def detectar_tipo_ruta(encabezados):
+    """'calificaciones' si hay columna de nota (la regla de validate-upload-csv), si no 'asistencia'"""
+    return 'calificaciones' if Columnas(encabezados, ALIAS_CALIFICACIONES).posiciones['nota'] else 'asistencia'
+
+
+def csv_a_ndjson(entrada, salida, tipo=None, **opciones):
+    """Convierte un CSV de carga a NDJSON en streaming. Devuelve (tipo, documentos, rechazos)"""
+    with abrir(entrada, 'r', encoding='utf-8-sig', newline='') as f:
+        lineas = iter(f)
+        if tipo is None:
+            primera = next(lineas, '')
+            tipo = detectar_tipo_ruta(next(csv.reader([primera]), []))
+            lineas = chain([primera], lineas)
+        encabezados, filas = leer_como_ruta(lineas, tipo)
+        with EscritorNdjson(salida, encabezados, tipo, **opciones) as escritor:
+            escritor.writerows(filas)
+    return tipo, escritor.filas, escritor.rechazos
+
+
+# ---------------- Actividades ----------------
+
+def iso_timestamp(ts):
+    """{"_seconds", "_nanoseconds"} -> date.toISOString()"""
+    return iso_js(_EPOCA + timedelta(seconds=ts['_seconds'], microseconds=ts['_nanoseconds'] // 1000))
+
+
+class EscritorActividades:
+    """
+    Escribe activityDoc a medida que aparecen: NDJSON con el documento tal
+    cual, o CSV (COLUMNAS_ACTIVIDADES) con la clave del activitiesMap
+    (courseId|sectionId|subject|type|day) y las fechas en ISO. El formato
+    se toma de la extensión de la ruta (.csv o no) salvo que se indique.
+    Acepta rutas .gz/.zst (testdata.comprimido).
+    """
+
+    def __init__(self, ruta, formato=None):
+        nombre = str(ruta)
+        for extension in ('.gz', '.zst'):
+            nombre = nombre[:-len(extension)] if nombre.endswith(extension) else nombre
+        self.formato = formato or ('csv' if nombre.endswith('.csv') else 'ndjson')
+        self.filas = 0
+        if self.formato == 'csv':
+            self._archivo = abrir(ruta, 'w', encoding='utf-8', newline='')
+            self._csv = csv.writer(self._archivo)
+            self._csv.writerow(COLUMNAS_ACTIVIDADES)
+        else:
+            self._archivo = abrir(ruta, 'wb')
+            self._pendientes = []
+
+    def agregar(self, clave, actividad):
+        self.filas += 1
+        if self.formato == 'csv':
+            self._csv.writerow([
+                actividad['id'], '|'.join(clave), actividad['courseId'], actividad['sectionId'],
+                actividad['subjectId'], actividad['subjectName'], actividad['taskType'], actividad['title'],
+                actividad['topic'], clave[-1], iso_timestamp(actividad['startAt']),
+                iso_timestamp(actividad['openAt']), iso_timestamp(actividad['dueDate']), actividad['status'],
+                actividad['assignedById'], actividad['assignedByName'], actividad['year'],
+                iso_timestamp(actividad['createdAt']),
+            ])
+            return
+        self._pendientes.append(codificar(actividad))
+        if len(self._pendientes) >= LINEAS_POR_ESCRITURA:
+            self._vaciar()
+
+    def _vaciar(self):
+        if self.formato != 'csv' and self._pendientes:
+            self._archivo.write(b'\n'.join(self._pendientes) + b'\n')
+            self._pendientes = []
+
+    def close(self):
+        try:
+            self._vaciar()
+        finally:
+            self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def csv_a_actividades(entrada, salida, formato=None, **opciones):
+    """
+    Exporta en streaming las actividades que crearía bulk-upload-grades con
+    este CSV (una por courseId|sección|asignatura|tipo|día, con los datos de
+    su primera fila). Devuelve (filas válidas, actividades, rechazos).
+    Las opciones son las de DocumentosCalificaciones (job_id no cambia los
+    id de las actividades).
+    """
+    with abrir(entrada, 'r', encoding='utf-8-sig', newline='') as f:
+        encabezados, filas = leer_como_ruta(f, 'calificaciones')
+        generador = DocumentosCalificaciones(encabezados, actividades=True, **opciones)
+        actividades = generador.actividades
+        validas = 0
+        with EscritorActividades(salida, formato) as escritor:
+            for valores in filas:
+                antes = len(actividades)
+                if generador.documento(valores) is None:
+                    continue
+                validas += 1
+                if len(actividades) != antes:
+                    # Los dict conservan el orden de inserción: la nueva es la última
+                    clave, actividad = next(reversed(actividades.items()))
+                    escritor.agregar(clave, actividad)
+    return validas, escritor.filas, generador.rechazos
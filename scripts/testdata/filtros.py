@@ -0,0 +1,203 @@
+"""
+Motor de filtrado de CSV por reglas declarativas.
+
+Un conjunto de reglas es un dict (o un JSON) de la forma:
+
+    {
+      "conjuntos": {"CURSOS_BASICA": ["1ro Básico", "2do Básico"]},
+      "reglas": [
+        {"nombre": "estudiantes", "donde": {"role": "student"}, "accion": "mantener"},
+        {"nombre": "profesores básica",
+         "donde": {"role": "teacher", "course": "@CURSOS_BASICA", "subjects": ["CNT", "MAT"]},
+         "accion": "mantener"},
+        {"nombre": "ruts bloqueados", "donde": {"rut": {"rut_en_archivo": "bloqueados.txt"}},
+         "accion": "descartar"}
+      ],
+      "por_defecto": "descartar"
+    }
+
+Las reglas se evalúan en orden y gana la primera que calza. Condiciones por
+columna:
+- "valor"                  igualdad exacta
+- ["a", "b"] / "@CONJUNTO" pertenencia a un conjunto
+- {"en": [...]} / {"no_en": [...]}
+- {"regex": "..."}         re.fullmatch
+- {"vacio": true|false}
+- {"rut_en": [...]} / {"rut_en_archivo": "ruta"}  RUT normalizado (sin puntos ni guion, DV en mayúscula)
+
+Las reglas se compilan una sola vez a una función con los índices de columna
+y las constantes (frozensets, regex precompilados) ya resueltos, y las filas
+se leen y escriben como listas (csv.reader/csv.writer con buffer grande).
+Los contadores por regla reemplazan los print por fila.
+"""
+
+import csv
+import json
+import re
+from collections import Counter
+from pathlib import Path
+
+from .comprimido import abrir
+from .rut import separar_rut
+
+ACCIONES = ('mantener', 'descartar')
+BUFFER_ESCRITURA = 1 << 20
+
+
+def _rut_normalizado(valor):
+    partes = separar_rut(valor)
+    return f"{partes[0]}{partes[1]}" if partes else valor.strip().upper()
+
+
+def _leer_lista(ruta, base):
+    """Un valor por línea (las líneas vacías y las que empiezan con # se ignoran)"""
+    ruta = Path(ruta)
+    if not ruta.is_absolute() and base:
+        ruta = Path(base) / ruta
+    with open(ruta, 'r', encoding='utf-8-sig') as f:
+        return [l.strip() for l in f if l.strip() and not l.lstrip().startswith('#')]
+
+
+class ReglasCompiladas:
+    """Reglas ya resueltas contra un encabezado concreto"""
+
+    def __init__(self, definicion, encabezados, base=None):
+        self.encabezados = list(encabezados)
+        conjuntos = {k: frozenset(v) for k, v in definicion.get('conjuntos', {}).items()}
+        self.por_defecto = definicion.get('por_defecto', 'mantener')
+        if self.por_defecto not in ACCIONES:
+            raise ValueError(f"por_defecto debe ser uno de {ACCIONES}")
+
+        self.reglas = []
+        for n, regla in enumerate(definicion.get('reglas', []), start=1):
+            nombre = regla.get('nombre') or f"regla {n}"
+            accion = regla.get('accion', 'mantener')
+            if accion not in ACCIONES:
+                raise ValueError(f"{nombre}: acción '{accion}' no válida")
+            condiciones = [self._compilar(nombre, columna, cond, conjuntos, base)
+                           for columna, cond in regla.get('donde', {}).items()]
+            self.reglas.append((nombre, accion == 'mantener', tuple(condiciones)))
+        self.clasificar = self.compilar()
+
+    def _indice(self, nombre, columna):
+        if columna not in self.encabezados:
+            raise ValueError(f"{nombre}: la columna '{columna}' no existe en el CSV")
+        return self.encabezados.index(columna)
+
+    def _compilar(self, nombre, columna, cond, conjuntos, base):
+        """(indice, operador, constante): 'eq' / 'in' / 'not in' / 'call'"""
+        i = self._indice(nombre, columna)
+
+        def conjunto(valores):
+            if isinstance(valores, str) and valores.startswith('@'):
+                if valores[1:] not in conjuntos:
+                    raise ValueError(f"{nombre}: conjunto '{valores}' no definido")
+                return conjuntos[valores[1:]]
+            return frozenset(valores)
+
+        if isinstance(cond, str) and not cond.startswith('@'):
+            return i, 'eq', cond
+        if isinstance(cond, (list, str)):
+            return i, 'in', conjunto(cond)
+        if not isinstance(cond, dict) or len(cond) != 1:
+            raise ValueError(f"{nombre}: condición no válida para '{columna}': {cond!r}")
+
+        tipo, arg = next(iter(cond.items()))
+        if tipo == 'en':
+            return i, 'in', conjunto(arg)
+        if tipo == 'no_en':
+            return i, 'not in', conjunto(arg)
+        if tipo == 'regex':
+            return i, 'call', re.compile(arg).fullmatch
+        if tipo == 'vacio':
+            return i, 'call', (lambda v: not v.strip()) if arg else (lambda v: bool(v.strip()))
+        if tipo in ('rut_en', 'rut_en_archivo'):
+            lista = _leer_lista(arg, base) if tipo == 'rut_en_archivo' else arg
+            ruts = frozenset(_rut_normalizado(r) for r in lista)
+            return i, 'call', lambda v: _rut_normalizado(v) in ruts
+        raise ValueError(f"{nombre}: tipo de condición '{tipo}' desconocido")
+
+    def compilar(self):
+        """
+        Genera una sola función clasificar(fila) -> (accion, regla) con las
+        reglas desplegadas como if/and sobre índices fijos y constantes, sin
+        recorrer listas de condiciones por fila. La fila debe tener al menos
+        len(encabezados) columnas.
+        """
+        constantes = {}
+        lineas = ['def clasificar(v):']
+        for n, (nombre, mantener, condiciones) in enumerate(self.reglas):
+            partes = []
+            for m, (i, operador, constante) in enumerate(condiciones):
+                k = f"k{n}_{m}"
+                constantes[k] = constante
+                if operador == 'call':
+                    partes.append(f"{k}(v[{i}])")
+                else:
+                    partes.append(f"v[{i}] {'==' if operador == 'eq' else operador} {k}")
+            constantes[f"r{n}"] = ('mantener' if mantener else 'descartar', nombre)
+            lineas.append(f"    if {' and '.join(partes) or 'True'}:")
+            lineas.append(f"        return r{n}")
+        constantes['r_defecto'] = (self.por_defecto, 'por_defecto')
+        lineas.append('    return r_defecto')
+        exec('\n'.join(lineas), constantes)
+        return constantes['clasificar']
+
+
+def cargar_reglas(ruta):
+    """Lee un JSON de reglas; las rutas relativas de listas se resuelven junto al JSON"""
+    ruta = Path(ruta)
+    with open(ruta, 'r', encoding='utf-8') as f:
+        definicion = json.load(f)
+    definicion.setdefault('_base', str(ruta.parent))
+    return definicion
+
+
+def filtrar(entrada, salida, definicion, descartadas=None, muestras=0):
+    """
+    Filtra entrada -> salida. Con `descartadas` las filas eliminadas se
+    escriben en ese archivo. Devuelve (contadores, ejemplos) donde contadores
+    es un Counter de (accion, regla) y ejemplos las primeras `muestras` filas
+    descartadas. Conserva el BOM de la entrada si lo tiene.
+    """
+    with abrir(entrada, 'rb') as f:
+        con_bom = f.read(3) == b'\xef\xbb\xbf'
+    codificacion = 'utf-8-sig' if con_bom else 'utf-8'
+
+    contadores = Counter()
+    ejemplos = []
+    with abrir(entrada, 'r', encoding=codificacion, newline='') as f_in, \
+            abrir(salida, 'w', encoding=codificacion, newline='', buffering=BUFFER_ESCRITURA) as f_out:
+        reader = csv.reader(f_in)
+        encabezados = next(reader, [])
+        reglas = ReglasCompiladas(definicion, encabezados, definicion.get('_base'))
+        writer = csv.writer(f_out)
+        writer.writerow(encabezados)
+
+        f_desc = None
+        if descartadas:
+            f_desc = abrir(descartadas, 'w', encoding=codificacion, newline='', buffering=BUFFER_ESCRITURA)
+            writer_desc = csv.writer(f_desc)
+            writer_desc.writerow(encabezados)
+        try:
+            clasificar = reglas.clasificar
+            escribir = writer.writerow
+            ancho = len(encabezados)
+            for valores in reader:
+                if not valores:
+                    continue  # Línea vacía: el script anterior (DictReader) también la omitía
+                if len(valores) < ancho:
+                    valores += [''] * (ancho - len(valores))
+                clave = clasificar(valores)
+                contadores[clave] += 1
+                if clave[0] == 'mantener':
+                    escribir(valores)
+                else:
+                    if f_desc:
+                        writer_desc.writerow(valores)
+                    if len(ejemplos) < muestras:
+                        ejemplos.append(dict(zip(encabezados, valores)))
+        finally:
+            if f_desc:
+                f_desc.close()
+    return contadores, ejemplos
@@ -0,0 +1,266 @@
+"""
+Reemplazo local de lo que las rutas de carga usan de admin.firestore():
+db.batch() con set(ruta, datos, merge) y commit(), y set()/delete() de un
+documento suelto.
+
+Cada commit tarda `latencia` segundos más `latencia_op` por escritura y falla
+con probabilidad `fallos`. Como en el SDK de Node, un WriteBatch queda
+"committed" apenas se llama a commit(), aunque falle: volver a usarlo lanza
+el mismo error que Firestore ("Cannot modify a WriteBatch that has been
+committed."), y un lote de más de 500 escrituras se rechaza.
+
+FirestoreSimulado solo guarda los documentos de imports/ (el progreso de
+cada jobId); el resto de las escrituras solo se cuenta. FirestoreEnMemoria
+lleva además la cuenta por colección de cada escritura (creaciones,
+sobrescrituras y tamaño del documento resultante) para simular una carga
+en seco.
+"""
+
+import random
+import threading
+import time
+from array import array
+from collections import defaultdict
+
+MAX_ESCRITURAS_LOTE = 500
+MAX_TAMANO_DOCUMENTO = 1 << 20
+
+
+class ErrorCommit(Exception):
+    pass
+
+
+class Lote:
+    """WriteBatch: acumula escrituras hasta commit()"""
+
+    def __init__(self, db):
+        self._db = db
+        self._operaciones = []
+        self._confirmado = False
+
+    def _verificar(self):
+        if self._confirmado:
+            raise ErrorCommit('Cannot modify a WriteBatch that has been committed.')
+
+    def set(self, ruta, datos, merge=False):
+        self._verificar()
+        self._operaciones.append((ruta, datos, merge))
+        return self
+
+    def delete(self, ruta):
+        self._verificar()
+        self._operaciones.append((ruta, None, False))
+        return self
+
+    def __len__(self):
+        return len(self._operaciones)
+
+    def commit(self):
+        self._verificar()
+        self._confirmado = True
+        if len(self._operaciones) > MAX_ESCRITURAS_LOTE:
+            raise ErrorCommit(f'3 INVALID_ARGUMENT: maximum {MAX_ESCRITURAS_LOTE} writes allowed per request')
+        self._db._commit(self._operaciones, lote=True)
+
+
+class FirestoreSimulado:
+    def __init__(self, latencia=0.0, latencia_op=0.0, fallos=0.0, semilla=None):
+        self.latencia = latencia
+        self.latencia_op = latencia_op
+        self.fallos = fallos
+        self._azar = random.Random(semilla)
+        self._lock = threading.Lock()
+        self.progreso = {}
+        self.commits = 0
+        self.commits_fallidos = 0
+        self.escrituras = 0
+
+    def batch(self):
+        return Lote(self)
+
+    def set(self, ruta, datos, merge=False):
+        """Escritura suelta (docRef.set): tiene latencia pero no falla"""
+        self._commit([(ruta, datos, merge)])
+
+    def delete(self, ruta):
+        self._commit([(ruta, None, False)])
+
+    def documento(self, ruta):
+        """Copia del documento guardado o None"""
+        with self._lock:
+            datos = self.progreso.get(ruta)
+            return dict(datos) if datos is not None else None
+
+    def contar(self, coleccion, **filtros):
+        """collectionGroup(coleccion).where(...).count(); sin documentos guardados no se sabe (None)"""
+        return None
+
+    def _commit(self, operaciones, lote=False):
+        espera = self.latencia + self.latencia_op * len(operaciones)
+        if espera:
+            time.sleep(espera)
+        with self._lock:
+            if lote and self.fallos and self._azar.random() < self.fallos:
+                self.commits_fallidos += 1
+                raise ErrorCommit('14 UNAVAILABLE: commit simulado fallido')
+            self.commits += 1
+            self.escrituras += len(operaciones)
+            self._aplicar(operaciones)
+
+    def _aplicar(self, operaciones):
+        for ruta, datos, merge in operaciones:
+            if not ruta.startswith('imports/'):
+                continue
+            if datos is None:
+                self.progreso.pop(ruta, None)
+            elif merge and ruta in self.progreso:
+                self.progreso[ruta].update(datos)
+            else:
+                self.progreso[ruta] = dict(datos)
+
+
+# ---------------- Tamaño de documentos ----------------
+
+def tamano_valor(valor):
+    """
+    Bytes de almacenamiento de un valor según las reglas de Firestore
+    (string: UTF-8 + 1; número, fecha: 8; bool, null: 1; mapa: nombre + 1 y
+    valor de cada campo). Los {"_seconds", "_nanoseconds"} son Timestamp.
+    """
+    tipo = type(valor)
+    if tipo is str:
+        return len(valor.encode('utf-8')) + 1
+    if valor is None or tipo is bool:
+        return 1
+    if tipo is int or tipo is float:
+        return 8
+    if tipo is dict:
+        if len(valor) == 2 and '_seconds' in valor:
+            return 8
+        return _tamano_campos(valor)
+    if tipo is list or tipo is tuple:
+        return sum(tamano_valor(v) for v in valor)
+    return len(str(valor).encode('utf-8')) + 1
+
+
+_NOMBRES = {}
+
+
+def _tamano_campos(datos):
+    # Bucle a mano: se llama una vez por escritura en las cargas en seco. Los
+    # documentos de una colección repiten los nombres de campo, así que su
+    # tamaño se memoriza por tupla de nombres.
+    claves = tuple(datos)
+    total = _NOMBRES.get(claves)
+    if total is None:
+        total = _NOMBRES[claves] = sum(len(nombre.encode('utf-8')) + 1 for nombre in claves)
+    for valor in datos.values():
+        tipo = type(valor)
+        if tipo is str:
+            total += len(valor.encode('utf-8')) + 1
+        elif valor is None or tipo is bool:
+            total += 1
+        elif tipo is int or tipo is float:
+            total += 8
+        elif tipo is dict and len(valor) == 2 and '_seconds' in valor:
+            total += 8
+        else:
+            total += tamano_valor(valor)
+    return total
+
+
+def tamano_documento(ruta, datos):
+    """Bytes del documento: nombre (cada segmento de la ruta + 1, más 16), campos y 32 adicionales"""
+    return len(ruta.encode('utf-8')) + 1 + 16 + _tamano_campos(datos) + 32
+
+
+def grupo_coleccion(ruta):
+    """ID del grupo de colecciones de un documento ('courses/x/grades/y' -> 'grades')"""
+    return ruta.rsplit('/', 2)[-2] if ruta.count('/') >= 2 else ruta.split('/', 1)[0]
+
+
+class CuentaColeccion:
+    """Escrituras de un grupo de colecciones y tamaño de cada documento escrito"""
+
+    def __init__(self):
+        self.escrituras = 0
+        self.creados = 0
+        self.sobrescritos = 0
+        self.borrados = 0
+        self.tamanos = array('I')
+
+    @property
+    def bytes(self):
+        return sum(self.tamanos)
+
+
+class FirestoreEnMemoria(FirestoreSimulado):
+    """
+    FirestoreSimulado que guarda cada documento en un dict (ruta -> datos) y
+    cuenta por grupo de colecciones (courses, grades, activities,
+    attendance, imports...) las escrituras, las que crean un documento, las
+    que sobrescriben uno existente (también dentro del mismo lote) y el
+    tamaño del documento que queda. Un set con merge=True fusiona los campos
+    con los del documento existente, como Firestore.
+
+    Con guardar=False solo se conserva el tamaño de cada documento (basta
+    para distinguir creación de sobrescritura y ocupa mucho menos; tras un
+    merge se toma el tamaño de lo escrito); contar() necesita los documentos
+    y devuelve None en ese caso.
+    """
+
+    def __init__(self, latencia=0.0, latencia_op=0.0, fallos=0.0, semilla=None, guardar=True):
+        super().__init__(latencia, latencia_op, fallos, semilla)
+        self.guardar = guardar
+        self.documentos = {}
+        self.cuentas = defaultdict(CuentaColeccion)
+        self.commits_lote = 0
+        self.escrituras_lote = 0
+
+    def documento(self, ruta):
+        if not self.guardar or ruta.startswith('imports/'):
+            return super().documento(ruta)
+        with self._lock:
+            datos = self.documentos.get(ruta)
+            return dict(datos) if datos is not None else None
+
+    def contar(self, coleccion, **filtros):
+        if not self.guardar:
+            return None
+        sufijo = f'/{coleccion}/'
+        with self._lock:
+            return sum(1 for ruta, datos in self.documentos.items()
+                       if sufijo in ruta and grupo_coleccion(ruta) == coleccion
+                       and all(datos.get(campo) == valor for campo, valor in filtros.items()))
+
+    def _commit(self, operaciones, lote=False):
+        super()._commit(operaciones, lote)
+        if lote:
+            with self._lock:
+                self.commits_lote += 1
+                self.escrituras_lote += len(operaciones)
+
+    def _aplicar(self, operaciones):
+        super()._aplicar(operaciones)
+        documentos = self.documentos
+        for ruta, datos, merge in operaciones:
+            cuenta = self.cuentas[grupo_coleccion(ruta)]
+            cuenta.escrituras += 1
+            previo = documentos.get(ruta)
+            if datos is None:
+                if previo is not None:
+                    cuenta.borrados += 1
+                    del documentos[ruta]
+                continue
+            if previo is None:
+                cuenta.creados += 1
+            else:
+                cuenta.sobrescritos += 1
+            if not self.guardar:
+                documentos[ruta] = tamano_documento(ruta, datos)
+                cuenta.tamanos.append(documentos[ruta])
+                continue
+            if merge and previo is not None:
+                datos = {**previo, **datos}
+            documentos[ruta] = datos
+            cuenta.tamanos.append(tamano_documento(ruta, datos))
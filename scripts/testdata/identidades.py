@@ -0,0 +1,181 @@
+"""
+Registro de identidades (RUT, username, email) sin colisiones entre ejecuciones.
+
+- RUTs: mapa de bits sobre el rango [RUT_MIN, RUT_MAX] (2 MB para 16M RUTs).
+  Un RUT ocupado se resuelve buscando el siguiente libre con un escaneo de
+  bytes en C, así que la asignación es O(1) amortizada.
+- Usernames y emails: conjunto de usados más una tabla base -> siguiente
+  sufijo, de modo que 'c.munoz', 'c.munoz2', 'c.munoz3'... no recorre los
+  sufijos ya entregados.
+
+Con una ruta, el registro se carga al crearse y se guarda con guardar(), para
+que estudiantes, profesores y lotes adicionales generados en corridas
+distintas nunca choquen. Los generadores usan RegistroIdentidades.desde_entorno(),
+que toma la ruta de la variable TESTDATA_INDICE (sin ella el registro vive
+solo en memoria).
+"""
+
+import csv
+import gzip
+import json
+import os
+import re
+from pathlib import Path
+
+RUT_MIN = 10000000
+RUT_MAX = 25999999
+VARIABLE_ENTORNO = 'TESTDATA_INDICE'
+
+_BYTE_CON_LIBRE = re.compile(rb'[^\xff]')
+
+
+class RegistroIdentidades:
+    """Índice persistente de RUTs, usernames y emails ya entregados"""
+
+    def __init__(self, ruta=None, rut_min=RUT_MIN, rut_max=RUT_MAX):
+        self.ruta = Path(ruta) if ruta else None
+        self.rut_min = rut_min
+        self.rut_max = rut_max
+        self._bits = bytearray((rut_max - rut_min) // 8 + 1)
+        self.ruts_ocupados = 0
+        self._usernames = set()
+        self._sufijos_username = {}
+        self._emails = set()
+        self._sufijos_email = {}
+        if self.ruta and self.ruta.exists():
+            self._cargar()
+
+    @classmethod
+    def desde_entorno(cls):
+        """Registro persistente si TESTDATA_INDICE está definida; si no, solo en memoria"""
+        return cls(os.environ.get(VARIABLE_ENTORNO) or None)
+
+    # ---------------- RUTs ----------------
+
+    def rut_ocupado(self, base):
+        i = base - self.rut_min
+        return bool(self._bits[i >> 3] & (1 << (i & 7)))
+
+    def reservar_rut(self, base):
+        """Marca un RUT como usado. Devuelve False si ya lo estaba"""
+        if not self.rut_min <= base <= self.rut_max:
+            raise ValueError(f"RUT {base} fuera del rango {self.rut_min}-{self.rut_max}")
+        i = base - self.rut_min
+        mascara = 1 << (i & 7)
+        if self._bits[i >> 3] & mascara:
+            return False
+        self._bits[i >> 3] |= mascara
+        self.ruts_ocupados += 1
+        return True
+
+    def _siguiente_libre(self, base):
+        """Primer RUT libre >= base, dando la vuelta al final del rango"""
+        i = base - self.rut_min
+        total = self.rut_max - self.rut_min + 1
+        # Resto del byte actual
+        while i < total and i & 7:
+            if not self._bits[i >> 3] & (1 << (i & 7)):
+                return self.rut_min + i
+            i += 1
+        for inicio in (i >> 3, 0):
+            m = _BYTE_CON_LIBRE.search(self._bits, inicio)
+            if m:
+                byte = m.start()
+                valor = self._bits[byte]
+                bit = (~valor & (valor + 1)).bit_length() - 1  # bit libre más bajo
+                j = (byte << 3) + bit
+                if j < total:
+                    return self.rut_min + j
+        raise RuntimeError('No quedan RUTs libres en el rango del registro')
+
+    def asignar_rut(self, rng):
+        """Sortea un RUT con rng.randint y, si ya está usado, toma el siguiente libre"""
+        base = self._siguiente_libre(rng.randint(self.rut_min, self.rut_max))
+        self.reservar_rut(base)
+        return base
+
+    def asignar_rut_desde(self, base):
+        """Asigna base si está libre o el siguiente libre (para RUTs secuenciales)"""
+        base = self._siguiente_libre(base)
+        self.reservar_rut(base)
+        return base
+
+    # ---------------- Usernames / emails ----------------
+
+    @staticmethod
+    def _asignar(base, usados, sufijos, armar):
+        candidato = armar(base, None)
+        if candidato not in usados:
+            usados.add(candidato)
+            return candidato
+        n = sufijos.get(base, 2)
+        candidato = armar(base, n)
+        while candidato in usados:
+            n += 1
+            candidato = armar(base, n)
+        sufijos[base] = n + 1
+        usados.add(candidato)
+        return candidato
+
+    def asignar_username(self, base):
+        """'c.munoz' si está libre; si no 'c.munoz2', 'c.munoz3'..."""
+        return self._asignar(base, self._usernames, self._sufijos_username,
+                             lambda b, n: b if n is None else f"{b}{n}")
+
+    def asignar_email(self, email):
+        """Igual que asignar_username, con el sufijo antes de la arroba"""
+        def armar(b, n):
+            if n is None:
+                return b
+            local, _, dominio = b.partition('@')
+            return f"{local}{n}@{dominio}"
+        return self._asignar(email, self._emails, self._sufijos_email, armar)
+
+    # ---------------- Persistencia ----------------
+
+    def registrar_csv(self, ruta_csv):
+        """Marca como usados los RUTs/usernames/emails de un CSV de usuarios existente"""
+        from .rut import separar_rut
+
+        with open(ruta_csv, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                partes = separar_rut(row.get('rut', ''))
+                if partes and self.rut_min <= partes[0] <= self.rut_max:
+                    self.reservar_rut(partes[0])
+                if row.get('username'):
+                    self._usernames.add(row['username'].strip())
+                if row.get('email'):
+                    self._emails.add(row['email'].strip())
+
+    def _cargar(self):
+        with gzip.open(self.ruta, 'rb') as f:
+            meta = json.loads(f.readline())
+            bits = f.read()
+        if (meta['rut_min'], meta['rut_max']) != (self.rut_min, self.rut_max):
+            raise ValueError(f"El índice {self.ruta} usa otro rango de RUTs")
+        self._bits = bytearray(bits)
+        self.ruts_ocupados = meta['ruts_ocupados']
+        self._usernames = set(meta['usernames'])
+        self._sufijos_username = meta['sufijos_username']
+        self._emails = set(meta['emails'])
+        self._sufijos_email = meta['sufijos_email']
+
+    def guardar(self):
+        """Escribe el índice de forma atómica (no hace nada si el registro no tiene ruta)"""
+        if not self.ruta:
+            return
+        meta = {
+            'rut_min': self.rut_min,
+            'rut_max': self.rut_max,
+            'ruts_ocupados': self.ruts_ocupados,
+            'usernames': sorted(self._usernames),
+            'sufijos_username': self._sufijos_username,
+            'emails': sorted(self._emails),
+            'sufijos_email': self._sufijos_email,
+        }
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        temporal = self.ruta.with_name(self.ruta.name + '.tmp')
+        with gzip.open(temporal, 'wb', compresslevel=6) as f:
+            f.write(json.dumps(meta, ensure_ascii=False).encode('utf-8') + b'\n')
+            f.write(self._bits)
+        os.replace(temporal, self.ruta)
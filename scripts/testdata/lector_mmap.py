@@ -0,0 +1,200 @@
+"""
+Lector de CSV sobre mmap para pasadas que solo necesitan algunas columnas.
+
+csv.DictReader arma un dict y un str por campo en cada fila aunque solo se
+usen dos o tres columnas. LectorMmap recorre el archivo mapeado buscando
+saltos de línea y delimitadores con find/split (en C) y entrega los campos
+pedidos como bytes sin decodificar; decodificar queda a cargo de quien los
+usa, y solo si los necesita como texto.
+
+Las reglas completas de comillas del módulo csv solo se aplican a los
+registros que contienen '"' (p. ej. "Historia, Geografía y Ciencias
+Sociales"); un campo entre comillas puede incluso contener saltos de línea.
+Los registros coinciden uno a uno con los de csv.reader sobre el mismo
+archivo (una línea vacía es un registro vacío), salvo que un campo sin
+comillas contenga una comilla suelta. El BOM UTF-8 inicial se descarta.
+
+El archivo se recorre en bloques de BLOQUE bytes cortados en un salto de
+línea: cada bloque se separa en registros y en campos con una sola llamada
+por bloque, sin un generador por fila.
+
+No sirve para archivos comprimidos (ver testdata.comprimido): mmap necesita
+el archivo tal cual en disco.
+"""
+
+import csv
+import io
+import mmap
+from operator import itemgetter
+
+BOM = b'\xef\xbb\xbf'
+BLOQUE = 4 << 20  # Bytes por bloque de registros
+
+
+class LectorMmap:
+    def __init__(self, ruta, delimitador=','):
+        self.ruta = ruta
+        self.delimitador = delimitador
+        self._sep = delimitador.encode('utf-8')
+        self._archivo = open(ruta, 'rb')
+        try:
+            self._mm = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Archivo vacío
+            self._mm = b''
+        inicio = len(BOM) if self._mm[:len(BOM)] == BOM else 0
+        encabezado, self._inicio_datos = self._registro(inicio)
+        self._crlf = self._mm[self._inicio_datos - 2:self._inicio_datos] == b'\r\n'
+        self.encabezados = self.parsear(encabezado)
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _registro(self, pos):
+        """(registro en `pos` sin salto final, posición del siguiente)"""
+        mm = self._mm
+        n = len(mm)
+        if pos >= n:
+            return b'', n
+        fin = mm.find(b'\n', pos)
+        if fin < 0:
+            fin = n
+        registro = mm[pos:fin]
+        # Comillas sin cerrar: el salto de línea es parte de un campo
+        while registro.count(b'"') % 2 and fin < n:
+            fin = mm.find(b'\n', fin + 1)
+            if fin < 0:
+                fin = n
+            registro = mm[pos:fin]
+        if registro[-1:] == b'\r':
+            registro = registro[:-1]
+        return registro, fin + 1
+
+    def registros(self):
+        """Registros de datos como bytes (sin encabezado ni salto de línea final)"""
+        pos = self._inicio_datos
+        while pos < len(self._mm):
+            registros, pos = self._bloque(pos)
+            yield from registros
+
+    def parsear(self, registro):
+        """Registro -> lista de str, igual que csv.reader"""
+        if not registro:
+            return []
+        texto = registro.decode('utf-8')
+        if '"' not in texto:
+            return texto.split(self.delimitador)
+        return next(csv.reader([texto], delimiter=self.delimitador), [])
+
+    def indices(self, columnas):
+        """Posiciones de las columnas pedidas; KeyError con el nombre si alguna no existe"""
+        resultado = []
+        for c in columnas:
+            if c not in self.encabezados:
+                raise KeyError(c)
+            resultado.append(self.encabezados.index(c))
+        return resultado
+
+    def _bloque(self, pos):
+        """
+        (registros, posición siguiente) de un bloque de ~BLOQUE bytes cortado
+        en un salto de línea que no está dentro de comillas.
+        """
+        mm = self._mm
+        n = len(mm)
+        fin = n if pos + BLOQUE >= n else mm.rfind(b'\n', pos, pos + BLOQUE)
+        if fin < pos:  # Una sola línea más larga que el bloque
+            fin = mm.find(b'\n', pos)
+            fin = n if fin < 0 else fin
+        while mm[pos:fin].count(b'"') % 2 and fin < n:
+            fin = mm.find(b'\n', fin + 1)
+            fin = n if fin < 0 else fin
+        bloque = mm[pos:fin + 1]  # Con su salto de línea final, si lo tiene
+
+        crlf = self._crlf and bloque.count(b'\n') == bloque.count(b'\r\n')
+        salto = b'\r\n' if crlf else b'\n'
+        registros = bloque.split(salto)
+        if bloque[-1:] == b'\n':
+            registros.pop()  # Vacío tras el último salto
+        if b'"' in bloque and any(r.count(b'"') % 2 for r in registros if b'"' in r):
+            registros = _unir_multilinea(registros, salto)
+        if not crlf:
+            registros = [r[:-1] if r[-1:] == b'\r' else r for r in registros]
+        return registros, fin + 1
+
+    def proyectar_bloques(self, columnas):
+        """
+        Listas de tuplas de bytes con solo las columnas pedidas, en ese orden,
+        un bloque a la vez; las filas cortas se completan con b''. Sin comillas
+        antes de la última columna pedida no se decodifica nada y el split se
+        detiene en esa columna.
+        """
+        indices = self.indices(columnas)
+        tope = max(indices, default=-1) + 1
+        sep = self._sep
+        tomar = itemgetter(*indices) if len(indices) > 1 else (lambda v: tuple(v[i] for i in indices))
+        pos = self._inicio_datos
+        while pos < len(self._mm):
+            registros, pos = self._bloque(pos)
+            partes = [r.split(sep, tope) for r in registros]
+            for i, r in enumerate(registros):
+                if b'"' in r and r.count(sep, 0, r.find(b'"')) < tope:
+                    partes[i] = [v.encode('utf-8') for v in self.parsear(r)]
+            if partes and min(map(len, partes)) < tope:
+                partes = [p + [b''] * (tope - len(p)) if len(p) < tope else p for p in partes]
+            yield list(map(tomar, partes))
+
+    def proyectar(self, columnas):
+        """Como proyectar_bloques, fila por fila"""
+        for bloque in self.proyectar_bloques(columnas):
+            yield from bloque
+
+
+def es_canonico(registro, ancho, sep=b','):
+    """
+    True si csv.writer escribiría los valores de este registro con exactamente
+    los mismos bytes: sin comillas ni \\r y con `ancho` campos. Esos registros
+    se pueden copiar tal cual sin parsearlos.
+    """
+    return b'"' not in registro and b'\r' not in registro and registro.count(sep) == ancho - 1 and bool(registro)
+
+
+class FormateadorCsv:
+    """Valores -> bytes UTF-8 de una fila de csv.writer (CRLF, QUOTE_MINIMAL)"""
+
+    def __init__(self, **formato):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, **formato)
+
+    def __call__(self, valores):
+        self._writer.writerow(valores)
+        linea = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return linea.encode('utf-8')
+
+
+def _unir_multilinea(lineas, salto):
+    """Junta las líneas de un registro cuyo campo entre comillas contiene saltos de línea"""
+    registros = []
+    pendiente = None
+    for linea in lineas:
+        if pendiente is not None:
+            pendiente += salto + linea
+            if linea.count(b'"') % 2:
+                registros.append(pendiente)
+                pendiente = None
+        elif linea.count(b'"') % 2:
+            pendiente = linea
+        else:
+            registros.append(linea)
+    if pendiente is not None:
+        registros.append(pendiente)
+    return registros
@@ -0,0 +1,197 @@
+"""
+Normalización de CSV de carga a un formato canónico: UTF-8, texto en NFC,
+coma como delimitador y encabezados con los nombres que escriben nuestros
+generadores.
+
+Los generadores no son consistentes (utf-8-sig en los scripts de profesores,
+utf-8 en el resto; encabezados en español o en inglés) y las rutas lo
+compensan detectando BOM y resolviendo alias en cada fila. Un archivo que
+pasó por aquí usa siempre los nombres de ENCABEZADOS_CANONICOS, así que los
+lectores pueden indexar columnas directamente.
+
+El cuerpo se procesa en bloques de líneas grandes sin parsear el CSV:
+- un bloque ASCII o que ya está en NFC se copia tal cual;
+- si no, cada línea se corta en las comas y cada trozo se normaliza con un
+  caché (nombres, asignaturas y profesores se repiten miles de veces). Cortar
+  en ',' es seguro aunque la coma esté entre comillas: la coma es un carácter
+  base que no compone con nada, así que NFC(a + ',' + b) == NFC(a) + ',' + NFC(b).
+Solo un delimitador distinto de ',' obliga a parsear cada fila.
+"""
+
+import codecs
+import csv
+import io
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+
+from .carga_masiva import (
+    ALIAS_ASISTENCIA,
+    ALIAS_CALIFICACIONES,
+    Columnas,
+    detectar_delimitador,
+)
+
+# Usuarios y asignaciones se cargan desde el cliente; sus alias son los
+# nombres en español que aparecen en los generadores antiguos
+ALIAS_USUARIOS = {
+    'role': ['role', 'rol'],
+    'name': ['name', 'nombre'],
+    'rut': ['rut'],
+    'email': ['email', 'correo'],
+    'username': ['username', 'usuario'],
+    'password': ['password', 'contraseña', 'clave'],
+    'course': ['course', 'curso'],
+    'section': ['section', 'seccion'],
+    'subjects': ['subjects', 'asignaturas'],
+}
+ALIAS_ASIGNACIONES = {
+    'teacherUsername': ['teacherusername', 'profesor', 'usuario_profesor'],
+    'teacherEmail': ['teacheremail', 'correo_profesor'],
+    'course': ['course', 'curso'],
+    'section': ['section', 'seccion'],
+    'subjects': ['subjects', 'asignaturas'],
+}
+
+# La ruta de calificaciones no reconoce 'name' (la de asistencia sí); aquí
+# se acepta para renombrarla a la canónica
+ALIAS_POR_TIPO = {
+    'calificaciones': {**ALIAS_CALIFICACIONES, 'nombre': ALIAS_CALIFICACIONES['nombre'] + ['name']},
+    'asistencia': ALIAS_ASISTENCIA,
+    'usuarios': ALIAS_USUARIOS,
+    'asignaciones': ALIAS_ASIGNACIONES,
+}
+
+# Campo -> nombre canónico (el que escriben generate_grades.py, generate_attendance.py
+# y los generadores de public/test-data)
+ENCABEZADOS_CANONICOS = {
+    'calificaciones': {
+        'nombre': 'Nombre', 'rut': 'RUT', 'curso': 'Curso', 'seccion': 'Sección',
+        'asignatura': 'Asignatura', 'profesor': 'Profesor', 'fecha': 'Fecha', 'tipo': 'Tipo',
+        'tema': 'Tema', 'actividad': 'Actividad', 'nota': 'Nota', 'semestre': 'Semestre',
+    },
+    'asistencia': {
+        'fecha': 'date', 'curso': 'course', 'seccion': 'section', 'username': 'studentUsername',
+        'rut': 'rut', 'nombre': 'name', 'estado': 'status', 'comentario': 'comment',
+    },
+    'usuarios': {campo: campo for campo in ALIAS_USUARIOS},
+    'asignaciones': {campo: campo for campo in ALIAS_ASIGNACIONES},
+}
+
+BLOQUE = 4 << 20  # Caracteres por bloque de lectura
+MUESTRA_DETECCION = 1 << 20
+
+
+def detectar_tipo(encabezados):
+    """Tipo de archivo según qué columnas características tiene; None si no se reconoce"""
+    for tipo, campo in (('calificaciones', 'nota'), ('asistencia', 'estado'),
+                        ('asignaciones', 'teacherUsername'), ('usuarios', 'role')):
+        if Columnas(encabezados, ALIAS_POR_TIPO[tipo]).posiciones[campo]:
+            return tipo
+    return None
+
+
+def detectar_codificacion(muestra):
+    """utf-8-sig / utf-16 por BOM; utf-8 si la muestra decodifica; si no cp1252 (Excel en Windows)"""
+    if muestra.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if muestra.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        # Un corte a mitad de carácter al final de la muestra no cuenta
+        codecs.getincrementaldecoder('utf-8')().decode(muestra, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'cp1252'
+
+
+def encabezados_canonicos(encabezados, tipo):
+    """
+    Renombra columnas reconocidas al nombre canónico, en el mismo orden.
+    Devuelve (encabezados, renombradas, repetidas): si dos columnas son alias
+    del mismo campo solo la primera se renombra.
+    """
+    columnas = Columnas(encabezados, ALIAS_POR_TIPO[tipo])
+    canonicos = ENCABEZADOS_CANONICOS[tipo]
+    resultado = [h.strip() for h in encabezados]
+    renombradas = {}
+    repetidas = []
+    for campo, posiciones in columnas.posiciones.items():
+        for n, i in enumerate(sorted(posiciones)):
+            if n:
+                repetidas.append(encabezados[i])
+                continue
+            if resultado[i] != canonicos[campo]:
+                renombradas[encabezados[i]] = canonicos[campo]
+            resultado[i] = canonicos[campo]
+    return resultado, renombradas, repetidas
+
+
+@lru_cache(maxsize=1 << 16)
+def _nfc(texto):
+    return unicodedata.normalize('NFC', texto)
+
+
+def _linea_nfc(linea):
+    if linea.isascii():
+        return linea
+    return ','.join(map(_nfc, linea.split(',')))
+
+
+def normalizar(entrada, salida, tipo=None, codificacion=None, bom=False):
+    """
+    Escribe `salida` normalizada. Devuelve un dict con el resumen (tipo,
+    codificación de origen, columnas renombradas, líneas y bloques tocados).
+    """
+    with open(entrada, 'rb') as f:
+        muestra = f.read(MUESTRA_DETECCION)
+    codificacion = codificacion or detectar_codificacion(muestra)
+
+    resumen = Counter()
+    with open(entrada, 'r', encoding=codificacion, newline='') as f_in, \
+            open(salida, 'w', encoding='utf-8-sig' if bom else 'utf-8', newline='') as f_out:
+        primera = f_in.readline().lstrip(chr(0xfeff))
+        fin = primera[len(primera.rstrip('\r\n')):] or '\r\n'
+        primera = primera.rstrip('\r\n')
+        delimitador = detectar_delimitador(primera)
+        encabezados = next(csv.reader([_nfc(primera)], delimiter=delimitador), [])
+        tipo = tipo or detectar_tipo(encabezados)
+        renombradas, repetidas = {}, []
+        if tipo:
+            encabezados, renombradas, repetidas = encabezados_canonicos(encabezados, tipo)
+
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator=fin).writerow(encabezados)
+        f_out.write(buffer.getvalue())
+
+        if delimitador != ',':
+            # Cambiar el delimitador exige parsear: las comas del contenido pasan a ir entre comillas
+            writer = csv.writer(f_out, lineterminator=fin)
+            for valores in csv.reader(f_in, delimiter=delimitador):
+                writer.writerow([_nfc(v) for v in valores])
+                resumen['lineas'] += 1
+        else:
+            while True:
+                lineas = f_in.readlines(BLOQUE)
+                if not lineas:
+                    break
+                resumen['bloques'] += 1
+                resumen['lineas'] += len(lineas)
+                bloque = ''.join(lineas)
+                if bloque.isascii() or unicodedata.is_normalized('NFC', bloque):
+                    f_out.write(bloque)
+                    continue
+                resumen['bloques_nfc'] += 1
+                f_out.write(''.join(map(_linea_nfc, lineas)))
+
+    return {
+        'tipo': tipo,
+        'codificacion': codificacion,
+        'delimitador': delimitador,
+        'renombradas': renombradas,
+        'repetidas': repetidas,
+        'lineas': resumen['lineas'],
+        'bloques': resumen['bloques'],
+        'bloques_nfc': resumen['bloques_nfc'],
+        'cache_nfc': _nfc.cache_info(),
+    }
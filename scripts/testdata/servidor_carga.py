@@ -0,0 +1,456 @@
+"""
+Servidor HTTP local que imita bulk-upload-grades y bulk-upload-attendance
+para medir la carga sin un proyecto de Firebase.
+
+Recibe el mismo multipart (file, year, jobId, sections, courses), decodifica
+el archivo como las rutas (BOM, UTF-8, corrección de mojibake, latin1), lee
+el CSV y arma los documentos con las réplicas de testdata.carga_masiva y
+testdata.documentos (alias, toId, parseFlexibleDate), y los escribe en un
+FirestoreSimulado con la misma secuencia que la ruta:
+
+- calificaciones: progreso 'running', cursos en lotes con pausa de 100 ms,
+  calificaciones en lotes con pausa de 50 ms y progreso cada 5 s,
+  actividades al final, progreso 'completed'. Un commit fallido se anota
+  como error de fila, pero el lote ya quedó confirmado: las filas siguientes
+  fallan al agregarse y el commit final hace fallar la petición con 500,
+  igual que en la ruta.
+- asistencia: prueba de conexión (_health_check), progreso, cursos en lotes
+  de 400, asistencia en lotes con hasta 3 intentos de commit (1 s y 2 s entre
+  intentos) y progreso cada 5 % o 5 s. Los reintentos reusan el lote ya
+  confirmado, así que tras un fallo no pueden tener éxito: las filas del
+  lote se descuentan de saved y la respuesta sigue siendo 200.
+
+Las respuestas tienen la forma de las de las rutas; los errores por fila
+llevan solo el motivo. GET /imports/{jobId} devuelve el documento de
+progreso (lo que el navegador escucha en Firestore), para
+testdata.subida.ProgresoHttp. Acepta cuerpos con Content-Encoding: gzip,
+que la ruta de Next no descomprime.
+"""
+
+import gzip
+import io
+import re
+import time
+import traceback
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from .carga_masiva import LOTE_RUTA, Columnas, leer_csv_como_ruta, to_id
+from .documentos import (
+    DocumentosAsistencia,
+    DocumentosCalificaciones,
+    codificar,
+    leer_como_ruta,
+    mapa_secciones_formulario,
+)
+from .firestore_simulado import ErrorCommit
+
+RUTA_CALIFICACIONES = '/api/firebase/bulk-upload-grades'
+RUTA_ASISTENCIA = '/api/firebase/bulk-upload-attendance'
+LOTE_CURSOS_ASISTENCIA = 400
+INTENTOS_COMMIT_ASISTENCIA = 3
+_RE_FRONTERA = re.compile(r'boundary="?([^";]+)"?')
+_RE_DISPOSICION = re.compile(rb'name="([^"]*)"(?:; *filename="([^"]*)")?')
+
+
+def marca():
+    """admin.firestore.Timestamp.now() como lo serializa JSON.stringify"""
+    ms = time.time_ns() // 1_000_000
+    return {'_seconds': ms // 1000, '_nanoseconds': ms % 1000 * 1_000_000}
+
+
+def decodificar_archivo(datos):
+    """Texto del archivo como lo lee la ruta: sin BOM, UTF-8, corrige mojibake o cae a latin1"""
+    if datos[:3] == b'\xef\xbb\xbf':
+        datos = datos[3:]
+    elif datos[:2] in (b'\xfe\xff', b'\xff\xfe'):
+        datos = datos[2:]
+    texto = datos.decode('utf-8', 'replace')
+    if chr(0xc3) in texto:  # Cualquier patrón de mojibake de la ruta empieza con 'Ã'
+        return bytes(ord(c) & 0xff for c in texto).decode('utf-8', 'replace')
+    if texto.count(chr(0xfffd)) > 10:
+        return datos.decode('latin-1')
+    return texto
+
+
+def leer_multipart(content_type, cuerpo):
+    """(campos de texto, (nombre, bytes) del campo file o None) de un multipart/form-data"""
+    m = _RE_FRONTERA.search(content_type or '')
+    if not m or not (content_type or '').startswith('multipart/form-data'):
+        raise ValueError('Content-Type no es multipart/form-data')
+    frontera = b'--' + m.group(1).encode('latin-1')
+    campos, archivo = {}, None
+    for parte in cuerpo.split(frontera)[1:]:
+        if parte.startswith(b'--'):
+            break
+        cabecera, _, contenido = parte.partition(b'\r\n\r\n')
+        if contenido.endswith(b'\r\n'):
+            contenido = contenido[:-2]
+        disposicion = _RE_DISPOSICION.search(cabecera)
+        if not disposicion:
+            continue
+        nombre = disposicion.group(1).decode('utf-8')
+        if disposicion.group(2) is not None:
+            if nombre == 'file' and archivo is None:
+                archivo = (disposicion.group(2).decode('utf-8'), contenido)
+        else:
+            campos.setdefault(nombre, contenido.decode('utf-8'))
+    return campos, archivo
+
+
+def _anio(texto):
+    """Number(yearStr) || año actual (Number('') y NaN caen al año actual)"""
+    try:
+        return int(float(texto)) if texto else datetime.now().year
+    except ValueError:
+        return datetime.now().year
+
+
+class RutasCarga:
+    """
+    Las dos rutas sobre un FirestoreSimulado (o cualquier db con la misma
+    interfaz). `lote` reemplaza las 200 escrituras por commit; pausas=False
+    elimina los setTimeout de la ruta (self.pausado suma igual los segundos
+    que la ruta habría dormido).
+    """
+
+    def __init__(self, db, zona=None, lote=LOTE_RUTA, pausas=True):
+        self.db = db
+        self.zona = zona
+        self.lote = lote
+        self.pausas = pausas
+        self.pausado = 0.0
+
+    def _pausa(self, segundos):
+        self.pausado += segundos
+        if self.pausas:
+            time.sleep(segundos)
+
+    def _cursos(self, cursos, anio, por_lote, pausa=0.0):
+        lote = self.db.batch()
+        for course_id in cursos:
+            lote.set(f'courses/{course_id}', {'id': course_id, 'year': anio, 'createdAt': marca(),
+                                              'updatedAt': marca()}, merge=True)
+            if len(lote) >= por_lote:
+                lote.commit()
+                lote = self.db.batch()
+                self._pausa(pausa)
+        if len(lote):
+            lote.commit()
+
+    # ---------------- bulk-upload-grades ----------------
+
+    def calificaciones(self, campos, archivo):
+        """(estado HTTP, respuesta) de POST bulk-upload-grades"""
+        if archivo is None:
+            return 400, {'error': 'No file provided'}
+        anio = _anio(campos.get('year'))
+        job_id = (campos.get('jobId') or '').strip() or f'import-grades-{int(time.time() * 1000)}'
+        texto = decodificar_archivo(archivo[1])
+        if not texto.strip():
+            return 400, {'error': 'El archivo CSV está vacío', 'details': 'No se encontró contenido en el archivo'}
+        encabezados, filas = leer_csv_como_ruta(io.StringIO(texto, newline=''))
+        filas = list(filas)
+        if not filas:
+            return 400, {'error': 'CSV vacío o inválido'}
+        try:
+            return 200, self._calificaciones(campos, job_id, anio, encabezados, filas)
+        except Exception as e:
+            try:
+                self.db.set(f'imports/{job_id}', {
+                    'id': job_id, 'type': 'grades', 'status': 'failed',
+                    'message': str(e) or 'Error desconocido durante la importación',
+                    'errorDetails': traceback.format_exc(), 'updatedAt': marca(),
+                }, merge=True)
+            except Exception:
+                pass
+            return 500, {'error': str(e) or 'Error al procesar la carga masiva', 'details': traceback.format_exc(),
+                         'type': type(e).__name__}
+
+    def _calificaciones(self, campos, job_id, anio, encabezados, filas):
+        db = self.db
+        progreso = f'imports/{job_id}'
+        total = len(filas)
+        secciones = mapa_secciones_formulario(campos.get('sections'), campos.get('courses'))
+        documentos = DocumentosCalificaciones(encabezados, job_id, secciones, self.zona, anio, actividades=True)
+        db.set(progreso, {
+            'id': job_id, 'type': 'grades', 'status': 'running', 'year': anio, 'totalRows': total,
+            'processed': 0, 'activities': 0, 'errors': 0, 'message': 'Iniciando importación de calificaciones...',
+            'startedAt': marca(), 'updatedAt': marca(),
+        }, merge=True)
+
+        # PASO 1 y 2: cursos (la ruta solo mira curso/course/courseid aquí)
+        columna = Columnas(encabezados, {'curso': ['curso', 'course', 'courseid']})
+        cursos = dict.fromkeys(to_id(c) for _, valores in filas if (c := columna.valor(valores, 'curso')))
+        self._cursos(cursos, anio, self.lote, pausa=0.1)
+        db.set(progreso, {'message': f'Cursos preparados ({len(cursos)}). Importando calificaciones...',
+                          'updatedAt': marca()}, merge=True)
+
+        # PASO 3: calificaciones
+        lote = db.batch()
+        ops = processed = saved = 0
+        errores = []
+        ultimo = time.monotonic()
+        for numero, valores in filas:
+            try:
+                documento = documentos.documento(valores)
+                if documento is None:
+                    errores.append(f'Fila {numero}: {documentos.ultimo_rechazo}')
+                    continue
+                lote.set(f"courses/{documento['courseId']}/grades/{documento['id']}", documento, merge=True)
+                ops += 1
+                processed += 1
+                if ops >= self.lote:
+                    lote.commit()
+                    saved += ops
+                    lote = db.batch()
+                    ops = 0
+                    self._pausa(0.05)
+                    if time.monotonic() - ultimo > 5:
+                        db.set(progreso, {
+                            'processed': processed, 'saved': saved, 'total': total, 'errors': len(errores),
+                            'percent': min(100, processed * 100 // max(1, total)),
+                            'message': f'Guardadas {saved}/{total} calificaciones', 'updatedAt': marca(),
+                        }, merge=True)
+                        ultimo = time.monotonic()
+            except ErrorCommit as e:
+                errores.append(f'Fila {numero}: {e}')
+        if ops > 0:
+            lote.commit()
+            saved += ops
+            db.set(progreso, {
+                'processed': processed, 'saved': saved, 'total': total, 'errors': len(errores),
+                'percent': min(100, processed * 100 // max(1, total)),
+                'message': f'Procesadas {processed}/{total} • Guardadas {saved}. Generando actividades...',
+                'updatedAt': marca(),
+            }, merge=True)
+
+        # Actividades, todas al final
+        actividades = list(documentos.actividades.values())
+        if actividades:
+            lote = db.batch()
+            for actividad in actividades:
+                lote.set(f"courses/{actividad['courseId']}/activities/{actividad['id']}", actividad, merge=True)
+                if len(lote) >= self.lote:
+                    lote.commit()
+                    self._pausa(0.05)
+                    lote = db.batch()
+            if len(lote):
+                lote.commit()
+            db.set(progreso, {'activities': len(actividades), 'total': total,
+                              'message': f'Actividades creadas: {len(actividades)}', 'updatedAt': marca()},
+                   merge=True)
+
+        db.set(progreso, {
+            'status': 'completed', 'processed': processed, 'saved': saved, 'total': total,
+            'activities': len(actividades), 'errors': len(errores), 'percent': 100,
+            'message': (f'Importación completada: {saved} guardadas de {processed} procesadas, '
+                        f'{len(actividades)} actividades'),
+            'finishedAt': marca(), 'updatedAt': marca(),
+        }, merge=True)
+        return {
+            'success': True,
+            'processed': processed,
+            'saved': saved,
+            'activities': len(actividades),
+            'errors': errores[:10],
+            'totalErrors': len(errores),
+            'year': anio,
+            'yearCountAfter': db.contar('grades', year=anio),
+            'message': (f'Importadas {saved} calificaciones (de {processed} procesadas) y {len(actividades)} '
+                        f'actividades a Firebase' + (f'. Errores: {len(errores)}' if errores else '')),
+        }
+
+    # ---------------- bulk-upload-attendance ----------------
+
+    def asistencia(self, campos, archivo):
+        """(estado HTTP, respuesta) de POST bulk-upload-attendance"""
+        if archivo is None:
+            return 400, {'error': 'No se recibió archivo CSV'}
+        anio = _anio(campos.get('year'))
+        job_id = (campos.get('jobId') or '').strip() or f'import-attendance-{int(time.time() * 1000)}'
+        texto = decodificar_archivo(archivo[1])
+        if not texto.strip():
+            return 400, {'error': 'El archivo CSV está vacío', 'details': 'No se encontró contenido en el archivo'}
+        encabezados, filas = leer_como_ruta(io.StringIO(texto, newline=''), 'asistencia')
+        filas = list(filas)
+        if not filas:
+            return 400, {'error': 'CSV vacío o inválido'}
+        try:
+            sonda = f'_health_check/attendance-upload-{int(time.time() * 1000)}'
+            self.db.set(sonda, {'test': True, 'timestamp': datetime.now().isoformat()})
+            self.db.delete(sonda)
+        except Exception as e:
+            return 500, {'error': 'Error de conexión a Firestore', 'details': str(e)}
+        try:
+            return 200, self._asistencia(campos, job_id, anio, encabezados, filas)
+        except Exception as e:
+            return 500, {'error': str(e) or 'Error desconocido', 'details': traceback.format_exc(),
+                         'type': type(e).__name__}
+
+    def _commit_con_reintentos(self, lote):
+        """Hasta 3 intentos con 1 s, 2 s de espera; devuelve el último error o None"""
+        for intento in range(1, INTENTOS_COMMIT_ASISTENCIA + 1):
+            try:
+                lote.commit()
+                return None
+            except ErrorCommit as e:
+                if intento == INTENTOS_COMMIT_ASISTENCIA:
+                    return e
+                self._pausa(intento * 1.0)
+
+    def _asistencia(self, campos, job_id, anio, encabezados, filas):
+        db = self.db
+        progreso = f'imports/{job_id}'
+        total = len(filas)
+        db.set(progreso, {
+            'id': job_id, 'type': 'attendance', 'status': 'running', 'year': anio, 'totalRows': total,
+            'processed': 0, 'saved': 0, 'errors': 0, 'message': 'Iniciando importación de asistencia...',
+            'startedAt': marca(), 'updatedAt': marca(),
+        }, merge=True)
+        intervalo = max(1, total // 20)
+        ultimo = time.monotonic()
+
+        columna = Columnas(encabezados, {'curso': ['curso', 'course', 'courseid']})
+        cursos = dict.fromkeys(to_id(c) for valores in filas if (c := columna.valor(valores, 'curso')))
+        self._cursos(cursos, anio, LOTE_CURSOS_ASISTENCIA)
+
+        secciones = mapa_secciones_formulario(campos.get('sections'), campos.get('courses'))
+        documentos = DocumentosAsistencia(encabezados, secciones, self.zona)
+        lote = db.batch()
+        ops = processed = saved = 0
+        errores = []
+        por_anio = Counter()
+        for numero, valores in enumerate(filas, 1):
+            documento = documentos.documento(valores)
+            if documento is None:
+                errores.append(f'Fila {numero}: {documentos.ultimo_rechazo}')
+                continue
+            lote.set(f"courses/{documento['courseId']}/attendance/{documento['id']}", documento, merge=True)
+            ops += 1
+            processed += 1
+            saved += 1
+            por_anio[documento['year']] += 1
+            if ops >= self.lote:
+                error = self._commit_con_reintentos(lote)
+                if error is not None:
+                    saved -= ops
+                    errores.append(f'Error en batch (filas {processed - ops + 1}-{processed}): {error}')
+                lote = db.batch()
+                ops = 0
+                self._pausa(0.05)
+            if processed % intervalo == 0 or time.monotonic() - ultimo > 5:
+                db.set(progreso, {
+                    'processed': processed, 'saved': saved, 'errors': len(errores),
+                    'message': f'Procesando... {processed}/{total} ({saved} guardados, {len(errores)} errores)',
+                    'updatedAt': marca(),
+                }, merge=True)
+                ultimo = time.monotonic()
+        if ops > 0:
+            error = self._commit_con_reintentos(lote)
+            if error is not None:
+                saved -= ops
+                errores.append(f'Error en batch final: {error}')
+
+        total_asistencia = db.contar('attendance')
+        total_asistencia = saved if total_asistencia is None else total_asistencia
+        por_anio = {str(a): n for a, n in sorted(por_anio.items())}
+        conteos = {}
+        for a, n in por_anio.items():
+            contado = db.contar('attendance', year=int(a))
+            conteos[a] = n if contado is None else contado
+        resumen_anios = ', '.join(f'{a}: {n}' for a, n in por_anio.items())
+        db.set(progreso, {
+            'status': 'completed', 'processed': processed, 'saved': saved, 'savedByYear': por_anio,
+            'errors': len(errores), 'totalAttendance': total_asistencia, 'yearCounts': conteos,
+            'message': f'Completado: {saved} registros guardados ({resumen_anios}), {len(errores)} errores',
+            'completedAt': marca(), 'updatedAt': marca(),
+        }, merge=True)
+        return {
+            'success': True,
+            'saved': saved,
+            'savedByYear': por_anio,
+            'errors': len(errores),
+            'errorDetails': errores[:10],
+            'totalAttendance': total_asistencia,
+            'yearCounts': conteos,
+            'message': f'Importación completada: {saved} registros de asistencia guardados ({resumen_anios})',
+        }
+
+
+# ---------------- HTTP ----------------
+
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def log_message(self, formato, *args):
+        if self.server.verboso:
+            super().log_message(formato, *args)
+
+    def _leer_cuerpo(self):
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            partes = []
+            while True:
+                tam = int(self.rfile.readline().split(b';', 1)[0].strip() or b'0', 16)
+                if tam == 0:
+                    while self.rfile.readline().strip():  # Trailers
+                        pass
+                    break
+                partes.append(self.rfile.read(tam))
+                self.rfile.readline()
+            cuerpo = b''.join(partes)
+        else:
+            cuerpo = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if self.headers.get('Content-Encoding', '').lower() == 'gzip':
+            cuerpo = gzip.decompress(cuerpo)
+        return cuerpo
+
+    def _responder(self, estado, datos):
+        cuerpo = codificar(datos)
+        self.send_response(estado)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def do_GET(self):
+        ruta = urlsplit(self.path).path
+        if ruta.startswith('/imports/'):
+            documento = self.server.rutas.db.documento('imports/' + unquote(ruta[len('/imports/'):]))
+            if documento is not None:
+                return self._responder(200, documento)
+        self._responder(404, {'error': 'No encontrado'})
+
+    def do_POST(self):
+        ruta = urlsplit(self.path).path
+        manejar = {RUTA_CALIFICACIONES: self.server.rutas.calificaciones,
+                   RUTA_ASISTENCIA: self.server.rutas.asistencia}.get(ruta)
+        try:
+            cuerpo = self._leer_cuerpo()
+        except (OSError, ValueError) as e:
+            self.close_connection = True
+            return self._responder(400, {'error': 'Error al leer los datos del formulario', 'details': str(e)})
+        if manejar is None:
+            return self._responder(404, {'error': 'No encontrado'})
+        try:
+            campos, archivo = leer_multipart(self.headers.get('Content-Type'), cuerpo)
+        except ValueError as e:
+            return self._responder(400, {'error': 'Error al leer los datos del formulario', 'details': str(e)})
+        inicio = time.monotonic()
+        estado, respuesta = manejar(campos, archivo)
+        self.server.peticiones.append((ruta, estado, time.monotonic() - inicio))
+        self._responder(estado, respuesta)
+
+
+class ServidorCarga(ThreadingHTTPServer):
+    """ThreadingHTTPServer con las dos rutas; self.peticiones guarda (ruta, estado, segundos)"""
+
+    daemon_threads = True
+
+    def __init__(self, direccion, rutas, verboso=False):
+        super().__init__(direccion, _Manejador)
+        self.rutas = rutas
+        self.verboso = verboso
+        self.peticiones = []
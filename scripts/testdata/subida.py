@@ -0,0 +1,697 @@
+"""
+Cliente de la carga masiva de calificaciones: sube las partes de
+split-upload-csv.py a POST /api/firebase/bulk-upload-grades en paralelo y de
+forma reanudable.
+
+- Conexiones HTTP/1.1 persistentes (keep-alive), una por hilo de trabajo, con
+  a lo sumo `concurrencia` peticiones en vuelo. El archivo se envía en
+  streaming desde disco, sin armar el multipart completo en memoria.
+- Reintentos con espera exponencial y jitter ante errores de conexión,
+  408/429/5xx y respuestas vacías (los casos que el navegador trata como
+  "sigue procesando en el servidor").
+- Cada parte usa un jobId fijo, `{job}-NNN`. La ruta incluye en cada docId los
+  últimos 12 caracteres de toId(jobId), así que reenviar una parte escribe
+  (merge) sobre los mismos documentos en vez de duplicarlos.
+- Checkpoint local (JSONL, una línea por parte confirmada con su sha256):
+  una carga interrumpida se retoma sin repetir las partes ya confirmadas.
+- Progreso opcional desde imports/{jobId}: con firebase_admin (dependencia
+  opcional: pip install firebase-admin) o desde una URL que devuelva ese
+  documento como JSON (p. ej. un servidor local de pruebas). Mientras una
+  parte está en vuelo se informa su avance y, si la respuesta se pierde, se
+  consulta el documento antes de reenviarla.
+
+Cuerpos gzip (Content-Encoding: gzip): la ruta de Next lee el cuerpo con
+request.formData() y no lo descomprime, así que solo sirven contra un
+servidor o proxy que lo haga; por defecto se envía sin comprimir.
+"""
+
+import csv
+import hashlib
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import uuid
+import zlib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.parse import quote, urlsplit
+from urllib.request import urlopen
+
+from .comprimido import abrir, compresion
+from .lector_mmap import FormateadorCsv, LectorMmap
+
+try:
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+except ImportError:  # Dependencia opcional
+    firebase_admin = None
+
+URL_POR_DEFECTO = 'http://localhost:9002/api/firebase/bulk-upload-grades'
+BLOQUE = 256 << 10  # Bytes por escritura al socket
+TIMEOUT = 900  # Segundos; el mismo AbortController de 15 minutos del navegador
+ESPERA_RUTA = 330  # maxDuration de la ruta (300 s) más margen
+ESTADOS_REINTENTABLES = {0, 408, 425, 429, 499, 500, 502, 503, 504}
+
+
+class ErrorSubida(Exception):
+    def __init__(self, mensaje, estado=None, reintentable=True):
+        super().__init__(mensaje)
+        self.estado = estado
+        self.reintentable = reintentable
+
+
+def job_parte(job, numero):
+    """jobId de la parte `numero` (1..n); el número queda dentro de los 12 caracteres de jobIdShort"""
+    return f"{job}-{numero:03d}"
+
+
+def sha256_archivo(ruta):
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(BLOQUE), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+# ---------------- Multipart ----------------
+
+class Formulario:
+    """
+    multipart/form-data con los campos de texto y el CSV en el campo `file`,
+    como el FormData que arma bulk-uploads.tsx. `datos` es una ruta (se lee
+    en streaming) o bytes. Se puede recorrer varias veces (reintentos).
+    """
+
+    def __init__(self, datos, nombre, campos):
+        self.frontera = f"----carga-{uuid.uuid4().hex}"
+        self.datos = datos
+        cabecera = ''.join(
+            f'--{self.frontera}\r\nContent-Disposition: form-data; name="{clave}"\r\n\r\n{valor}\r\n'
+            for clave, valor in campos.items() if valor is not None
+        )
+        cabecera += (f'--{self.frontera}\r\nContent-Disposition: form-data; name="file"; filename="{nombre}"\r\n'
+                     f'Content-Type: text/csv\r\n\r\n')
+        self._cabecera = cabecera.encode('utf-8')
+        self._cierre = f'\r\n--{self.frontera}--\r\n'.encode('utf-8')
+
+    @property
+    def content_type(self):
+        return f'multipart/form-data; boundary={self.frontera}'
+
+    def __len__(self):
+        tam = self.datos.stat().st_size if isinstance(self.datos, Path) else len(self.datos)
+        return len(self._cabecera) + tam + len(self._cierre)
+
+    def __iter__(self):
+        yield self._cabecera
+        if isinstance(self.datos, Path):
+            with open(self.datos, 'rb') as f:
+                yield from iter(lambda: f.read(BLOQUE), b'')
+        else:
+            yield self.datos
+        yield self._cierre
+
+
+def _gzip(bloques):
+    compresor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for bloque in bloques:
+        comprimido = compresor.compress(bloque)
+        if comprimido:
+            yield comprimido
+    yield compresor.flush()
+
+
+# ---------------- Cliente HTTP ----------------
+
+class ClienteCarga:
+    """
+    POST de partes a bulk-upload-grades. Cada hilo reutiliza su propia
+    conexión persistente; enviar() hace un solo intento y lanza ErrorSubida
+    (con .reintentable) si la ruta no confirmó la parte.
+    """
+
+    def __init__(self, url=URL_POR_DEFECTO, anio=None, token=None, comprimir=False, timeout=TIMEOUT,
+                 secciones=None, cursos=None):
+        partes = urlsplit(url)
+        self._clase = http.client.HTTPSConnection if partes.scheme == 'https' else http.client.HTTPConnection
+        self._destino = partes.netloc
+        self._ruta = (partes.path or '/') + (f'?{partes.query}' if partes.query else '')
+        self.anio = anio
+        self.token = token
+        self.comprimir = comprimir
+        self.timeout = timeout
+        # JSON tal como lo envía el frontend (arreglos de secciones y cursos)
+        self.secciones = secciones
+        self.cursos = cursos
+        self._local = threading.local()
+        self._conexiones = []
+        self._lock = threading.Lock()
+
+    def _conexion(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = self._clase(self._destino, timeout=self.timeout)
+            self._local.conexion = conexion
+            with self._lock:
+                self._conexiones.append(conexion)
+        return conexion
+
+    def _descartar(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is not None:
+            conexion.close()
+            self._local.conexion = None
+
+    def close(self):
+        with self._lock:
+            for conexion in self._conexiones:
+                conexion.close()
+            self._conexiones.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def enviar(self, datos, nombre, job_id):
+        """Sube una parte (ruta o bytes) con ese jobId. Devuelve el JSON de la respuesta 200"""
+        formulario = Formulario(datos, nombre, {
+            'year': self.anio, 'jobId': job_id, 'sections': self.secciones, 'courses': self.cursos,
+        })
+        encabezados = {'Content-Type': formulario.content_type, 'Accept': 'application/json'}
+        if self.token:
+            encabezados['Authorization'] = f'Bearer {self.token}'
+        if self.comprimir:
+            encabezados['Content-Encoding'] = 'gzip'
+            cuerpo, chunked = _gzip(formulario), True
+        else:
+            encabezados['Content-Length'] = str(len(formulario))
+            cuerpo, chunked = iter(formulario), False
+
+        conexion = self._conexion()
+        try:
+            conexion.request('POST', self._ruta, body=cuerpo, headers=encabezados, encode_chunked=chunked)
+            respuesta = conexion.getresponse()
+            crudo = respuesta.read()
+        except (OSError, http.client.HTTPException) as e:
+            self._descartar()
+            raise ErrorSubida(f'{type(e).__name__}: {e}', estado=0) from e
+        if respuesta.will_close:
+            self._descartar()
+
+        estado = respuesta.status
+        try:
+            cuerpo = json.loads(crudo) if crudo.strip() else None
+        except ValueError:
+            cuerpo = None
+        if estado == 200 and isinstance(cuerpo, dict) and cuerpo.get('success'):
+            return cuerpo
+        mensaje = (cuerpo or {}).get('error') if isinstance(cuerpo, dict) else None
+        mensaje = mensaje or (crudo[:200].decode('utf-8', 'replace') if crudo else 'respuesta vacía')
+        # Sin cuerpo la ruta puede seguir procesando (timeout de un proxy): se reintenta
+        reintentable = estado in ESTADOS_REINTENTABLES or not crudo.strip()
+        raise ErrorSubida(f'HTTP {estado}: {mensaje}', estado=estado, reintentable=reintentable)
+
+
+# ---------------- Progreso (imports/{jobId}) ----------------
+
+class ProgresoFirestore:
+    """Lee imports/{jobId} con firebase_admin; mismas credenciales que scripts/firebase-admin.js"""
+
+    def __init__(self, credenciales=None):
+        if firebase_admin is None:
+            raise RuntimeError('Falta firebase_admin (pip install firebase-admin)')
+        if credenciales:
+            cred = credentials.Certificate(str(credenciales))
+        elif os.environ.get('FIREBASE_SERVICE_ACCOUNT_JSON'):
+            cred = credentials.Certificate(json.loads(os.environ['FIREBASE_SERVICE_ACCOUNT_JSON']))
+        else:
+            cred = credentials.ApplicationDefault()
+        app = firebase_admin.initialize_app(cred, name=f'subida-{uuid.uuid4().hex[:8]}')
+        self._db = firestore.client(app)
+
+    def __call__(self, job_id):
+        documento = self._db.document(f'imports/{job_id}').get()
+        return documento.to_dict() if documento.exists else None
+
+
+class ProgresoHttp:
+    """Lee el documento de progreso con GET a una plantilla de URL con {jobId}"""
+
+    def __init__(self, plantilla, timeout=10):
+        self.plantilla = plantilla
+        self.timeout = timeout
+
+    def __call__(self, job_id):
+        try:
+            with urlopen(self.plantilla.format(jobId=quote(job_id, safe='')), timeout=self.timeout) as r:
+                return json.loads(r.read() or b'null')
+        except HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+
+
+def _consultar(progreso, job_id):
+    """Documento de progreso o None; un fallo de lectura no interrumpe la carga"""
+    try:
+        return progreso(job_id)
+    except Exception:
+        return None
+
+
+# ---------------- Checkpoint ----------------
+
+def _contadores(resultado):
+    return {'processed': resultado.get('processed'), 'saved': resultado.get('saved'),
+            'errores': resultado.get('totalErrors') or 0}
+
+
+class Checkpoint:
+    """
+    Partes confirmadas por la ruta, una línea JSON por parte (append + fsync).
+    La primera línea guarda el job; retomar con otro job es un error, porque
+    cambiaría los docId. Una última línea truncada (corte a mitad de escritura)
+    se ignora.
+
+    En la carga adaptativa (subir_adaptativo) las partes son tramos de filas
+    [desde, hasta) del CSV: cada tramo se anota como 'enviando' antes del
+    primer intento y como 'confirmado' al terminar, de modo que al retomar
+    un tramo que quedó en vuelo se reenvía con el mismo jobId. Un tramo que
+    se reparte en subtramos más chicos se anota en una sola línea 'partido'
+    con sus subtramos, que conservan el jobId del tramo (los docId no
+    dependen de la posición de la fila).
+    """
+
+    def __init__(self, ruta, job):
+        self.ruta = Path(ruta)
+        self.job = job
+        self.confirmadas = {}
+        self.tramos = {}  # desde -> registro del tramo ('enviando' o 'confirmado')
+        nuevo = not self.ruta.exists() or self.ruta.stat().st_size == 0
+        if not nuevo:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                for linea in f:
+                    try:
+                        registro = json.loads(linea)
+                    except ValueError:
+                        continue
+                    if 'desde' in registro and registro.get('estado') == 'partido':
+                        for desde, hasta, sha256 in registro['tramos']:
+                            self.tramos[desde] = self._subtramo(registro, desde, hasta, sha256)
+                    elif 'desde' in registro:
+                        self.tramos[registro['desde']] = registro
+                    elif 'job' in registro and 'archivo' not in registro:
+                        if registro['job'] != job:
+                            raise ValueError(f"El checkpoint {self.ruta} es del job {registro['job']!r}, no {job!r}")
+                    else:
+                        self.confirmadas[registro['archivo']] = registro
+        self._archivo = open(self.ruta, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+        if nuevo:
+            self._escribir({'job': job, 'creado': time.strftime('%Y-%m-%dT%H:%M:%S')})
+
+    def _escribir(self, registro):
+        with self._lock:
+            self._archivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+            self._archivo.flush()
+            os.fsync(self._archivo.fileno())
+
+    def confirmada(self, parte):
+        """Registro de la parte si ya se confirmó con el mismo contenido (sha256)"""
+        registro = self.confirmadas.get(parte['archivo'])
+        return registro if registro and registro.get('sha256') == parte['sha256'] else None
+
+    def registrar(self, parte, job_id, resultado):
+        registro = {
+            'archivo': parte['archivo'], 'sha256': parte['sha256'], 'jobId': job_id, 'filas': parte.get('filas'),
+            **_contadores(resultado),
+        }
+        self._escribir(registro)
+        self.confirmadas[parte['archivo']] = registro
+
+    def siguiente_tramo(self):
+        """Número para el jobId del próximo tramo nuevo"""
+        numeros = [int(t['jobId'].rsplit('-', 1)[1]) for t in self.tramos.values()
+                   if t['jobId'].rsplit('-', 1)[-1].isdigit()]
+        return max(numeros, default=0) + 1
+
+    def iniciar_tramo(self, job_id, desde, hasta, sha256):
+        registro = {'jobId': job_id, 'desde': desde, 'hasta': hasta, 'sha256': sha256, 'estado': 'enviando'}
+        self._escribir(registro)
+        self.tramos[desde] = registro
+
+    @staticmethod
+    def _subtramo(partido, desde, hasta, sha256):
+        return {'jobId': partido['jobId'], 'desde': desde, 'hasta': hasta, 'sha256': sha256, 'estado': 'enviando',
+                'parte_de': [partido['desde'], partido['hasta']]}
+
+    def partir_tramo(self, job_id, desde, hasta, subtramos):
+        """Reemplaza el tramo [desde, hasta) por `subtramos` [(desde, hasta, sha256), ...] con el mismo jobId"""
+        registro = {'jobId': job_id, 'desde': desde, 'hasta': hasta, 'estado': 'partido',
+                    'tramos': [list(t) for t in subtramos]}
+        self._escribir(registro)
+        for sub_desde, sub_hasta, sha256 in subtramos:
+            self.tramos[sub_desde] = self._subtramo(registro, sub_desde, sub_hasta, sha256)
+
+    def confirmar_tramo(self, desde, resultado):
+        registro = {**self.tramos[desde], 'estado': 'confirmado', **_contadores(resultado)}
+        self._escribir(registro)
+        self.tramos[desde] = registro
+
+    def close(self):
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------- Carga ----------------
+
+def _esperar_job(progreso, job_id, log, espera_max=ESPERA_RUTA, intervalo=5):
+    """
+    Tras perder una respuesta: espera a que imports/{jobId} deje de estar
+    'running'. Devuelve el documento si quedó 'completed', si no None.
+    """
+    limite = time.monotonic() + espera_max
+    while True:
+        documento = _consultar(progreso, job_id)
+        estado = (documento or {}).get('status')
+        if estado == 'completed':
+            return documento
+        if estado != 'running' or time.monotonic() >= limite:
+            return None
+        log(f"   ⏳ {job_id} sigue en proceso en el servidor ({documento.get('percent', 0)}%)")
+        time.sleep(intervalo)
+
+
+def subir_con_reintentos(cliente, datos, nombre, job_id, reintentos=5, espera=1.0, progreso=None, log=print,
+                         observar=None, partir=None):
+    """
+    enviar() con espera exponencial y jitter entre intentos. Con `progreso`,
+    antes de reenviar se consulta imports/{jobId}: si la ruta terminó la parte
+    aunque la respuesta se perdió, se da por confirmada con ese documento.
+    observar(segundos, ok), si se indica, recibe cada intento exitoso o con
+    error reintentable (p. ej. ControladorAimd). Si partir() devuelve True
+    tras un error reintentable, el error se propaga sin reintentar para que
+    quien llama reenvíe la parte en tramos más chicos.
+    """
+    for intento in range(reintentos + 1):
+        inicio = time.monotonic()
+        try:
+            resultado = cliente.enviar(datos, nombre, job_id)
+        except ErrorSubida as e:
+            if observar is not None and e.reintentable:
+                observar(time.monotonic() - inicio, False)
+            if not e.reintentable or intento == reintentos:
+                raise
+            if progreso is not None:
+                documento = _esperar_job(progreso, job_id, log)
+                if documento is not None:
+                    log(f"   ✅ {nombre}: la ruta completó {job_id} aunque la respuesta se perdió")
+                    return {'success': True, 'processed': documento.get('processed'),
+                            'saved': documento.get('saved'), 'totalErrors': documento.get('errors', 0)}
+            if partir is not None and partir():
+                raise
+            pausa = espera * (2 ** intento) * (0.5 + random.random())
+            log(f"   🔁 {nombre}: {e} — reintento {intento + 1}/{reintentos} en {pausa:.1f}s")
+            time.sleep(pausa)
+        else:
+            if observar is not None:
+                observar(time.monotonic() - inicio, True)
+            return resultado
+
+
+class _Monitor(threading.Thread):
+    """Informa cada `intervalo` segundos el avance de los jobId en vuelo según imports/{jobId}"""
+
+    def __init__(self, progreso, intervalo, log):
+        super().__init__(daemon=True)
+        self.progreso = progreso
+        self.intervalo = intervalo
+        self.log = log
+        self.en_vuelo = {}
+        self._fin = threading.Event()
+
+    def run(self):
+        while not self._fin.wait(self.intervalo):
+            for job_id, nombre in list(self.en_vuelo.items()):
+                documento = _consultar(self.progreso, job_id)
+                if documento and documento.get('status') == 'running':
+                    self.log(f"   ⏳ {nombre}: {documento.get('percent', 0)}% "
+                             f"({documento.get('saved', 0):,}/{documento.get('total', documento.get('totalRows', 0)):,})")
+
+    def detener(self):
+        self._fin.set()
+
+
+def subir_partes(carpeta, cliente, job, checkpoint, concurrencia=4, reintentos=5, espera=1.0,
+                 progreso=None, intervalo=15, log=print):
+    """
+    Sube las partes del manifiesto de `carpeta` que el checkpoint no tiene
+    confirmadas. Devuelve un dict con totales y la lista de partes fallidas.
+    """
+    carpeta = Path(carpeta)
+    with open(carpeta / 'manifiesto.json', 'r', encoding='utf-8') as f:
+        manifiesto = json.load(f)
+
+    resumen = {'partes': len(manifiesto['partes']), 'omitidas': 0, 'subidas': 0, 'filas': 0,
+               'processed': 0, 'saved': 0, 'errores': 0, 'fallidas': []}
+    pendientes = []
+    for numero, parte in enumerate(manifiesto['partes'], 1):
+        registro = checkpoint.confirmada(parte)
+        if registro:
+            resumen['omitidas'] += 1
+            resumen['saved'] += registro.get('saved') or 0
+            resumen['processed'] += registro.get('processed') or 0
+        else:
+            pendientes.append((job_parte(job, numero), parte))
+    if resumen['omitidas']:
+        log(f"⏭️  {resumen['omitidas']} parte(s) ya confirmadas en {checkpoint.ruta.name}")
+
+    monitor = _Monitor(progreso, intervalo, log) if progreso is not None else None
+    if monitor:
+        monitor.start()
+
+    def subir(job_id, parte):
+        ruta = carpeta / parte['archivo']
+        if sha256_archivo(ruta) != parte['sha256']:
+            raise ErrorSubida(f"{parte['archivo']}: checksum distinto al del manifiesto", reintentable=False)
+        if monitor:
+            monitor.en_vuelo[job_id] = parte['archivo']
+        try:
+            inicio = time.monotonic()
+            resultado = subir_con_reintentos(cliente, ruta, parte['archivo'], job_id, reintentos, espera,
+                                             progreso, log)
+            return resultado, time.monotonic() - inicio
+        finally:
+            if monitor:
+                monitor.en_vuelo.pop(job_id, None)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrencia)) as pool:
+            futuros = {pool.submit(subir, job_id, parte): (job_id, parte) for job_id, parte in pendientes}
+            for futuro in as_completed(futuros):
+                job_id, parte = futuros[futuro]
+                try:
+                    resultado, segundos = futuro.result()
+                except ErrorSubida as e:
+                    resumen['fallidas'].append(parte['archivo'])
+                    log(f"❌ {parte['archivo']}: {e}")
+                    continue
+                checkpoint.registrar(parte, job_id, resultado)
+                resumen['subidas'] += 1
+                resumen['filas'] += parte.get('filas') or 0
+                resumen['processed'] += resultado.get('processed') or 0
+                resumen['saved'] += resultado.get('saved') or 0
+                resumen['errores'] += resultado.get('totalErrors') or 0
+                log(f"✅ {parte['archivo']}: {resultado.get('saved', 0):,}/{parte.get('filas', 0):,} guardadas "
+                    f"({segundos:.1f}s, {job_id})")
+    finally:
+        if monitor:
+            monitor.detener()
+    return resumen
+
+
+# ---------------- Carga adaptativa ----------------
+
+def registros_csv(ruta):
+    """
+    Encabezado y luego cada registro no vacío del CSV, como bytes sin salto
+    de línea. Sin compresión los registros se copian tal cual (LectorMmap);
+    .gz/.zst se leen con csv.reader y se vuelven a serializar.
+    """
+    formatear = FormateadorCsv()
+    if compresion(ruta) is None:
+        with LectorMmap(ruta) as lector:
+            yield formatear(lector.encabezados).rstrip(b'\r\n')
+            yield from (registro for registro in lector.registros() if registro)
+        return
+    with abrir(ruta, 'r', encoding='utf-8-sig', newline='') as f:
+        for valores in csv.reader(f):
+            if valores:
+                yield formatear(valores).rstrip(b'\r\n')
+
+
+def _tramos(registros, controlador, checkpoint, job):
+    """
+    (jobId, desde, hasta, registros del tramo, registro previo o None) de
+    tramos de filas cortados con el tamaño vigente del controlador en el
+    momento de pedir cada uno. Los tramos del checkpoint conservan sus
+    límites y su jobId.
+    """
+    previos = sorted(checkpoint.tramos.values(), key=itemgetter('desde'))
+    numero = checkpoint.siguiente_tramo()
+    pos = 0
+    for previo in previos + [None]:
+        limite = previo['desde'] if previo else None
+        while limite is None or pos < limite:
+            n = controlador.filas if limite is None else min(controlador.filas, limite - pos)
+            lote = list(islice(registros, n))
+            if not lote:
+                break
+            yield job_parte(job, numero), pos, pos + len(lote), lote, None
+            numero += 1
+            pos += len(lote)
+        if previo is None:
+            return
+        lote = list(islice(registros, previo['hasta'] - pos))
+        if pos != previo['desde'] or len(lote) != previo['hasta'] - previo['desde']:
+            raise ValueError(f"El CSV no coincide con el checkpoint (tramo {previo['desde']}-{previo['hasta']})")
+        yield previo['jobId'], previo['desde'], previo['hasta'], lote, previo
+        pos = previo['hasta']
+
+
+def _armar(encabezado, lote):
+    return encabezado + b'\r\n' + b'\r\n'.join(lote) + b'\r\n'
+
+
+def _partir(checkpoint, encabezado, job_id, desde, lote, filas):
+    """
+    Reparte el tramo [desde, desde + len(lote)) en subtramos de a lo sumo
+    `filas` filas con el mismo jobId, los anota en el checkpoint y los
+    devuelve como los entrega _tramos
+    """
+    subtramos = [(desde + i, desde + i + len(lote[i:i + filas]), lote[i:i + filas])
+                 for i in range(0, len(lote), filas)]
+    checkpoint.partir_tramo(job_id, desde, desde + len(lote),
+                            [(d, h, hashlib.sha256(_armar(encabezado, sub)).hexdigest()) for d, h, sub in subtramos])
+    return [(job_id, d, h, sub, checkpoint.tramos[d]) for d, h, sub in subtramos]
+
+
+def subir_adaptativo(ruta, cliente, job, checkpoint, controlador, reintentos=5, espera=1.0, progreso=None,
+                     intervalo=15, log=print):
+    """
+    Sube un CSV completo en tramos cuyo tamaño y concurrencia decide
+    `controlador` (testdata.control_carga.ControladorAimd) a medida que
+    llegan las respuestas. Devuelve el mismo resumen que subir_partes.
+
+    Un tramo que falla con un error reintentable, o uno que quedó en vuelo
+    en una carga anterior, se reenvía en subtramos del tamaño vigente del
+    controlador si este ya bajó de su tamaño. Los subtramos comparten el
+    jobId (y por lo tanto imports/{jobId}), así que para ellos no se
+    consulta el progreso: un 'completed' podría ser de otro subtramo.
+    """
+    nombre = Path(ruta).name
+    registros = registros_csv(ruta)
+    encabezado = next(registros, None)
+    resumen = {'partes': 0, 'omitidas': 0, 'subidas': 0, 'filas': 0,
+               'processed': 0, 'saved': 0, 'errores': 0, 'fallidas': []}
+    if encabezado is None:
+        return resumen
+
+    monitor = _Monitor(progreso, intervalo, log) if progreso is not None else None
+    if monitor:
+        monitor.start()
+
+    def subir(job_id, desde, hasta, datos, compartido):
+        marca = controlador.iniciar()
+        etiqueta = f"{nombre}[{desde}:{hasta}]"
+        if monitor and not compartido:
+            monitor.en_vuelo[job_id] = etiqueta
+        try:
+            inicio = time.monotonic()
+            resultado = subir_con_reintentos(
+                cliente, datos, nombre, job_id, reintentos, espera, None if compartido else progreso, log,
+                observar=lambda segundos, ok: controlador.registrar(marca, hasta - desde, segundos, ok),
+                partir=lambda: hasta - desde > controlador.filas)
+            return resultado, time.monotonic() - inicio
+        finally:
+            if monitor and not compartido:
+                monitor.en_vuelo.pop(job_id, None)
+
+    tramos = _tramos(registros, controlador, checkpoint, job)
+    pendientes = deque()  # subtramos por enviar antes de seguir con el CSV
+    en_vuelo = {}
+    agotado = False
+    try:
+        with ThreadPoolExecutor(max_workers=controlador.concurrencia_max) as pool:
+            while True:
+                while len(en_vuelo) < controlador.concurrencia:
+                    tramo = pendientes.popleft() if pendientes else None if agotado else next(tramos, None)
+                    if tramo is None:
+                        agotado = True
+                        break
+                    job_id, desde, hasta, lote, previo = tramo
+                    datos = _armar(encabezado, lote)
+                    sha = hashlib.sha256(datos).hexdigest()
+                    if previo is not None and previo['sha256'] != sha:
+                        raise ValueError(f"El CSV no coincide con el checkpoint (tramo {desde}-{hasta})")
+                    if previo is not None and previo['estado'] == 'confirmado':
+                        resumen['omitidas'] += 1
+                        resumen['processed'] += previo.get('processed') or 0
+                        resumen['saved'] += previo.get('saved') or 0
+                        continue
+                    if previo is not None and hasta - desde > controlador.filas:
+                        pendientes.extendleft(reversed(_partir(checkpoint, encabezado, job_id, desde, lote,
+                                                               controlador.filas)))
+                        log(f"✂️ Filas {desde:,}-{hasta:,} (en vuelo al cortarse): se reenvían de a "
+                            f"{controlador.filas:,} con {job_id}")
+                        continue
+                    if previo is None:
+                        checkpoint.iniciar_tramo(job_id, desde, hasta, sha)
+                    compartido = previo is not None and 'parte_de' in previo
+                    futuro = pool.submit(subir, job_id, desde, hasta, datos, compartido)
+                    en_vuelo[futuro] = (job_id, desde, hasta, lote)
+                if not en_vuelo:
+                    break
+                listos, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    job_id, desde, hasta, lote = en_vuelo.pop(futuro)
+                    try:
+                        resultado, segundos = futuro.result()
+                    except ErrorSubida as e:
+                        if e.reintentable and hasta - desde > controlador.filas:
+                            pendientes.extend(_partir(checkpoint, encabezado, job_id, desde, lote,
+                                                      controlador.filas))
+                            log(f"✂️ Filas {desde:,}-{hasta:,}: {e} — se reenvían de a {controlador.filas:,} "
+                                f"con {job_id}")
+                            continue
+                        resumen['partes'] += 1
+                        resumen['fallidas'].append(f"{desde}-{hasta}")
+                        log(f"❌ Filas {desde:,}-{hasta:,}: {e}")
+                        continue
+                    checkpoint.confirmar_tramo(desde, resultado)
+                    resumen['subidas'] += 1
+                    resumen['filas'] += hasta - desde
+                    resumen['processed'] += resultado.get('processed') or 0
+                    resumen['saved'] += resultado.get('saved') or 0
+                    resumen['errores'] += resultado.get('totalErrors') or 0
+                    log(f"✅ Filas {desde:,}-{hasta:,}: {resultado.get('saved', 0):,} guardadas "
+                        f"({segundos:.1f}s, {job_id})")
+    finally:
+        if monitor:
+            monitor.detener()
+    resumen['partes'] += resumen['subidas'] + resumen['omitidas']
+    return resumen
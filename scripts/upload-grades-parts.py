@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Sube a /api/firebase/bulk-upload-grades las partes generadas por
+split-upload-csv.py, en paralelo y con reanudación (ver testdata/subida.py).
+
+Si la entrada es un CSV en vez de una carpeta de partes, se sube en tramos
+cuyo tamaño y concurrencia se ajustan en marcha con un control AIMD según la
+latencia y los errores observados (ver testdata/control_carga.py); el punto
+de operación elegido se informa a medida que cambia.
+
+Las partes confirmadas se anotan en un checkpoint (por defecto
+subida-<job>.jsonl junto a las partes o al CSV); volver a ejecutar el mismo
+comando con el mismo --job-id sube solo las que faltan.
+
+Uso:
+    python3 scripts/split-upload-csv.py grades-2025.csv --filas 20000 --salida partes/
+    python3 scripts/upload-grades-parts.py partes/ --job-id carga-2025 --anio 2025 --concurrencia 4
+    python3 scripts/upload-grades-parts.py grades-2025.csv --job-id carga-2025 --anio 2025 --concurrencia-max 8
+    python3 scripts/upload-grades-parts.py partes/ --job-id carga-2025 --anio 2025 \\
+        --url http://localhost:8787/api/firebase/bulk-upload-grades --progreso-url http://localhost:8787/imports/{jobId}
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from testdata.control_carga import ControladorAimd
+from testdata.subida import (
+    URL_POR_DEFECTO,
+    Checkpoint,
+    ClienteCarga,
+    ProgresoFirestore,
+    ProgresoHttp,
+    subir_adaptativo,
+    subir_partes,
+)
+
+
+def _leer_json(ruta):
+    return ruta.read_text(encoding='utf-8') if ruta else None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Sube partes de un CSV de calificaciones a la carga masiva')
+    parser.add_argument('entrada', type=Path,
+                        help='Carpeta con manifiesto.json (salida de split-upload-csv.py) o un CSV (.gz/.zst)')
+    parser.add_argument('--job-id', required=True,
+                        help='Prefijo de los jobId (uno por parte: <job-id>-001, ...); el mismo para reanudar')
+    parser.add_argument('--url', default=URL_POR_DEFECTO)
+    parser.add_argument('--anio', type=int, default=None, help='Campo year del formulario (el año seleccionado)')
+    parser.add_argument('--concurrencia', type=int, default=None,
+                        help='Peticiones en vuelo a la vez (con un CSV, la inicial; por defecto 4 y 2)')
+    parser.add_argument('--concurrencia-max', type=int, default=8, help='Con un CSV: tope de peticiones en vuelo')
+    parser.add_argument('--filas', type=int, default=2000, help='Con un CSV: filas de la primera petición')
+    parser.add_argument('--filas-max', type=int, default=50000, help='Con un CSV: tope de filas por petición')
+    parser.add_argument('--latencia-objetivo', type=float, default=60,
+                        help='Con un CSV: segundos por petición sobre los que se achican los tramos')
+    parser.add_argument('--reintentos', type=int, default=5)
+    parser.add_argument('--espera', type=float, default=1.0, help='Segundos de la primera espera entre reintentos')
+    parser.add_argument('--gzip', action='store_true',
+                        help='Envía el cuerpo con Content-Encoding: gzip (solo si el servidor lo descomprime)')
+    parser.add_argument('--token', default=None, help='Se envía como Authorization: Bearer')
+    parser.add_argument('--secciones', type=Path, default=None,
+                        help='JSON con el arreglo de secciones que envía el frontend (campo sections)')
+    parser.add_argument('--cursos', type=Path, default=None,
+                        help='JSON con el arreglo de cursos que envía el frontend (campo courses)')
+    parser.add_argument('--checkpoint', type=Path, default=None,
+                        help='Por defecto subida-<job-id>.jsonl junto a la entrada')
+    parser.add_argument('--progreso-url', default=None,
+                        help='URL con {jobId} que devuelve imports/{jobId} como JSON')
+    parser.add_argument('--progreso-firestore', action='store_true',
+                        help='Lee imports/{jobId} con firebase_admin')
+    parser.add_argument('--credenciales', type=Path, default=None,
+                        help='JSON de cuenta de servicio (por defecto FIREBASE_SERVICE_ACCOUNT_JSON o '
+                             'GOOGLE_APPLICATION_CREDENTIALS)')
+    parser.add_argument('--intervalo', type=float, default=15, help='Segundos entre lecturas de progreso')
+    args = parser.parse_args()
+
+    adaptativo = args.entrada.is_file()
+    if not adaptativo and not (args.entrada / 'manifiesto.json').exists():
+        print(f"❌ Error: No se encuentra {args.entrada / 'manifiesto.json'}")
+        sys.exit(1)
+
+    progreso = None
+    if args.progreso_url:
+        progreso = ProgresoHttp(args.progreso_url)
+    elif args.progreso_firestore:
+        try:
+            progreso = ProgresoFirestore(args.credenciales)
+        except RuntimeError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+
+    carpeta = args.entrada.parent if adaptativo else args.entrada
+    ruta_checkpoint = args.checkpoint or carpeta / f"subida-{args.job_id}.jsonl"
+    try:
+        checkpoint = Checkpoint(ruta_checkpoint, args.job_id)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    controlador = None
+    if adaptativo:
+        controlador = ControladorAimd(filas=args.filas, concurrencia=args.concurrencia or 2,
+                                      filas_max=args.filas_max, concurrencia_max=args.concurrencia_max,
+                                      latencia_objetivo=args.latencia_objetivo)
+        print(f"🎛️ Inicio: {controlador.filas:,} filas/petición × {controlador.concurrencia} en vuelo "
+              f"(tope {controlador.filas_max:,} × {controlador.concurrencia_max})")
+
+    inicio = time.time()
+    with checkpoint, ClienteCarga(args.url, args.anio, args.token, args.gzip, secciones=_leer_json(args.secciones),
+                                  cursos=_leer_json(args.cursos)) as cliente:
+        if adaptativo:
+            try:
+                resumen = subir_adaptativo(args.entrada, cliente, args.job_id, checkpoint, controlador,
+                                           args.reintentos, args.espera, progreso, args.intervalo)
+            except ValueError as e:
+                print(f"❌ Error: {e}")
+                sys.exit(1)
+        else:
+            resumen = subir_partes(args.entrada, cliente, args.job_id, checkpoint, args.concurrencia or 4,
+                                   args.reintentos, args.espera, progreso, args.intervalo)
+
+    segundos = time.time() - inicio
+    ritmo = f", {resumen['filas'] / segundos:,.0f} filas/s" if resumen['subidas'] else ''
+    print(f"\n📊 {resumen['subidas']} parte(s) subidas, {resumen['omitidas']} ya confirmadas, "
+          f"{len(resumen['fallidas'])} fallidas de {resumen['partes']} ({segundos:.1f}s{ritmo})")
+    print(f"   ✅ Guardadas: {resumen['saved']:,} de {resumen['processed']:,} procesadas")
+    if controlador and controlador.mejor:
+        ritmo_max, filas, concurrencia = controlador.mejor
+        print(f"   🎛️ Mejor punto de operación: {filas:,} filas/petición × {concurrencia} en vuelo "
+              f"({ritmo_max:,.0f} filas/s); final: {controlador.filas:,} × {controlador.concurrencia}")
+    if resumen['errores']:
+        print(f"   ⚠️ Filas con error en la ruta: {resumen['errores']:,}")
+    if resumen['fallidas']:
+        print(f"❌ Vuelve a ejecutar el mismo comando para reintentar: {', '.join(resumen['fallidas'])}")
+    print(f"📝 Checkpoint: {ruta_checkpoint}")
+    sys.exit(1 if resumen['fallidas'] else 0)
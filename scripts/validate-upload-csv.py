@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Valida un CSV de calificaciones o asistencia antes de la carga masiva.
+
+Aplica las mismas reglas que bulk-upload-grades / bulk-upload-attendance
+(alias de columnas, parseScore, parseFlexibleDate, campos obligatorios; ver
+testdata.carga_masiva) y además revisa lo que la ruta deja pasar pero
+ensucia los datos: dígito verificador del RUT, cursos fuera de
+1ro Básico..4to Medio, secciones raras, tipos/estados desconocidos.
+
+Para archivos grandes el archivo se divide en rangos de bytes alineados a
+salto de línea que se validan en paralelo (--procesos). Se asume un registro
+por línea, igual que el normalizador de comillas de la ruta.
+
+Salida: resumen por tipo de problema y, con --reporte, un CSV compacto
+fila,nivel,campo,codigo,valor (nivel 'error' = la ruta rechaza la fila,
+'advertencia' = se sube igual). Código de salida 1 si hay errores.
+
+Uso:
+    python3 scripts/validate-upload-csv.py grades.csv --procesos 8 --reporte errores.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from testdata.carga_masiva import (
+    ALIAS_ASISTENCIA,
+    ALIAS_CALIFICACIONES,
+    ENCABEZADOS_ASISTENCIA,
+    ESTADOS_ASISTENCIA,
+    TIPOS_EVALUACION,
+    Columnas,
+    detectar_delimitador,
+    fecha_desbordada,
+    parece_encabezado_asistencia,
+    parse_flexible_date,
+    parse_score,
+    parsear_lineas,
+    to_id,
+    zona_horaria,
+)
+from testdata.rut import separar_rut, calcular_dv
+
+CURSOS_VALIDOS = frozenset(
+    [to_id(f"{n} Básico") for n in ('1ro', '2do', '3ro', '4to', '5to', '6to', '7mo', '8vo')]
+    + [to_id(f"{n} Medio") for n in ('1ro', '2do', '3ro', '4to')]
+)
+
+# Requeridos por cada ruta (asistencia acepta username o rut)
+REQUERIDOS = {
+    'calificaciones': ('nombre', 'rut', 'curso', 'fecha', 'nota'),
+    'asistencia': ('fecha', 'curso', 'estado'),
+}
+# rowNumber de los mensajes de cada ruta: i + 2 en calificaciones, i + 1 en asistencia
+PRIMERA_FILA = {'calificaciones': 2, 'asistencia': 1}
+
+TAMANO_MIN_RANGO = 4 << 20
+REEMPLAZO = chr(0xfffd)  # Carácter que deja decode(errors='replace')
+MAX_EJEMPLOS = 20
+
+
+class Validador:
+    """Reglas por fila; memoriza los resultados por valor (cursos, fechas, RUTs se repiten)"""
+
+    def __init__(self, tipo, encabezados, zona=None):
+        self.tipo = tipo
+        self.columnas = Columnas(encabezados, ALIAS_CALIFICACIONES if tipo == 'calificaciones' else ALIAS_ASISTENCIA)
+        self.zona = zona
+        self._rut = {}
+        self._curso = {}
+
+    def _problemas_rut(self, rut):
+        if rut not in self._rut:
+            partes = separar_rut(rut)
+            if partes is None:
+                self._rut[rut] = 'rut_mal_formado'
+            else:
+                self._rut[rut] = None if calcular_dv(partes[0]) == partes[1] else 'rut_dv_invalido'
+        return self._rut[rut]
+
+    def _curso_conocido(self, curso):
+        if curso not in self._curso:
+            self._curso[curso] = to_id(curso) in CURSOS_VALIDOS
+        return self._curso[curso]
+
+    def validar(self, valores):
+        """Lista de (nivel, campo, codigo, valor) de una fila"""
+        valor = self.columnas.valor
+        problemas = []
+        if self.tipo == 'calificaciones':
+            campos = {c: valor(valores, c) for c in ('nombre', 'rut', 'curso', 'seccion', 'fecha', 'nota', 'tipo')}
+            for c in REQUERIDOS['calificaciones']:
+                if not campos[c]:
+                    problemas.append(('error', c, 'falta_campo', ''))
+            nota = campos['nota']
+            if nota and parse_score(nota) is None:
+                problemas.append(('error', 'nota', 'nota_invalida', nota))
+            tipo = campos['tipo']
+            if tipo and tipo.lower() not in TIPOS_EVALUACION:
+                problemas.append(('advertencia', 'tipo', 'tipo_desconocido', tipo))
+        else:
+            campos = {c: valor(valores, c) for c in ('fecha', 'curso', 'seccion', 'username', 'rut', 'estado')}
+            for c in REQUERIDOS['asistencia']:
+                if not campos[c]:
+                    problemas.append(('error', c, 'falta_campo', ''))
+            if not campos['username'] and not campos['rut']:
+                problemas.append(('error', 'username', 'falta_campo', ''))
+            estado = campos['estado']
+            if estado and estado.lower() not in ESTADOS_ASISTENCIA:
+                problemas.append(('advertencia', 'estado', 'estado_desconocido', estado))
+
+        fecha = campos['fecha']
+        if fecha:
+            if parse_flexible_date(fecha, self.zona) is None:
+                problemas.append(('error', 'fecha', 'fecha_invalida', fecha))
+            elif fecha_desbordada(fecha):
+                problemas.append(('advertencia', 'fecha', 'fecha_desbordada', fecha))
+        rut = campos['rut']
+        if rut:
+            codigo = self._problemas_rut(rut)
+            if codigo:
+                problemas.append(('advertencia', 'rut', codigo, rut))
+        curso = campos['curso']
+        if curso and not self._curso_conocido(curso):
+            problemas.append(('advertencia', 'curso', 'curso_desconocido', curso))
+        seccion = campos['seccion']
+        if seccion and not (len(seccion) == 1 and seccion.isalpha()):
+            problemas.append(('advertencia', 'seccion', 'seccion_inesperada', seccion))
+        return problemas
+
+
+def rangos_alineados(ruta, inicio, partes):
+    """Divide [inicio, tamaño) en hasta `partes` rangos que empiezan justo después de un salto de línea"""
+    tamano = os.path.getsize(ruta)
+    paso = max(TAMANO_MIN_RANGO, -(-(tamano - inicio) // max(1, partes)))
+    cortes = [inicio]
+    with open(ruta, 'rb') as f:
+        posicion = inicio + paso
+        while posicion < tamano:
+            f.seek(posicion)
+            f.readline()
+            corte = f.tell()
+            if corte >= tamano:
+                break
+            if corte > cortes[-1]:
+                cortes.append(corte)
+            posicion = corte + paso
+    cortes.append(tamano)
+    return list(zip(cortes, cortes[1:]))
+
+
+def _validar_rango(tarea):
+    """Worker: valida un rango de bytes. Devuelve (filas, [(indice_local, nivel, campo, codigo, valor)])"""
+    ruta, inicio, fin, tipo, encabezados, delimitador, tz = tarea
+    validador = Validador(tipo, encabezados, zona_horaria(tz))
+    with open(ruta, 'rb') as f:
+        f.seek(inicio)
+        texto = f.read(fin - inicio).decode('utf-8', errors='replace')
+    lineas = texto.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    if lineas and lineas[-1] == '':
+        lineas.pop()
+
+    problemas = []
+    n = -1
+    for n, valores in enumerate(parsear_lineas(lineas, tipo == 'calificaciones', delimitador)):
+        for problema in validador.validar(valores):
+            problemas.append((n, *problema))
+        if any(REEMPLAZO in v for v in valores):
+            problemas.append((n, 'advertencia', '', 'codificacion', 'bytes no UTF-8'))
+    return n + 1, problemas
+
+
+def leer_encabezado(ruta, tipo=None):
+    """(tipo, encabezados, delimitador, byte donde empiezan los datos)"""
+    with open(ruta, 'rb') as f:
+        primera_bytes = f.readline()
+    primera = primera_bytes.decode('utf-8', errors='replace').lstrip(chr(0xfeff)).rstrip('\r\n')
+    encabezados = next(csv.reader([primera]), [])
+    if tipo is None:
+        tipo = 'calificaciones' if Columnas(encabezados, ALIAS_CALIFICACIONES).posiciones['nota'] else 'asistencia'
+    if tipo == 'calificaciones':
+        return tipo, encabezados, ',', len(primera_bytes)
+    delimitador = detectar_delimitador(primera)
+    if not parece_encabezado_asistencia(primera):
+        return tipo, list(ENCABEZADOS_ASISTENCIA), delimitador, 0
+    return tipo, next(csv.reader([primera], delimiter=delimitador), []), delimitador, len(primera_bytes)
+
+
+def validar(ruta, tipo=None, procesos=1, tz=None, reporte=None):
+    inicio = time.time()
+    tipo, encabezados, delimitador, inicio_datos = leer_encabezado(ruta, tipo)
+    columnas = Columnas(encabezados, ALIAS_CALIFICACIONES if tipo == 'calificaciones' else ALIAS_ASISTENCIA)
+    print(f"📂 {ruta} ({tipo})")
+    print(f"📋 Columnas: {', '.join(columnas.encabezados)}")
+
+    faltantes = columnas.faltantes(REQUERIDOS[tipo])
+    if tipo == 'asistencia' and not columnas.posiciones['username'] and not columnas.posiciones['rut']:
+        faltantes.append('username/rut')
+    if faltantes:
+        print(f"❌ Columnas requeridas no encontradas: {', '.join(faltantes)}")
+        return 1
+    conocidas = {i for posiciones in columnas.posiciones.values() for i in posiciones}
+    ignoradas = [h for i, h in enumerate(columnas.encabezados) if i not in conocidas]
+    if ignoradas:
+        print(f"ℹ️  Columnas que la ruta ignora: {', '.join(ignoradas)}")
+
+    rangos = rangos_alineados(ruta, inicio_datos, procesos * 4)
+    tareas = [(str(ruta), a, b, tipo, encabezados, delimitador, tz) for a, b in rangos]
+    print(f"⚙️  {len(rangos)} rango(s) en {procesos} proceso(s)")
+
+    total = 0
+    resumen = Counter()
+    ejemplos = []
+    archivo_reporte = open(reporte, 'w', encoding='utf-8', newline='') if reporte else None
+    try:
+        escritor = csv.writer(archivo_reporte) if archivo_reporte else None
+        if escritor:
+            escritor.writerow(['fila', 'nivel', 'campo', 'codigo', 'valor'])
+        primera = PRIMERA_FILA[tipo]
+        if procesos > 1:
+            executor = ProcessPoolExecutor(max_workers=procesos)
+            resultados = executor.map(_validar_rango, tareas)
+        else:
+            executor = None
+            resultados = map(_validar_rango, tareas)
+        for filas, problemas in resultados:
+            for indice, nivel, campo, codigo, valor in problemas:
+                fila = total + indice + primera
+                resumen[(nivel, codigo, campo)] += 1
+                if escritor:
+                    escritor.writerow([fila, nivel, campo, codigo, valor])
+                if len(ejemplos) < MAX_EJEMPLOS:
+                    ejemplos.append((fila, nivel, campo, codigo, valor))
+            total += filas
+        if executor:
+            executor.shutdown()
+    finally:
+        if archivo_reporte:
+            archivo_reporte.close()
+
+    errores = sum(n for (nivel, _, _), n in resumen.items() if nivel == 'error')
+    transcurrido = time.time() - inicio
+    print(f"\n📊 Filas: {total:,} en {transcurrido:.1f}s ({total / max(transcurrido, 1e-9):,.0f} filas/s)")
+    if not resumen:
+        print("✅ Sin problemas")
+    for (nivel, codigo, campo), n in sorted(resumen.items()):
+        icono = '❌' if nivel == 'error' else '⚠️ '
+        print(f"   {icono} {codigo} ({campo}): {n:,}")
+    if ejemplos:
+        print(f"\n📋 Primeros problemas:")
+        for fila, nivel, campo, codigo, valor in ejemplos:
+            print(f"   Fila {fila}: {nivel} {codigo} {campo}={valor!r}")
+    if reporte:
+        print(f"\n📝 Reporte: {reporte}")
+    return 1 if errores else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Valida un CSV antes de la carga masiva')
+    parser.add_argument('entrada', type=Path)
+    parser.add_argument('--tipo', choices=['calificaciones', 'asistencia'], default=None,
+                        help='Por defecto se detecta por las columnas (nota -> calificaciones)')
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--tz', default=None, help='Zona horaria del servidor para fechas con hora')
+    parser.add_argument('--reporte', type=Path, default=None, help='CSV fila,nivel,campo,codigo,valor')
+    args = parser.parse_args()
+
+    if not args.entrada.exists():
+        print(f"❌ Error: No se encuentra el archivo {args.entrada}")
+        sys.exit(1)
+    sys.exit(validar(args.entrada, args.tipo, max(1, args.procesos), args.tz, args.reporte))